@@ -0,0 +1,57 @@
+from typing import Dict, Any, Optional
+
+from config import settings
+
+# Flan-T5 디코딩 프로필 (지연시간 ↔ 품질)
+# quality는 기존 _generate_with_flan_t5 파라미터와 동일
+DECODING_PROFILES: Dict[str, Dict[str, Any]] = {
+    "fast": {
+        "num_beams": 1,
+        "do_sample": False,
+        "max_new_tokens": 128,
+        "no_repeat_ngram_size": 3,
+    },
+    "balanced": {
+        "num_beams": 2,
+        "do_sample": False,
+        "max_new_tokens": 256,
+        "min_new_tokens": 20,
+        "early_stopping": True,
+        "no_repeat_ngram_size": 3,
+    },
+    "quality": {
+        "num_beams": 5,
+        "do_sample": True,
+        "temperature": 0.8,
+        "top_p": 0.9,
+        "top_k": 50,
+        "max_new_tokens": 512,
+        "min_new_tokens": 30,
+        "early_stopping": True,
+        "no_repeat_ngram_size": 3,
+    },
+}
+
+AUTO_PROFILE = "auto"
+
+def select_decoding_profile(requested: Optional[str], queue_depth: int) -> str:
+    """요청된 프로필 또는 대기열 길이에 따른 프로필 이름 반환"""
+    name = (requested or settings.DECODING_PROFILE).lower()
+    if name in DECODING_PROFILES:
+        return name
+    if name != AUTO_PROFILE:
+        raise ValueError(f"Unknown decoding profile: {requested}")
+
+    # 대기열이 길수록 저렴한 프로필 사용
+    if queue_depth >= settings.DECODING_FAST_QUEUE_DEPTH:
+        return "fast"
+    if queue_depth >= settings.DECODING_BALANCED_QUEUE_DEPTH:
+        return "balanced"
+    return "quality"
+
+def generation_kwargs(profile: str, tokenizer) -> Dict[str, Any]:
+    """model.generate()에 전달할 인자"""
+    kwargs = dict(DECODING_PROFILES[profile])
+    kwargs["pad_token_id"] = tokenizer.pad_token_id
+    kwargs["eos_token_id"] = tokenizer.eos_token_id
+    return kwargs
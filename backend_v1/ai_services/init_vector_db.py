@@ -1,6 +1,8 @@
 import os
+import sys
 import logging
-from rag import RAG
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ai_services.rag import RAG
 from config import settings
 
 logging.basicConfig(
@@ -1,21 +1,26 @@
 import logging
-from typing import Dict, Any, Optional, List, Union, AsyncGenerator
-import openai
-from openai import AsyncOpenAI
-import google.generativeai as genai
+from typing import Dict, Any, Optional, List, Union, AsyncGenerator, Awaitable, Callable
 import os
 import json
-from langchain_openai import ChatOpenAI
-import torch
-from transformers import T5ForConditionalGeneration, T5Tokenizer
-from deep_translator import GoogleTranslator
 import asyncio
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from config import settings
+import metrics
+from ai_services.decoding import select_decoding_profile, generation_kwargs
 
 logger = logging.getLogger(__name__)
 
+# openai, langchain, google.generativeai, torch, transformers 등 무거운 라이브러리는
+# 해당 백엔드를 처음 사용할 때 import (API 워커 시작 시간/메모리 절감)
+
+# Flan-T5 추론 전용 스레드 (이벤트 루프 블로킹 방지)
+_flan_t5_executor = ThreadPoolExecutor(max_workers=settings.FLAN_T5_WORKERS, thread_name_prefix="flan-t5")
+# 실행 중이거나 대기 중인 Flan-T5 생성 요청 수
+_flan_t5_queue_depth = 0
+
 class LLM:
     """번역 기능이 추가된 LLM 모듈"""
     
@@ -26,6 +31,10 @@ class LLM:
         else:
             self.model_name = settings.DEFAULT_LLM_MODEL
         
+        from openai import AsyncOpenAI
+        from langchain_openai import ChatOpenAI
+        from deep_translator import GoogleTranslator
+        
         # OpenAI 초기화
         if settings.OPENAI_API_KEY:
             self.openai_client = AsyncOpenAI(
@@ -34,17 +43,16 @@ class LLM:
                 max_retries=3  # 최대 3회 재시도
             )
         
-        # Gemini 초기화
-        if settings.GOOGLE_API_KEY:
-            genai.configure(api_key=settings.GOOGLE_API_KEY)
-        
         # 번역기 초기화
         self.translator = ChatOpenAI(model="gpt-3.5-turbo", temperature=0, openai_api_key=settings.OPENAI_API_KEY)
         
         # Flan-T5 모델 및 토크나이저 초기화
         self.flan_t5_model = None
         self.flan_t5_tokenizer = None
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self.device = None
+        # 디코딩 프로필별 생성 대기 중인 (프롬프트, future) - 워커가 꺼내 한 번에 생성
+        self._flan_t5_pending: Dict[str, List[Any]] = {}
+        self._flan_t5_lock = threading.Lock()
         
         # Flan-T5 모델인 경우 로드
         if self.model_name and "t5" in self.model_name.lower():
@@ -52,17 +60,45 @@ class LLM:
         
         self.ko_to_en = GoogleTranslator(source='ko', target='en')
     
+    def _count_translator_tokens(self, message):
+        """번역기(ChatOpenAI) 응답의 토큰 사용량 기록"""
+        usage = getattr(message, "usage_metadata", None)
+        if usage:
+            metrics.count_tokens(self.translator.model_name, usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+    
+    async def warm_up(self):
+        """OpenAI 클라이언트 커넥션 풀에 미리 연결 (TLS 핸드셰이크를 첫 요청에서 제외)"""
+        if getattr(self, "openai_client", None):
+            await self.openai_client.models.list()
+    
     def _load_flan_t5_model(self):
         """파인튜닝된 Flan-T5 모델 로드"""
+        import torch
+        from transformers import T5ForConditionalGeneration, T5Tokenizer
+        
+        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        
+        # 최적화된 ONNX int8 런타임 선택 시 우선 사용
+        if settings.FLAN_T5_BACKEND == "onnx":
+            try:
+                from ai_services.t5_onnx import load_onnx_int8
+                
+                self.flan_t5_model, self.flan_t5_tokenizer = load_onnx_int8(settings.FLAN_T5_ONNX_PATH)
+                self.device = torch.device("cpu")
+                logger.info(f"Quantized ONNX Flan-T5 model loaded from {settings.FLAN_T5_ONNX_PATH}")
+                return
+            except Exception as e:
+                logger.warning(f"Failed to load ONNX Flan-T5 model, falling back to PyTorch: {e}")
+        
         try:
-            huggingface_model_id = "cometlee39/finetuned-flan-t5-base"
+            huggingface_model_id = settings.FLAN_T5_MODEL_ID
             
             try:
                 logger.info(f"Loading finetuned Flan-T5 model from Hugging Face: {huggingface_model_id}")
                 
                 # 모델과 토크나이저 로드
                 self.flan_t5_model = T5ForConditionalGeneration.from_pretrained(huggingface_model_id)
-                self.flan_t5_tokenizer = T5Tokenizer.from_pretrained("google/flan-t5-base")
+                self.flan_t5_tokenizer = T5Tokenizer.from_pretrained(settings.FLAN_T5_TOKENIZER_ID)
                 logger.info("Successfully loaded model from Hugging Face")
                 
             except Exception as e:
@@ -75,12 +111,12 @@ class LLM:
                 if os.path.exists(finetuned_model_path):
                     logger.info(f"Loading finetuned Flan-T5 model from local path: {finetuned_model_path}")
                     self.flan_t5_model = T5ForConditionalGeneration.from_pretrained(finetuned_model_path)
-                    self.flan_t5_tokenizer = T5Tokenizer.from_pretrained("google/flan-t5-base")
+                    self.flan_t5_tokenizer = T5Tokenizer.from_pretrained(settings.FLAN_T5_TOKENIZER_ID)
                 else:
                     # 기본 모델 사용
                     logger.info("Loading default Flan-T5 base model")
                     self.flan_t5_model = T5ForConditionalGeneration.from_pretrained("google/flan-t5-base")
-                    self.flan_t5_tokenizer = T5Tokenizer.from_pretrained("google/flan-t5-base")
+                    self.flan_t5_tokenizer = T5Tokenizer.from_pretrained(settings.FLAN_T5_TOKENIZER_ID)
             
             self.flan_t5_model.to(self.device)
             self.flan_t5_model.eval()  # 평가 모드로 설정
@@ -91,40 +127,110 @@ class LLM:
             self.flan_t5_model = None
             self.flan_t5_tokenizer = None
     
-    def _generate_with_flan_t5(self, prompt: str, max_length: int = 512) -> str:
-        """파인튜닝된 Flan-T5 모델로 응답 생성"""
+    def _generate_with_flan_t5(
+        self,
+        prompts: List[str],
+        profile: str = "quality",
+        should_stop: Optional[Callable[[], bool]] = None
+    ) -> List[str]:
+        """파인튜닝된 Flan-T5 모델로 응답 생성 (여러 프롬프트는 패딩해 한 번에 생성)
+        
+        should_stop()이 True가 되면 (기다리는 요청이 모두 취소되면) 다음 토큰부터 생성을 멈춥니다.
+        """
+        import torch
+        from transformers import StoppingCriteria, StoppingCriteriaList
+        
+        class _StopWhen(StoppingCriteria):
+            def __call__(self, input_ids, scores, **kwargs) -> bool:
+                return should_stop()
+        
         if not self.flan_t5_model or not self.flan_t5_tokenizer:
             raise Exception("Flan-T5 model not loaded")
         
         # 입력 텍스트 토크나이징
         inputs = self.flan_t5_tokenizer(
-            prompt, 
+            prompts, 
             max_length=512, 
             truncation=True, 
             padding=True,  # max_length 대신 True
             return_tensors="pt"
         ).to(self.device)
         
-        # 응답 생성 - 개선된 파라미터
+        # 응답 생성 - 디코딩 프로필에 따른 파라미터
+        kwargs = generation_kwargs(profile, self.flan_t5_tokenizer)
+        if should_stop:
+            kwargs["stopping_criteria"] = StoppingCriteriaList([_StopWhen()])
         with torch.no_grad():
             outputs = self.flan_t5_model.generate(
                 inputs["input_ids"],
-                max_length=max_length,
-                min_length=30,  # 최소 길이 설정
-                num_beams=5,    # 빔 수 증가
-                temperature=0.8,  # 더 자연스러운 응답
-                top_p=0.9,      # nucleus sampling
-                top_k=50,       # top-k sampling
-                do_sample=True,  # 샘플링 활성화
-                early_stopping=True,
-                no_repeat_ngram_size=3,  # 반복 방지
-                pad_token_id=self.flan_t5_tokenizer.pad_token_id,
-                eos_token_id=self.flan_t5_tokenizer.eos_token_id
+                attention_mask=inputs["attention_mask"],
+                **kwargs
             )
         
+        output_tokens = int((outputs != self.flan_t5_tokenizer.pad_token_id).sum())
+        metrics.count_tokens(self.model_name, int(inputs["attention_mask"].sum()), output_tokens)
+        if should_stop and should_stop():
+            # 끝까지 생성했다면 나왔을 토큰 수 (상한 기준 추정) - 디코더 시작 토큰 제외
+            generated = outputs.shape[1] - 1
+            metrics.count_tokens_saved(self.model_name, (kwargs["max_new_tokens"] - generated) * len(prompts))
+        
         # 디코딩
-        response = self.flan_t5_tokenizer.decode(outputs[0], skip_special_tokens=True)
-        return response
+        return self.flan_t5_tokenizer.batch_decode(outputs, skip_special_tokens=True)
+    
+    def _drain_flan_t5(self, profile: str, loop: asyncio.AbstractEventLoop):
+        """워커 스레드: 대기 중인 같은 프로필 요청을 최대 FLAN_T5_MAX_BATCH개 꺼내 한 번에 생성
+        
+        요청마다 drain 작업을 하나씩 넣으므로, 앞선 생성 중에 쌓인 요청은 다음 작업이 함께 처리하고
+        이미 처리된 요청의 작업은 꺼낼 것이 없어 바로 끝납니다.
+        """
+        with self._flan_t5_lock:
+            pending = self._flan_t5_pending.get(profile, [])
+            batch = [(prompt, future) for prompt, future in pending[:settings.FLAN_T5_MAX_BATCH] if not future.cancelled()]
+            del pending[:settings.FLAN_T5_MAX_BATCH]
+        if not batch:
+            return
+        
+        def resolve(future: asyncio.Future, result=None, error=None):
+            if future.done():
+                return
+            if error:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        
+        try:
+            # 이벤트 루프 쪽에서 취소된 future의 상태만 읽음 - 조금 늦게 보여도 다음 토큰에서 멈춤
+            answers = self._generate_with_flan_t5(
+                [prompt for prompt, _ in batch],
+                profile,
+                should_stop=lambda: all(future.cancelled() for _, future in batch)
+            )
+            for (_, future), answer in zip(batch, answers):
+                loop.call_soon_threadsafe(resolve, future, answer)
+        except Exception as e:
+            for _, future in batch:
+                loop.call_soon_threadsafe(resolve, future, None, e)
+    
+    async def _run_flan_t5(self, prompt: str, decoding_profile: Optional[str] = None) -> str:
+        """Flan-T5 생성을 전용 스레드에서 실행 (동시에 대기 중인 요청과 묶어서 생성)
+        
+        호출이 취소되면 future도 취소되어, 아직 시작하지 않은 요청은 건너뛰고 묶음 전체가 취소되면 생성을 멈춥니다.
+        """
+        global _flan_t5_queue_depth
+        profile = select_decoding_profile(decoding_profile, _flan_t5_queue_depth)
+        logger.info(f"Flan-T5 decoding profile: {profile} (queue depth {_flan_t5_queue_depth})")
+        
+        _flan_t5_queue_depth += 1
+        try:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            with self._flan_t5_lock:
+                self._flan_t5_pending.setdefault(profile, []).append((prompt, future))
+            with metrics.stage("llm_generate"):
+                loop.run_in_executor(_flan_t5_executor, self._drain_flan_t5, profile, loop)
+                return await future
+        finally:
+            _flan_t5_queue_depth -= 1
     
     async def generate_with_translation(
         self,
@@ -133,9 +239,12 @@ class LLM:
         references: List[Dict[str, Any]],
         translate_to_korean: bool = True,
         history: Optional[List[Dict[str, str]]] = None,
-        system_prompt: Optional[str] = None
+        system_prompt: Optional[str] = None,
+        decoding_profile: Optional[str] = None,
+        summary: Optional[str] = None,
+        on_token: Optional[Callable[[str], Awaitable[None]]] = None
     ) -> str:
-        """응답 생성 후 한국어로 번역"""
+        """응답 생성 후 한국어로 번역 (on_token을 주면 번역된 답변을 조각 단위로 스트리밍)"""
         
         # 영어로 응답 생성
         if not system_prompt:
@@ -151,6 +260,10 @@ class LLM:
         
         Remember: You are having a natural conversation with a traveler who needs help. Don't mention technical details about contexts or information sources."""
         
+        # 이전 대화 요약이 있으면 시스템 프롬프트에 추가
+        if summary:
+            system_prompt += f"\n\nSummary of the earlier conversation:\n{summary}"
+        
         # 이전 대화 기록이 있는 경우 컨텍스트에 포함
         messages = [{"role": "system", "content": system_prompt}]
         
@@ -175,38 +288,43 @@ Please provide a helpful answer to this query."""
 
         # LLM 응답 생성
         if self.model_name.startswith("gpt-"):
-            try:
-                response = await self.openai_client.chat.completions.create(
-                    model=self.model_name,
-                    messages=messages,
-                    temperature=0,  # 노트북과 동일하게 일관된 응답
-                    max_tokens=1000
-                )
-                answer = response.choices[0].message.content
-            except openai.RateLimitError as e:
-                logger.warning(f"Rate limit reached: {e}")
-                await asyncio.sleep(5)  # 5초 대기
-                response = await self.openai_client.chat.completions.create(
-                    model=self.model_name,
-                    messages=messages,
-                    temperature=0,
-                    max_tokens=1000
-                )
-                answer = response.choices[0].message.content
-            except openai.APIStatusError as e:
-                logger.error(f"OpenAI API error: {e}")
-                if e.status_code == 500:
-                    # 500 오류의 경우 대체 모델 사용
-                    logger.warning("Falling back to gpt-3.5-turbo due to 500 error")
+            import openai
+            
+            with metrics.stage("llm_generate"):
+                try:
                     response = await self.openai_client.chat.completions.create(
-                        model="gpt-3.5-turbo",
+                        model=self.model_name,
+                        messages=messages,
+                        temperature=0,  # 노트북과 동일하게 일관된 응답
+                        max_tokens=1000
+                    )
+                    answer = response.choices[0].message.content
+                except openai.RateLimitError as e:
+                    logger.warning(f"Rate limit reached: {e}")
+                    await asyncio.sleep(5)  # 5초 대기
+                    response = await self.openai_client.chat.completions.create(
+                        model=self.model_name,
                         messages=messages,
                         temperature=0,
                         max_tokens=1000
                     )
                     answer = response.choices[0].message.content
-                else:
-                    raise
+                except openai.APIStatusError as e:
+                    logger.error(f"OpenAI API error: {e}")
+                    if e.status_code == 500:
+                        # 500 오류의 경우 대체 모델 사용
+                        logger.warning("Falling back to gpt-3.5-turbo due to 500 error")
+                        response = await self.openai_client.chat.completions.create(
+                            model="gpt-3.5-turbo",
+                            messages=messages,
+                            temperature=0,
+                            max_tokens=1000
+                        )
+                        answer = response.choices[0].message.content
+                    else:
+                        raise
+            if response.usage:
+                metrics.count_tokens(self.model_name, response.usage.prompt_tokens, response.usage.completion_tokens)
         elif self.model_name.startswith("gemini-"):
             # Gemini 또는 다른 모델
             # history를 프롬프트에 추가
@@ -219,26 +337,37 @@ Please provide a helpful answer to this query."""
                         history_text += f"Assistant: {h['content']}\n"
                 history_text += "\n"
             full_prompt = f"{system_prompt}\n\n{history_text}User: {user_prompt}\nAssistant:"
+            import google.generativeai as genai
+            
+            genai.configure(api_key=settings.GOOGLE_API_KEY)
             model = genai.GenerativeModel(self.model_name)
-            response = model.generate_content(full_prompt)
+            with metrics.stage("llm_generate"):
+                response = await model.generate_content_async(full_prompt)
             answer = response.text
+            usage = getattr(response, "usage_metadata", None)
+            if usage:
+                metrics.count_tokens(self.model_name, usage.prompt_token_count, usage.candidates_token_count)
         elif "t5" in self.model_name.lower():  # Flan-T5 모델
             # Flan-T5를 위한 프롬프트 형식
             # 파인튜닝된 모델은 한국어 질문에 직접 답변할 수 있도록 학습됨
         
             # 영어 질문
             if any(ord(char) >= 0xAC00 and ord(char) <= 0xD7A3 for char in query):
-                query = self.ko_to_en.translate(query)
+                with metrics.stage("translate_query"):
+                    query = await asyncio.to_thread(self.ko_to_en.translate, query)
             t5_prompt = f"Answer the following question about travel:\n\nQuestion: {query}\n"
             if context:
                 if any(ord(char) >= 0xAC00 and ord(char) <= 0xD7A3 for char in context):
                     translate_prompt = f"Translate the following text to English :\n\n{context}"
-                    context = self.translator.invoke(translate_prompt).content
+                    with metrics.stage("translate_context"):
+                        translated_context = await self.translator.ainvoke(translate_prompt)
+                    self._count_translator_tokens(translated_context)
+                    context = translated_context.content
                 t5_prompt += f"Context: {context}\n"
             t5_prompt += "Answer:"
             
             try:
-                answer = self._generate_with_flan_t5(t5_prompt)
+                answer = await self._run_flan_t5(t5_prompt, decoding_profile)
                 logger.info("Flan-T5 response generated successfully")
                 
                 # 파인튜닝된 모델이 한국어로 학습되었다면 번역 스킵
@@ -252,13 +381,16 @@ Please provide a helpful answer to this query."""
                 # 오류 발생 시 기본 GPT 모델로 폴백
                 fallback_model = "gpt-3.5-turbo"
                 logger.warning(f"Falling back to {fallback_model}")
-                response = await self.openai_client.chat.completions.create(
-                    model=fallback_model,
-                    messages=messages,
-                    temperature=0,
-                    max_tokens=1000
-                )
+                with metrics.stage("llm_generate"):
+                    response = await self.openai_client.chat.completions.create(
+                        model=fallback_model,
+                        messages=messages,
+                        temperature=0,
+                        max_tokens=1000
+                    )
                 answer = response.choices[0].message.content
+                if response.usage:
+                    metrics.count_tokens(fallback_model, response.usage.prompt_tokens, response.usage.completion_tokens)
 
         
         # 한국어로 번역
@@ -270,7 +402,11 @@ Please provide a helpful answer to this query."""
                 if any(ord(char) >= 0xAC00 and ord(char) <= 0xD7A3 for char in answer[:50]):
                     # 이미 한국어 포함되어 있으면 번역 스킵
                     return answer
-                translated_answer = self.translator.invoke(translate_prompt)
+                if on_token:
+                    return await self._stream_translation(translate_prompt, on_token)
+                with metrics.stage("translate_answer"):
+                    translated_answer = await self.translator.ainvoke(translate_prompt)
+                self._count_translator_tokens(translated_answer)
                 return translated_answer.content
             except Exception as e:
                 logger.error(f"Translation error: {e}")
@@ -278,6 +414,19 @@ Please provide a helpful answer to this query."""
         
         return answer
     
+    async def _stream_translation(self, translate_prompt: str, on_token: Callable[[str], Awaitable[None]]) -> str:
+        """번역 결과를 받는 대로 on_token으로 전달하고 전체 번역문 반환"""
+        message = None
+        with metrics.stage("translate_answer"):
+            async for chunk in self.translator.astream(translate_prompt):
+                message = chunk if message is None else message + chunk
+                if chunk.content:
+                    await on_token(chunk.content)
+        if message is None:
+            return ""
+        self._count_translator_tokens(message)
+        return message.content
+    
     async def generate(
         self,
         query: str,
@@ -0,0 +1,157 @@
+"""부하 테스트용 가짜 RAG/LLM/요약기 (settings.MOCK_PROVIDERS=true)
+
+외부 API(번역, 임베딩, OpenAI) 없이 실제와 비슷한 지연시간만 흉내 내므로
+앱 자체(DB, 캐시, 이벤트 루프, 직렬화)의 처리량과 지연시간을 재현 가능하게 측정할 수 있습니다.
+실제 구현과 같은 단계 메트릭을 남기고, 동기/비동기 여부도 실제 구현과 같게 맞춥니다.
+"""
+import asyncio
+import random
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+import metrics
+from ai_services.rag import RetrievalState
+from config import settings
+
+# 단계별 기본 지연시간 (초) - MOCK_LATENCY_SCALE로 전체 배율 조정
+LATENCY = {
+    "translate_query": 0.03,
+    "embed_query": 0.04,
+    "vector_search": 0.015,
+    "llm_generate": 0.8,
+    "translate_answer": 0.4,
+    "summarize": 0.5,
+}
+
+_HANGUL_RE = re.compile(r"[가-힣]")
+
+def _latency(stage: str) -> float:
+    # 평균 근처에서 흔들리는 지연시간 (꼬리 지연 재현용으로 가끔 3배)
+    base = LATENCY[stage] * settings.MOCK_LATENCY_SCALE
+    return base * random.uniform(0.7, 1.3) * (3 if random.random() < 0.02 else 1)
+
+def _maybe_fail(stage: str):
+    if random.random() < settings.MOCK_ERROR_RATE:
+        raise RuntimeError(f"mock {stage} failure")
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+class MockRAG:
+    """RAG와 같은 인터페이스 - 검색은 실제처럼 동기 호출"""
+
+    def warm_up(self, connections: bool = True):
+        pass
+
+    def index_version(self) -> str:
+        return "mock"
+
+    def search_with_translation(
+        self,
+        query: str,
+        country: Optional[str] = None,
+        doc_type: Optional[str] = None
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        stages = ("translate_query", "embed_query", "vector_search") if _HANGUL_RE.search(query) else ("embed_query", "vector_search")
+        for stage in stages:
+            with metrics.stage(stage):
+                time.sleep(_latency(stage))
+                _maybe_fail(stage)
+
+        return self._context(query, country, doc_type)
+
+    def search_in_conversation(
+        self,
+        query: str,
+        country: Optional[str] = None,
+        doc_type: Optional[str] = None,
+        state: Optional[RetrievalState] = None
+    ) -> Tuple[str, List[Dict[str, Any]], RetrievalState]:
+        # 같은 파티션의 짧은 질문은 후속 질문으로 보고 벡터 검색 생략 (RAG.search_in_conversation과 같은 단계)
+        tag = f"{country}_{doc_type}" if country and doc_type else country
+        reuse = state is not None and state.tag == tag and len(query.split()) <= settings.RETRIEVAL_FOLLOW_UP_MAX_WORDS
+        if state is not None and state.tag == tag:
+            metrics.cache_lookup("retrieval_memory", reuse)
+        stages = ("translate_query", "embed_query") if _HANGUL_RE.search(query) else ("embed_query",)
+        if not reuse:
+            stages += ("vector_search",)
+        for stage in stages:
+            with metrics.stage(stage):
+                time.sleep(_latency(stage))
+                _maybe_fail(stage)
+
+        return (*self._context(query, country, doc_type), RetrievalState(tag, np.zeros(1, dtype=np.float32), {}))
+
+    def search_many_with_translation(
+        self,
+        queries: List[str],
+        country: Optional[str] = None,
+        doc_type: Optional[str] = None
+    ) -> List[Tuple[str, List[Dict[str, Any]]]]:
+        # 임베딩은 한 번에, 검색은 질문마다 (RAG.retrieve_many와 같은 구조)
+        with metrics.stage("embed_batch"):
+            time.sleep(_latency("embed_query"))
+        for _ in queries:
+            with metrics.stage("vector_search"):
+                time.sleep(_latency("vector_search"))
+        return [self._context(query, country, doc_type) for query in queries]
+
+    def _context(self, query: str, country: Optional[str], doc_type: Optional[str]) -> Tuple[str, List[Dict[str, Any]]]:
+        references = [
+            {"title": doc_type or "Unknown", "country": country or "Unknown", "tag": f"{country}_{doc_type}", "updated_at": ""}
+            for _ in range(3)
+        ]
+        context = f"Mock context about {doc_type} in {country} for: {query}"
+        return context, references
+
+class MockLLM:
+    """LLM과 같은 인터페이스"""
+
+    def __init__(self, model_name: Optional[str] = None):
+        self.model_name = model_name or settings.DEFAULT_LLM_MODEL
+
+    async def warm_up(self):
+        pass
+
+    async def generate_with_translation(
+        self,
+        query: str,
+        context: str,
+        references: List[Dict[str, Any]],
+        translate_to_korean: bool = True,
+        history: Optional[List[Dict[str, str]]] = None,
+        system_prompt: Optional[str] = None,
+        decoding_profile: Optional[str] = None,
+        summary: Optional[str] = None,
+        on_token: Optional[Callable[[str], Awaitable[None]]] = None
+    ) -> str:
+        prompt_tokens = _tokens(context + query + (summary or "")) + sum(_tokens(h["content"]) for h in history or [])
+        answer = f"[{self.model_name}] {query}에 대한 답변입니다. " * random.randint(2, 6)
+
+        with metrics.stage("llm_generate"):
+            await asyncio.sleep(_latency("llm_generate"))
+            _maybe_fail("llm_generate")
+        metrics.count_tokens(self.model_name, prompt_tokens, _tokens(answer))
+
+        if translate_to_korean:
+            with metrics.stage("translate_answer"):
+                if on_token:
+                    # 번역 스트리밍처럼 단어 단위로 나눠 전달
+                    words = answer.split(" ")
+                    delay = _latency("translate_answer") / len(words)
+                    for i, word in enumerate(words):
+                        await asyncio.sleep(delay)
+                        await on_token(word if i == 0 else " " + word)
+                else:
+                    await asyncio.sleep(_latency("translate_answer"))
+        return answer
+
+class MockSummarizer:
+    """ConversationSummarizer와 같은 인터페이스"""
+
+    async def summarize(self, previous_summary: Optional[str], turns: List[Dict[str, Any]]) -> str:
+        await asyncio.sleep(_latency("summarize"))
+        return ((previous_summary or "") + f" ({len(turns)} turns summarized)").strip()
@@ -1,52 +1,85 @@
 import os
 import re
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
 from datetime import datetime
-import chromadb
-from chromadb import PersistentClient
-from chromadb.utils import embedding_functions
-from langchain_chroma import Chroma
+import numpy as np
 import tiktoken
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import PyMuPDFLoader
-from langchain_openai import OpenAIEmbeddings
-from deep_translator import GoogleTranslator
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import settings  # Changed to absolute import
+import metrics
 
 logger = logging.getLogger(__name__)
 
+_HANGUL_RE = re.compile(r"[가-힣]")
+
+class RetrievalState(NamedTuple):
+    """한 대화의 직전 검색 상태 (후속 질문 검색에 재사용, 만든 뒤에는 수정하지 않음)"""
+    tag: Optional[str]
+    query_embedding: np.ndarray                  # 단위 벡터 (후속 질문이면 직전 질문과 섞인 값)
+    chunks: Dict[str, Tuple[Any, np.ndarray]]    # 청크 id -> (문서, 단위 임베딩), 관련도 순
+
+def _unit(vector) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+def _mmr(query: np.ndarray, embeddings: np.ndarray, k: int, lambda_mult: float) -> List[int]:
+    """최대 한계 관련도(MMR) 선택 - 벡터스토어의 mmr 검색과 같은 방식"""
+    relevance = embeddings @ query
+    selected = [int(np.argmax(relevance))]
+    while len(selected) < min(k, len(embeddings)):
+        redundancy = (embeddings @ embeddings[selected].T).max(axis=1)
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        scores[selected] = -np.inf
+        selected.append(int(np.argmax(scores)))
+    return selected
+
 class RAG:
 
-    def __init__(self):
+    def __init__(
+        self,
+        embedding_function=None,
+        persist_directory: Optional[str] = None,
+        collection_name: str = "global-documents"
+    ):
+        """embedding_function/persist_directory를 주면 해당 임베딩/경로 사용 (벤치마크용)"""
+        # chromadb/langchain은 import만으로 수 초가 걸리므로 RAG를 처음 만들 때 불러옴
+        from langchain_chroma import Chroma
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+        from langchain_openai import OpenAIEmbeddings
+        from deep_translator import GoogleTranslator
+        
         # 벡터 DB 경로
-        self.persist_directory = os.path.abspath(settings.VECTOR_DB_PATH)
+        self.persist_directory = os.path.abspath(persist_directory or settings.VECTOR_DB_PATH)
         os.makedirs(self.persist_directory, exist_ok=True)
         logger.info(f"Vector DB path: {self.persist_directory}")
         
         # OpenAI 임베딩 설정
-        self.embedding_function = OpenAIEmbeddings(
-            model="text-embedding-3-small",
+        self.embedding_function = embedding_function or OpenAIEmbeddings(
+            model=settings.EMBEDDING_MODEL,
             openai_api_key=settings.OPENAI_API_KEY,
-            dimensions=384  # dimensions는 직접 파라미터로 전달
+            dimensions=settings.EMBEDDING_DIMENSIONS  # dimensions는 직접 파라미터로 전달
         )
         
         # 텍스트 분할기
         self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200
+            chunk_size=settings.CHUNK_SIZE,
+            chunk_overlap=settings.CHUNK_OVERLAP
         )
         
         # Chroma 벡터스토어 초기화 (langchain-chroma 사용)
         self.vectorstore = Chroma(
-            collection_name="global-documents",
+            collection_name=collection_name,
             embedding_function=self.embedding_function,
             persist_directory=self.persist_directory
         )
         logger.info("Chroma vectorstore initialized")
         
+        # 문서를 추가할 때마다 바뀌는 인덱스 버전 (미리 생성한 FAQ 답변의 유효성 확인용)
+        self._index_version_path = os.path.join(self.persist_directory, "index_version")
+        
         self.tokenizer = tiktoken.get_encoding("cl100k_base")
         
         # 번역기 초기화
@@ -58,6 +91,8 @@ class RAG:
     
     def process_pdf_directory(self, pdf_dir: str):
         """PDF 디렉토리 처리"""
+        from langchain_community.document_loaders import PyMuPDFLoader
+        
         pdf_files = [f for f in os.listdir(pdf_dir) if f.endswith(".pdf")]
         processed_count = 0
         
@@ -116,38 +151,187 @@ class RAG:
         
         # 모든 문서 처리 완료
         logger.info(f"Processed {processed_count} PDF files")
+        if processed_count:
+            self._bump_index_version()
         
         # 최신 버전의 Chroma는 자동으로 persist됨
         logger.info("Vector database automatically persisted to disk")
     
-    def search_with_translation(
+    def index_version(self) -> str:
+        """현재 벡터 인덱스 버전 (버전 파일이 없으면 "initial")"""
+        try:
+            with open(self._index_version_path) as f:
+                return f.read().strip() or "initial"
+        except FileNotFoundError:
+            return "initial"
+    
+    def _bump_index_version(self):
+        with open(self._index_version_path, "w") as f:
+            f.write(datetime.utcnow().strftime("%Y%m%dT%H%M%S.%fZ"))
+    
+    def warm_up(self, connections: bool = True):
+        """컬렉션을 열고 (선택) 임베딩 API 커넥션을 미리 연결"""
+        self.vectorstore.get(limit=1)
+        if connections:
+            self.embedding_function.embed_query("warm up")
+    
+    def retrieve(
         self,
         query: str,
         country: Optional[str] = None,
-        doc_type: Optional[str] = None
-    ) -> Tuple[str, List[Dict[str, Any]]]:
-        """한국어 질문을 영어로 번역하여 검색"""
+        doc_type: Optional[str] = None,
+        k: Optional[int] = None
+    ) -> List[Any]:
+        """질문으로 관련 문서(청크)를 순위대로 검색"""
         
         # 태그 구성
         tag = f"{country}_{doc_type}" if country and doc_type else country
         
-        # 한국어 질문을 영어로 번역
-        translated_query = self.ko_to_en.translate(query)
-        logger.info(f"Translated query: {translated_query}")
+        query = self._translate_query(query)
+        
+        # 임베딩과 검색을 나눠 단계별 지연시간 측정 (retriever의 mmr 검색과 동일)
+        with metrics.stage("embed_query"):
+            embedding = self.embedding_function.embed_query(query)
+        
+        return self._search_by_vector(embedding, tag, k)
+    
+    def retrieve_many(
+        self,
+        queries: List[str],
+        country: Optional[str] = None,
+        doc_type: Optional[str] = None,
+        k: Optional[int] = None
+    ) -> List[List[Any]]:
+        """같은 국가/문서 타입의 여러 질문을 검색 - 임베딩은 한 번의 API 호출로 묶음"""
+        tag = f"{country}_{doc_type}" if country and doc_type else country
+        queries = [self._translate_query(query) for query in queries]
+        
+        with metrics.stage("embed_batch"):
+            embeddings = self.embedding_function.embed_documents(queries)
         
-        # 검색 실행 (MMR 사용)
-        search_kwargs = {"k": 5}
+        return [self._search_by_vector(embedding, tag, k) for embedding in embeddings]
+    
+    def _translate_query(self, query: str) -> str:
+        """한국어 질문만 영어로 번역 (영어 질문은 번역 API 호출 생략)"""
+        if _HANGUL_RE.search(query):
+            with metrics.stage("translate_query"):
+                query = self.ko_to_en.translate(query)
+            logger.info(f"Translated query: {query}")
+        return query
+    
+    def _search_by_vector(self, embedding: List[float], tag: Optional[str], k: Optional[int] = None) -> List[Any]:
+        search_kwargs = {"k": k or settings.TOP_K_RESULTS}
         if tag:
             search_kwargs["filter"] = {"tag": tag}
-            
-        retriever = self.vectorstore.as_retriever(
-            search_type="mmr",
-            search_kwargs=search_kwargs
+        
+        # 문서 검색 (기본 MMR)
+        with metrics.stage("vector_search"):
+            if settings.RETRIEVAL_SEARCH_TYPE == "mmr":
+                return self.vectorstore.max_marginal_relevance_search_by_vector(
+                    embedding,
+                    fetch_k=settings.RETRIEVAL_FETCH_K,
+                    lambda_mult=settings.RETRIEVAL_MMR_LAMBDA,
+                    **search_kwargs
+                )
+            return self.vectorstore.similarity_search_by_vector(embedding, **search_kwargs)
+    
+    def search_in_conversation(
+        self,
+        query: str,
+        country: Optional[str] = None,
+        doc_type: Optional[str] = None,
+        state: Optional[RetrievalState] = None
+    ) -> Tuple[str, List[Dict[str, Any]], RetrievalState]:
+        """대화 중 검색으로 (컨텍스트, 참조 목록, 다음 턴용 상태) 구성"""
+        docs, state = self.retrieve_in_conversation(query, country, doc_type, state)
+        return (*self.build_context(docs), state)
+    
+    def retrieve_in_conversation(
+        self,
+        query: str,
+        country: Optional[str] = None,
+        doc_type: Optional[str] = None,
+        state: Optional[RetrievalState] = None
+    ) -> Tuple[List[Any], RetrievalState]:
+        """대화 중 검색 - 후속 질문이면 직전 턴의 검색 후보를 재사용/병합하고 다음 턴용 상태 반환
+        
+        직전 턴과 같은 국가/문서 타입에서 짧은 질문이거나 직전 질문과 비슷하면 후속 질문으로 보고,
+        질문 임베딩을 직전 질문 쪽으로 섞어 ("신청은 어디서 하나요?" -> 직전 주제의 신청 방법) 순위를 매깁니다.
+        보관된 후보 중 RETRIEVAL_MEMORY_MIN_SCORE 이상인 청크가 컨텍스트 문서 수만큼 있으면 벡터 검색을 생략하고,
+        아니면 새로 검색한 후보와 보관된 후보를 합쳐 고릅니다.
+        """
+        tag = f"{country}_{doc_type}" if country and doc_type else country
+        english = self._translate_query(query)
+        with metrics.stage("embed_query"):
+            embedding = _unit(self.embedding_function.embed_query(english))
+        
+        follow_up = state is not None and state.tag == tag and (
+            len(english.split()) <= settings.RETRIEVAL_FOLLOW_UP_MAX_WORDS
+            or float(embedding @ state.query_embedding) >= settings.RETRIEVAL_FOLLOW_UP_SIMILARITY
         )
+        if follow_up:
+            embedding = _unit(embedding + settings.RETRIEVAL_FOLLOW_UP_WEIGHT * state.query_embedding)
+            scores = [float(vector @ embedding) for _, vector in state.chunks.values()]
+            reuse = sum(score >= settings.RETRIEVAL_MEMORY_MIN_SCORE for score in scores) >= settings.RETRIEVAL_CONTEXT_DOCS
+            metrics.cache_lookup("retrieval_memory", reuse)
+            chunks = state.chunks
+            if not reuse:
+                fresh = self._search_candidates(embedding, tag)
+                chunks = {**fresh, **{id: chunk for id, chunk in state.chunks.items() if id not in fresh}}
+        else:
+            chunks = self._search_candidates(embedding, tag)
         
-        # 문서 검색
-        docs = retriever.get_relevant_documents(translated_query)
+        ids = list(chunks)
+        docs = []
+        if ids:
+            embeddings = np.stack([chunks[id][1] for id in ids])
+            if settings.RETRIEVAL_SEARCH_TYPE == "mmr":
+                order = _mmr(embedding, embeddings, settings.TOP_K_RESULTS, settings.RETRIEVAL_MMR_LAMBDA)
+            else:
+                order = np.argsort(-(embeddings @ embedding))[:settings.TOP_K_RESULTS]
+            docs = [chunks[ids[i]][0] for i in order]
+            # 다음 턴을 위해 지금 질문과 가까운 후보만 보관
+            keep = np.argsort(-(embeddings @ embedding))[:settings.RETRIEVAL_MEMORY_MAX_CHUNKS]
+            chunks = {ids[i]: chunks[ids[i]] for i in keep}
         
+        return docs, RetrievalState(tag, embedding, chunks)
+    
+    def _search_candidates(self, embedding: np.ndarray, tag: Optional[str]) -> Dict[str, Tuple[Any, np.ndarray]]:
+        """벡터 검색 후보 RETRIEVAL_FETCH_K개를 임베딩과 함께 반환 (id -> (문서, 단위 임베딩), 관련도 순)
+        
+        mmr 검색과 같은 후보를 공개 API로 받은 뒤 저장된 임베딩을 id로 읽어 옵니다 (Document.id는 langchain-chroma 0.1.2+).
+        """
+        with metrics.stage("vector_search"):
+            hits = self.vectorstore.similarity_search_by_vector_with_relevance_scores(
+                embedding.tolist(),
+                k=settings.RETRIEVAL_FETCH_K,
+                filter={"tag": tag} if tag else None
+            )
+            ids = [doc.id for doc, _ in hits]
+            stored = self.vectorstore.get(ids=ids, include=["embeddings"]) if ids else {"ids": [], "embeddings": []}
+        vectors = dict(zip(stored["ids"], stored["embeddings"]))
+        return {doc.id: (doc, _unit(vectors[doc.id])) for doc, _ in hits if doc.id in vectors}
+    
+    def search_with_translation(
+        self,
+        query: str,
+        country: Optional[str] = None,
+        doc_type: Optional[str] = None
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        """한국어 질문을 영어로 번역하여 검색"""
+        return self.build_context(self.retrieve(query, country, doc_type))
+    
+    def search_many_with_translation(
+        self,
+        queries: List[str],
+        country: Optional[str] = None,
+        doc_type: Optional[str] = None
+    ) -> List[Tuple[str, List[Dict[str, Any]]]]:
+        """같은 국가/문서 타입의 여러 질문을 한 번에 검색 (배치 질의응답용)"""
+        return [self.build_context(docs) for docs in self.retrieve_many(queries, country, doc_type)]
+    
+    def build_context(self, docs: List[Any]) -> Tuple[str, List[Dict[str, Any]]]:
+        """검색된 문서로 (컨텍스트, 참조 목록) 구성"""
         if not docs:
             return "관련 문서를 찾지 못했습니다.", []
         
@@ -155,7 +339,7 @@ class RAG:
         context_parts = []
         references = []
         
-        for i, doc in enumerate(docs[:3]):  # 최대 3개 문서
+        for i, doc in enumerate(docs[:settings.RETRIEVAL_CONTEXT_DOCS]):
             context_parts.append(doc.page_content)
             metadata = doc.metadata
             references.append({
@@ -196,7 +380,8 @@ class RAG:
                 
                 # 벡터 스토어에 배치 추가
                 self.vectorstore.add_texts(texts=batch_texts, metadatas=batch_metadatas)
-                
+            
+            self._bump_index_version()
             return True
             
         except Exception as e:
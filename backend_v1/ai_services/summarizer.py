@@ -0,0 +1,40 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+class ConversationSummarizer:
+    """오래된 대화 턴을 누적 요약으로 압축"""
+
+    def __init__(self, model_name: str = settings.SUMMARY_MODEL):
+        from langchain_openai import ChatOpenAI
+        
+        self.llm = ChatOpenAI(
+            model=model_name,
+            temperature=0,
+            max_tokens=settings.SUMMARY_MAX_TOKENS,
+            openai_api_key=settings.OPENAI_API_KEY
+        )
+
+    async def summarize(self, previous_summary: Optional[str], turns: List[Dict[str, Any]]) -> str:
+        """기존 요약에 새 턴들을 합쳐 갱신된 요약 반환"""
+        transcript = "\n".join(
+            f"{'User' if turn['role'] == 'user' else 'Assistant'}: {turn['content']}"
+            for turn in turns
+        )
+        prompt = f"""You maintain a running summary of a conversation between a traveler and a travel assistant.
+Update the summary with the new turns below. Keep every concrete fact the traveler shared or was told
+(destination, dates, visa type, nationality, budget, documents, deadlines, decisions). Drop greetings and repetition.
+Write the summary in the same language as the conversation, in at most {settings.SUMMARY_MAX_TOKENS // 2} words.
+
+Current summary:
+{previous_summary or "(none)"}
+
+New turns:
+{transcript}
+
+Updated summary:"""
+        response = await self.llm.ainvoke(prompt)
+        return response.content.strip()
@@ -0,0 +1,104 @@
+import os
+import sys
+import shutil
+import logging
+import argparse
+import platform
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# ORTQuantizer가 붙이는 접미사
+QUANTIZED_SUFFIX = "_quantized"
+
+# ORTModelForSeq2SeqLM 파일 이름 인자
+ONNX_FILE_ARGS = {
+    "encoder_model": "encoder_file_name",
+    "decoder_model": "decoder_file_name",
+    "decoder_with_past_model": "decoder_with_past_file_name",
+}
+
+def _default_quantization_arch() -> str:
+    """CPU 아키텍처에 맞는 양자화 설정 이름"""
+    machine = platform.machine().lower()
+    if machine in ("arm64", "aarch64"):
+        return "arm64"
+    return "avx2"
+
+def export_onnx_int8(
+    model_id: str = settings.FLAN_T5_MODEL_ID,
+    output_dir: str = settings.FLAN_T5_ONNX_PATH,
+    arch: str = None
+) -> str:
+    """Flan-T5를 ONNX encoder-decoder로 내보내고 int8 동적 양자화 적용"""
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import T5Tokenizer
+
+    output_dir = os.path.abspath(output_dir)
+    fp32_dir = os.path.join(output_dir, "fp32")
+    os.makedirs(fp32_dir, exist_ok=True)
+
+    # 1. fp32 ONNX 내보내기
+    logger.info(f"Exporting {model_id} to ONNX: {fp32_dir}")
+    model = ORTModelForSeq2SeqLM.from_pretrained(model_id, export=True)
+    model.save_pretrained(fp32_dir)
+
+    # 2. 동적 int8 양자화 (가중치만 int8, 활성값은 런타임에 양자화)
+    arch = arch or _default_quantization_arch()
+    qconfig = getattr(AutoQuantizationConfig, arch)(is_static=False, per_channel=False)
+    onnx_files = [f for f in os.listdir(fp32_dir) if f.endswith(".onnx")]
+    for file_name in onnx_files:
+        logger.info(f"Quantizing {file_name} ({arch})")
+        quantizer = ORTQuantizer.from_pretrained(fp32_dir, file_name=file_name)
+        quantizer.quantize(save_dir=output_dir, quantization_config=qconfig)
+
+    # 3. 런타임 로드에 필요한 설정/토크나이저 복사
+    for file_name in os.listdir(fp32_dir):
+        if file_name.endswith(".json"):
+            shutil.copy(os.path.join(fp32_dir, file_name), output_dir)
+    T5Tokenizer.from_pretrained(settings.FLAN_T5_TOKENIZER_ID).save_pretrained(output_dir)
+
+    logger.info(f"Quantized Flan-T5 saved to {output_dir}")
+    return output_dir
+
+def load_onnx_int8(model_dir: str = settings.FLAN_T5_ONNX_PATH):
+    """양자화된 ONNX 모델과 토크나이저 로드 (CPU 전용)"""
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    from transformers import T5Tokenizer
+
+    model_dir = os.path.abspath(model_dir)
+    if not os.path.isdir(model_dir):
+        raise FileNotFoundError(f"ONNX model directory not found: {model_dir}")
+
+    file_kwargs = {}
+    for base_name, arg_name in ONNX_FILE_ARGS.items():
+        file_name = f"{base_name}{QUANTIZED_SUFFIX}.onnx"
+        if os.path.exists(os.path.join(model_dir, file_name)):
+            file_kwargs[arg_name] = file_name
+    if "encoder_file_name" not in file_kwargs:
+        raise FileNotFoundError(f"Quantized encoder not found in {model_dir}")
+
+    model = ORTModelForSeq2SeqLM.from_pretrained(
+        model_dir,
+        provider="CPUExecutionProvider",
+        use_cache="decoder_with_past_file_name" in file_kwargs,
+        **file_kwargs
+    )
+    tokenizer = T5Tokenizer.from_pretrained(model_dir)
+    return model, tokenizer
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    parser = argparse.ArgumentParser(description="Export Flan-T5 to quantized ONNX")
+    parser.add_argument("--model_id", type=str, default=settings.FLAN_T5_MODEL_ID)
+    parser.add_argument("--output_dir", type=str, default=settings.FLAN_T5_ONNX_PATH)
+    parser.add_argument("--arch", choices=["avx2", "avx512", "avx512_vnni", "arm64"], default=None,
+                        help="Quantization target (default: detected from CPU)")
+    args = parser.parse_args()
+
+    export_onnx_int8(args.model_id, args.output_dir, args.arch)
@@ -1,10 +1,15 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 import logging
 import sys
 
+import metrics
 from config import settings
 from routers import chat, metadata, documents
+from services.readiness import Readiness
 
 # 로깅 설정 - 최상위 레벨에서 설정
 logging.basicConfig(
@@ -16,12 +21,35 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+readiness = Readiness()
+
+async def warm_up():
+    """벡터 DB, 모델, 캐시, 검색 색인, 커넥션 풀 미리 준비 (진행 상황은 /api/ready)"""
+    if settings.WARMUP_ENABLED:
+        await asyncio.gather(
+            chat.chat_service.warm_up(readiness),
+            # 완료 전 검색 요청은 색인 생성이 끝날 때까지 대기
+            readiness.run("search_index", metadata.metadata_service.search_index.build)
+        )
+    readiness.finish()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """시작/종료 훅"""
+    await chat.chat_service.startup()
+    # warm-up은 백그라운드에서 진행 - /api/health는 바로 응답하고 /api/ready는 완료 후 200
+    warm_up_task = asyncio.create_task(warm_up())
+    yield
+    warm_up_task.cancel()
+    await chat.chat_service.shutdown()
+
 # FastAPI 앱 생성
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     docs_url=f"{settings.API_PREFIX}/docs",
-    redoc_url=f"{settings.API_PREFIX}/redoc"
+    redoc_url=f"{settings.API_PREFIX}/redoc",
+    lifespan=lifespan
 )
 
 # CORS 설정
@@ -31,6 +59,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 브라우저 JS가 읽을 수 있도록 페이지 커서/재시도 헤더 노출
+    expose_headers=["X-Next-Before-Id", "X-Next-After-Id", "X-Next-Cursor", "Retry-After"],
 )
 
 # 라우터 등록
@@ -52,6 +82,16 @@ async def health_check():
     """헬스 체크"""
     return {"status": "healthy"}
 
+@app.get(f"{settings.API_PREFIX}/metrics")
+async def prometheus_metrics():
+    """Prometheus 메트릭 (text format)"""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE_LATEST)
+
+@app.get(f"{settings.API_PREFIX}/ready")
+async def readiness_check():
+    """준비 상태 - warm-up 단계별 상태와 소요 시간 (준비 전에는 503)"""
+    return JSONResponse(readiness.snapshot(), status_code=200 if readiness.ready else 503)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000, reload=settings.DEBUG)
\ No newline at end of file
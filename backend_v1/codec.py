@@ -0,0 +1,21 @@
+"""orjson 기반 JSON 인코딩/디코딩 (응답, SSE 청크, DB JSON 컬럼 공용)"""
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+def dumps(obj: Any) -> bytes:
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+def dumps_str(obj: Any) -> str:
+    """문자열이 필요한 곳(SQLAlchemy json_serializer, SSE)용"""
+    return dumps(obj).decode("utf-8")
+
+def loads(data: Any) -> Any:
+    return orjson.loads(data)
+
+class ORJSONResponse(JSONResponse):
+    """orjson으로 렌더링하는 JSON 응답"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
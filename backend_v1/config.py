@@ -13,11 +13,30 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL")
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL", "")  # 비어 있으면 DATABASE_URL에서 변환
     VECTOR_DB_PATH: str = os.getenv("VECTOR_DB_PATH", "../data/vectors")
+
+    # Metadata cache (/countries, /topics, /sources)
+    METADATA_CACHE_TTL: float = 300  # 초, 0이면 캐시 사용 안 함
+    METADATA_BROWSER_MAX_AGE: int = 0  # 브라우저는 매번 ETag로 재검증
+    SEARCH_INDEX_REFRESH_SECONDS: float = 60  # 문서 검색 색인이 DB의 (문서 수, 최대 id)와 같은지 확인하는 주기
+
+    # Example questions (/chat/examples)
+    EXAMPLE_QUESTIONS_LIMIT: int = 5
+    CATALOG_REFRESH_SECONDS: float = 300  # 예시 질문/출처 조회 테이블 재빌드 주기 (다른 프로세스의 FAQ/문서 변경 반영)
+
+    # Message persistence
+    MESSAGE_PERSISTENCE: str = os.getenv("MESSAGE_PERSISTENCE", "sync")  # sync: 응답 전 커밋, write_behind: 응답 후 일괄 저장
+    MESSAGE_WRITE_BATCH_SIZE: int = 100
+    MESSAGE_WRITE_FLUSH_INTERVAL: float = 0.2  # 초
+    MESSAGE_WRITE_QUEUE_SIZE: int = 10000
+    MESSAGE_WRITE_MAX_RETRIES: int = 5        # DB 오류 시 배치 저장 재시도 횟수
+    MESSAGE_WRITE_RETRY_BACKOFF: float = 0.5  # 초, 재시도마다 두 배 (0.5, 1, 2, 4, 8)
     
     # OpenAI
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY")
     EMBEDDING_MODEL: str = "text-embedding-3-small"
+    EMBEDDING_DIMENSIONS: int = 384
     
     # Google
     GOOGLE_API_KEY: str = os.getenv("GOOGLE_API_KEY", "")
@@ -26,7 +45,81 @@ class Settings(BaseSettings):
     DEFAULT_LLM_MODEL: str = "gpt-4"
     MAX_CONTEXT_TOKENS: int = 3000
     TOP_K_RESULTS: int = 5
-    
+    SUPPORTED_MODELS: list = ["gpt-3.5-turbo", "gpt-4", "flan-t5-base"]  # 요청에서 지정할 수 있는 model_id (supported_models 참고)
+
+    # Retrieval (etc/bench_retrieval.py로 품질/지연시간 비교 후 조정)
+    RETRIEVAL_SEARCH_TYPE: str = "mmr"  # mmr, similarity
+    RETRIEVAL_FETCH_K: int = 20         # mmr 후보 수
+    RETRIEVAL_MMR_LAMBDA: float = 0.5   # 1에 가까울수록 관련도, 0에 가까울수록 다양성
+    RETRIEVAL_CONTEXT_DOCS: int = 3     # 프롬프트 컨텍스트에 넣을 문서 수
+
+    # Retrieval memory (후속 질문은 직전 턴의 검색 후보를 재사용/병합)
+    RETRIEVAL_MEMORY_ENABLED: bool = False  # 켜기 전에 etc/bench_retrieval.py --follow_up으로 후속 질문 recall/MRR 확인
+    RETRIEVAL_MEMORY_CONVERSATIONS: int = 500     # 검색 상태를 보관하는 대화 수 (LRU)
+    RETRIEVAL_MEMORY_MAX_CHUNKS: int = 40         # 대화별로 보관하는 후보 청크 수
+    RETRIEVAL_MEMORY_MIN_SCORE: float = 0.45      # 보관된 후보가 이 코사인 유사도 이상이면 재사용 대상
+    RETRIEVAL_FOLLOW_UP_MAX_WORDS: int = 6        # 이 단어 수 이하인 (영어) 질문은 후속 질문으로 봄
+    RETRIEVAL_FOLLOW_UP_SIMILARITY: float = 0.5   # 직전 질문과 이 이상 비슷해도 후속 질문
+    RETRIEVAL_FOLLOW_UP_WEIGHT: float = 0.5       # 후속 질문 임베딩에 섞는 직전 질문 임베딩 비중
+
+    # Admission control (모델별 동시 생성 수 / 대기열, 초과 시 429 + Retry-After)
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_CONCURRENCY: int = 16   # 모델별 동시 생성 수
+    ADMISSION_MAX_QUEUE: int = 64         # 모델별 대기 요청 수, 넘으면 바로 429
+    ADMISSION_QUEUE_TIMEOUT: float = 10.0 # 초, 이 시간 안에 슬롯을 못 얻으면 429
+    ADMISSION_MODEL_LIMITS: dict = {}     # 모델별 동시 생성 수 (예: {"cometlee39/finetuned-flan-t5-base": 2})
+
+    # Single-flight (이전 대화 없는 동일 질문의 동시 요청은 검색/생성 한 번만 실행)
+    SINGLE_FLIGHT_ENABLED: bool = True
+
+    # Precomputed FAQ answers (etc/precompute_faq_answers.py로 생성, FAQ와 정확히 같은 질문은 바로 응답)
+    FAQ_ANSWERS_ENABLED: bool = True
+    FAQ_ANSWERS_REFRESH_SECONDS: int = 300  # 새로 생성된 답변/인덱스 버전 변경을 다시 읽는 주기
+
+    # Batch chat (/chat/batch)
+    BATCH_MAX_ITEMS: int = 1000
+    BATCH_CONCURRENCY: int = 4       # 배치 하나가 동시에 생성하는 답변 수 (생성 슬롯은 일반 요청과 공유)
+    BATCH_MAX_RETRIES: int = 3       # 생성 슬롯을 못 얻었을 때 Retry-After 만큼 기다렸다 다시 시도하는 횟수
+
+    # WebSocket chat (/chat/ws)
+    WS_MAX_IN_FLIGHT: int = 4  # 연결 하나에서 동시에 처리하는 메시지 수
+
+    # Conversation history
+    HISTORY_MAX_TOKENS: int = 1500  # 프롬프트에 포함할 최근 대화 토큰 수
+    HISTORY_CACHE_MAX_TURNS: int = 50  # DB에서 읽는 최근 턴 수, 요약 실패 시 창 밖에 보관하는 최대 턴 수
+    HISTORY_CACHE_MAX_CONVERSATIONS: int = 10000
+    HISTORY_PAGE_SIZE: int = 50        # GET /chat/history 기본 페이지 크기
+    HISTORY_MAX_PAGE_SIZE: int = 500
+    HISTORY_YIELD_PER: int = 100       # 서버 사이드 커서 fetch 단위
+
+    # Conversation summary
+    SUMMARY_MODEL: str = "gpt-3.5-turbo"
+    SUMMARY_TRIGGER_TOKENS: int = 1500  # 프롬프트 창(HISTORY_MAX_TOKENS) 밖으로 밀려난 턴이 이 토큰 수 이상이면 요약
+    SUMMARY_MAX_TOKENS: int = 400
+
+    # Flan-T5
+    FLAN_T5_MODEL_ID: str = "cometlee39/finetuned-flan-t5-base"
+    FLAN_T5_TOKENIZER_ID: str = "google/flan-t5-base"
+    FLAN_T5_BACKEND: str = os.getenv("FLAN_T5_BACKEND", "torch")  # torch, onnx
+    FLAN_T5_ONNX_PATH: str = os.getenv("FLAN_T5_ONNX_PATH", "../data/models/flan-t5-onnx-int8")
+    FLAN_T5_WORKERS: int = 1
+    FLAN_T5_MAX_BATCH: int = 8  # 동시에 대기 중인 같은 디코딩 프로필 요청을 한 번의 generate로 묶는 최대 수
+
+    # Decoding profiles (fast, balanced, quality, auto)
+    DECODING_PROFILE: str = os.getenv("DECODING_PROFILE", "auto")
+    DECODING_BALANCED_QUEUE_DEPTH: int = 2  # auto: 대기 중인 T5 요청이 이 이상이면 balanced
+    DECODING_FAST_QUEUE_DEPTH: int = 4      # auto: 대기 중인 T5 요청이 이 이상이면 fast
+
+    # Startup warm-up (/api/ready)
+    WARMUP_ENABLED: bool = True
+    WARMUP_CONNECTIONS: bool = True  # OpenAI 임베딩/채팅 API 커넥션을 미리 열어둠
+    PRELOAD_MODELS: list = []        # 시작 시 미리 로드할 model_id (예: ["cometlee39/finetuned-flan-t5-base"])
+
+    # Mock providers (부하 테스트: 외부 API 대신 지연시간만 흉내)
+    MOCK_PROVIDERS: bool = False
+    MOCK_LATENCY_SCALE: float = 1.0
+    MOCK_ERROR_RATE: float = 0.0
+
     # Document Processing
     CHUNK_SIZE: int = 1000
     CHUNK_OVERLAP: int = 200
@@ -34,6 +127,11 @@ class Settings(BaseSettings):
     # CORS
     CORS_ORIGINS: list = ["http://localhost:3000", "http://localhost:5173"]
     
+    @property
+    def supported_models(self) -> set:
+        """요청 model_id 허용 목록 - 목록 밖의 모델은 422 (모델 인스턴스/메트릭 라벨이 무한히 늘지 않도록)"""
+        return {*self.SUPPORTED_MODELS, self.DEFAULT_LLM_MODEL, self.FLAN_T5_MODEL_ID, *self.PRELOAD_MODELS}
+    
     class Config:
         env_file = ".env"
 
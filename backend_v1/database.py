@@ -1,14 +1,44 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, ForeignKey, Index, JSON
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
 
+import codec
 from config import settings
 
-engine = create_engine(settings.DATABASE_URL)
+# 동기 드라이버 -> async 드라이버
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+def get_async_database_url(url: str) -> str:
+    """DATABASE_URL을 async 드라이버 URL로 변환"""
+    url = make_url(url)
+    drivername = ASYNC_DRIVERS.get(url.drivername, url.drivername)
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+# JSON 컬럼은 orjson으로 직렬화
+JSON_CODEC = {"json_serializer": codec.dumps_str, "json_deserializer": codec.loads}
+
+engine = create_engine(settings.DATABASE_URL, **JSON_CODEC)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# 채팅 경로용 async 엔진/세션
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL),
+    pool_pre_ping=True,
+    **JSON_CODEC
+)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 def get_db():
     db = SessionLocal()
     try:
@@ -16,6 +46,10 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 class Document(Base):
     """문서 정보 및 벡터 메타데이터"""
     __tablename__ = "documents"
@@ -29,6 +63,11 @@ class Document(Base):
     source = Column(String(200))               # 출처 정보
     
     created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # 국가/토픽별 목록의 id 기준 keyset 페이지네이션용
+    __table_args__ = (
+        Index("ix_documents_country_topic_id", "country", "topic", "id"),
+    )
 
 class Conversation(Base):
     """대화 세션"""
@@ -41,6 +80,11 @@ class Conversation(Base):
     country = Column(String(100))
     topic = Column(String(100))
     
+    # 누적 요약 (id가 summarized_until_id 이하인 메시지의 요약)
+    # DATETIME은 초 단위라 같은 초의 메시지를 구분하지 못하므로 경계는 메시지 id로 저장
+    summary = Column(Text)
+    summarized_until_id = Column(Integer)
+    
     created_at = Column(DateTime, default=datetime.utcnow)
     
     messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan")
@@ -54,12 +98,18 @@ class Message(Base):
     role = Column(String(20))  # user, assistant
     content = Column(Text)
     
-    # RAG 참조 (JSON 형태로 저장)
-    references = Column(Text)  # JSON string
+    # RAG 참조 [{id, title, url, ...}] - MySQL은 네이티브 JSON 타입, 기존 TEXT 컬럼의 JSON 문자열도 그대로 읽힘
+    # 참조가 없으면 쓰는 쪽에서 None을 넘겨 SQL NULL로 저장 ([]는 '[]'로 저장됨), 읽을 때 `or []`
+    references = Column(JSON(none_as_null=True))
     
     created_at = Column(DateTime, default=datetime.utcnow)
     
     conversation = relationship("Conversation", back_populates="messages")
+    
+    # 대화별 기록 조회/페이지네이션용 (InnoDB 보조 인덱스는 PK(id)를 포함)
+    __table_args__ = (
+        Index("ix_messages_conversation_created", "conversation_id", "created_at"),
+    )
 
 class FAQ(Base):
     """FAQ"""
@@ -71,6 +121,25 @@ class FAQ(Base):
     topic = Column(String(100), index=True)    # 토픽 (visa, insurance 등)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+class FAQAnswer(Base):
+    """FAQ 질문의 미리 생성한 답변 (etc/precompute_faq_answers.py)"""
+    __tablename__ = "faq_answers"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    faq_id = Column(Integer, ForeignKey("faqs.id", ondelete="CASCADE"), nullable=False)
+    model_id = Column(String(100), nullable=False)
+    question_key = Column(Text, nullable=False)  # 생성 당시 정규화된 질문 (FAQ가 수정되면 다시 생성)
+    country = Column(String(100))  # 검색 파티션 (벡터 DB 태그의 국가)
+    topic = Column(String(100))    # 검색 파티션 (문서 타입)
+    answer = Column(Text, nullable=False)
+    references = Column(JSON(none_as_null=True))
+    index_version = Column(String(64), nullable=False)  # 생성 당시 벡터 인덱스 버전 - 다르면 제공하지 않음
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ux_faq_answers_faq_model", "faq_id", "model_id", unique=True),
+    )
+
 # 자주 사용하는 값들은 코드에서 관리
 COUNTRIES = [
     {"emoji": "🇺🇸", "name_kr": "미국", "name_en": "America"},
@@ -0,0 +1,117 @@
+"""동기 Session vs AsyncSession 동시성 벤치마크
+
+사용법:
+    python etc/bench_async_db.py --turns 500 --concurrency 50
+    python etc/bench_async_db.py --database_url sqlite:///./bench.sqlite3
+
+채팅 한 턴(사용자 메시지 저장 → 기록 조회 → LLM 대기 → 응답 저장)을 동시에 실행하고
+처리량, 턴 지연시간, 이벤트 루프 지연(블로킹 정도)을 비교합니다.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from config import settings
+from database import Base, Conversation, Message, get_async_database_url
+from etc.bench_utils import latency_summary
+
+async def sync_turn(SessionLocal, conversation_id: int, llm_latency: float):
+    """기존 방식: async 핸들러 안에서 동기 Session 사용"""
+    db = SessionLocal()
+    try:
+        db.add(Message(conversation_id=conversation_id, role="user", content="질문"))
+        db.commit()
+        db.query(Message).filter(Message.conversation_id == conversation_id).order_by(Message.created_at).all()
+        db.commit()  # LLM 대기 중 읽기 트랜잭션을 잡고 있지 않도록
+        await asyncio.sleep(llm_latency)
+        db.add(Message(conversation_id=conversation_id, role="assistant", content="답변"))
+        db.commit()
+    finally:
+        db.close()
+
+async def async_turn(AsyncSessionLocal, conversation_id: int, llm_latency: float):
+    """AsyncSession 사용"""
+    async with AsyncSessionLocal() as db:
+        db.add(Message(conversation_id=conversation_id, role="user", content="질문"))
+        await db.commit()
+        await db.execute(
+            select(Message).where(Message.conversation_id == conversation_id).order_by(Message.created_at)
+        )
+        await db.commit()
+        await asyncio.sleep(llm_latency)
+        db.add(Message(conversation_id=conversation_id, role="assistant", content="답변"))
+        await db.commit()
+
+async def monitor_loop_lag(stop: asyncio.Event, lags: list, interval: float = 0.01):
+    """이벤트 루프가 예정보다 늦게 깨어난 시간 기록"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+async def run(name: str, turn, session_factory, conversation_ids, turns: int, concurrency: int, llm_latency: float):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, lags = [], []
+    stop = asyncio.Event()
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await turn(session_factory, conversation_ids[i % len(conversation_ids)], llm_latency)
+            latencies.append(time.perf_counter() - start)
+
+    monitor = asyncio.create_task(monitor_loop_lag(stop, lags))
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(turns)))
+    wall = time.perf_counter() - start
+    stop.set()
+    await monitor
+
+    summary = latency_summary(latencies)
+    print(f"{name:<6} wall {wall:6.2f}s  {turns / wall:7.1f} turns/s  "
+          f"p50 {summary['p50_ms']:7.1f}ms  p95 {summary['p95_ms']:7.1f}ms  "
+          f"max loop lag {max(lags, default=0) * 1000:7.1f}ms")
+
+async def main():
+    parser = argparse.ArgumentParser(description="Sync vs async SQLAlchemy concurrency benchmark")
+    parser.add_argument("--database_url", type=str, default=settings.DATABASE_URL)
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--conversations", type=int, default=50)
+    parser.add_argument("--llm_latency_ms", type=float, default=50, help="LLM 호출 대기 시간 모의값")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+    async_engine = create_async_engine(get_async_database_url(args.database_url))
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    # 벤치마크용 대화 생성
+    with SessionLocal() as db:
+        conversations = [Conversation(session_id=f"bench-{i}", country="japan", topic="visa") for i in range(args.conversations)]
+        db.add_all(conversations)
+        db.commit()
+        conversation_ids = [c.id for c in conversations]
+
+    llm_latency = args.llm_latency_ms / 1000
+    print(f"{args.turns} turns, concurrency {args.concurrency}, simulated LLM {args.llm_latency_ms:.0f}ms")
+    await run("sync", sync_turn, SessionLocal, conversation_ids, args.turns, args.concurrency, llm_latency)
+    await run("async", async_turn, AsyncSessionLocal, conversation_ids, args.turns, args.concurrency, llm_latency)
+
+    # 정리
+    with SessionLocal() as db:
+        db.query(Message).filter(Message.conversation_id.in_(conversation_ids)).delete(synchronize_session=False)
+        db.query(Conversation).filter(Conversation.id.in_(conversation_ids)).delete(synchronize_session=False)
+        db.commit()
+    await async_engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
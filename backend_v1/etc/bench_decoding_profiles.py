@@ -0,0 +1,98 @@
+"""Flan-T5 디코딩 프로필별 지연시간/품질 벤치마크
+
+사용법:
+    python etc/bench_decoding_profiles.py --num_questions 100
+    python etc/bench_decoding_profiles.py --backend onnx --output profiles.json
+
+fine_tuning/qa_pairs.json의 질문+컨텍스트로 각 프로필(fast, balanced, quality)을 실행하고
+지연시간(p50/p95), 생성 토큰 수, 참조 답변 대비 token F1을 표로 출력합니다.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse
+import json
+import statistics
+import time
+
+import torch
+from transformers import T5ForConditionalGeneration, T5Tokenizer
+
+from config import settings
+from ai_services.decoding import DECODING_PROFILES, generation_kwargs
+from etc.bench_utils import latency_summary, token_f1
+
+QA_PAIRS_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "ai_services", "fine_tuning", "qa_pairs.json"
+)
+
+def load_samples(path: str, limit: int):
+    """(프롬프트, 참조 답변) 목록 로드 - LLM의 Flan-T5 프롬프트 형식과 동일"""
+    with open(path, "r", encoding="utf-8") as f:
+        qa_pairs = json.load(f)
+    samples = []
+    for qa in qa_pairs[:limit]:
+        prompt = f"Answer the following question about travel:\n\nQuestion: {qa['question']}\n"
+        if qa.get("context"):
+            prompt += f"Context: {qa['context']}\n"
+        prompt += "Answer:"
+        samples.append((prompt, qa["answer"]))
+    return samples
+
+def load_model(backend: str):
+    if backend == "onnx":
+        from ai_services.t5_onnx import load_onnx_int8
+        return load_onnx_int8(settings.FLAN_T5_ONNX_PATH)
+    tokenizer = T5Tokenizer.from_pretrained(settings.FLAN_T5_TOKENIZER_ID)
+    model = T5ForConditionalGeneration.from_pretrained(settings.FLAN_T5_MODEL_ID).eval()
+    return model, tokenizer
+
+def run_profile(model, tokenizer, samples, profile: str):
+    latencies, tokens, scores = [], [], []
+    kwargs = generation_kwargs(profile, tokenizer)
+    for prompt, reference in samples:
+        inputs = tokenizer(prompt, max_length=512, truncation=True, return_tensors="pt")
+        start = time.perf_counter()
+        with torch.no_grad():
+            outputs = model.generate(inputs["input_ids"], attention_mask=inputs["attention_mask"], **kwargs)
+        latencies.append(time.perf_counter() - start)
+        tokens.append(int(outputs.shape[-1]))
+        scores.append(token_f1(tokenizer.decode(outputs[0], skip_special_tokens=True), reference))
+    return {
+        "profile": profile,
+        **latency_summary(latencies),
+        "mean_tokens": statistics.mean(tokens),
+        "token_f1": statistics.mean(scores)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Flan-T5 decoding profile benchmark")
+    parser.add_argument("--num_questions", type=int, default=100)
+    parser.add_argument("--backend", choices=["torch", "onnx"], default=settings.FLAN_T5_BACKEND)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=str, default=None, help="JSON 결과 파일 경로")
+    args = parser.parse_args()
+
+    torch.manual_seed(args.seed)
+    samples = load_samples(QA_PAIRS_FILE, args.num_questions)
+    model, tokenizer = load_model(args.backend)
+    print(f"Benchmarking {len(samples)} questions on {args.backend}")
+
+    rows = []
+    for profile in DECODING_PROFILES:
+        run_profile(model, tokenizer, samples[:2], profile)  # 워밍업
+        rows.append(run_profile(model, tokenizer, samples, profile))
+
+    print("\n| profile  | p50 (ms) | p95 (ms) | tokens | token F1 |")
+    print("|----------|----------|----------|--------|----------|")
+    for row in rows:
+        print(f"| {row['profile']:<8} | {row['p50_ms']:>8.0f} | {row['p95_ms']:>8.0f} "
+              f"| {row['mean_tokens']:>6.1f} | {row['token_f1']:>8.3f} |")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"backend": args.backend, "num_questions": len(samples), "profiles": rows}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
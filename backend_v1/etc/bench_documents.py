@@ -0,0 +1,103 @@
+"""문서 목록(/documents/{country}/{topic}) 페이지네이션 벤치마크
+
+사용법:
+    python etc/bench_documents.py --documents 1000000
+    python etc/bench_documents.py --database_url mysql+pymysql://user:pw@host/db --skip_seed
+
+같은 깊이의 페이지를 OFFSET/LIMIT + ORM 전체 행 조회(기존 방식)와
+(country, topic, id) keyset + 컬럼 프로젝션(MetadataService)으로 각각 읽어 지연시간을 비교합니다.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse
+import json
+import time
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, Document
+from etc.bench_utils import latency_summary, seed_documents
+from schemas import DocumentResponse
+from services.metadata import MetadataService
+
+def offset_page(db, country: str, topic: str, page: int, limit: int):
+    """기존 방식: OFFSET 페이지네이션 + ORM 전체 행"""
+    documents = (
+        db.query(Document)
+        .filter(Document.country == country, Document.topic == topic)
+        .order_by(Document.id)
+        .offset(page * limit)
+        .limit(limit)
+        .all()
+    )
+    return [DocumentResponse.model_validate(doc) for doc in documents]
+
+def main():
+    parser = argparse.ArgumentParser(description="Document listing pagination benchmark")
+    parser.add_argument("--database_url", type=str, default="sqlite:///./bench_documents.sqlite3")
+    parser.add_argument("--documents", type=int, default=1000000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--depths", type=str, default="0,10,100,1000,3000", help="측정할 페이지 번호 (0부터)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--skip_seed", action="store_true")
+    parser.add_argument("--output", type=str, default="")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+    if not args.skip_seed:
+        print(f"Seeding {args.documents} documents...")
+        # 일부 국가/토픽에 문서가 몰리도록
+        seed_documents(SessionLocal, args.documents, skewed=True)
+
+    service = MetadataService()
+    results = {}
+    with SessionLocal() as db:
+        # 문서가 가장 많은 국가/토픽 조합으로 측정
+        country, topic, total = db.execute(
+            select(Document.country, Document.topic, func.count(Document.id))
+            .group_by(Document.country, Document.topic)
+            .order_by(func.count(Document.id).desc())
+            .limit(1)
+        ).one()
+        print(f"Listing {country}/{topic} ({total} documents)")
+
+        # keyset 커서는 순서대로 넘기며 각 깊이의 after_id를 미리 구함
+        depths = sorted(int(d) for d in args.depths.split(","))
+        cursors, after_id, page = {}, None, 0
+        while page <= depths[-1]:
+            if page in depths:
+                cursors[page] = after_id
+            _, after_id = service.get_documents_by_filter(country, topic, after_id=after_id, limit=args.limit, db=db)
+            if after_id is None:
+                break
+            page += 1
+
+        for depth in depths:
+            if depth not in cursors:
+                print(f"page {depth}: not enough documents, skipped")
+                continue
+            offset_latencies, keyset_latencies = [], []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                offset_page(db, country, topic, depth, args.limit)
+                offset_latencies.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                service.get_documents_by_filter(country, topic, after_id=cursors[depth], limit=args.limit, db=db)
+                keyset_latencies.append(time.perf_counter() - start)
+            results[f"page_{depth}"] = {
+                "offset": latency_summary(offset_latencies),
+                "keyset": latency_summary(keyset_latencies),
+            }
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
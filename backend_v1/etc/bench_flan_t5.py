@@ -0,0 +1,119 @@
+"""Flan-T5 fp32(PyTorch) vs ONNX int8 추론 벤치마크
+
+사용법:
+    python ai_services/t5_onnx.py          # 양자화 모델 먼저 내보내기
+    python etc/bench_flan_t5.py --num_questions 50
+
+속도(latency, tokens/sec)와 두 모델 답변의 동일성(exact match, token F1)을 비교합니다.
+비교를 위해 샘플링 없이 greedy 디코딩을 사용합니다.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse
+import json
+import statistics
+import time
+
+import torch
+from transformers import T5ForConditionalGeneration, T5Tokenizer
+
+from config import settings
+from ai_services.t5_onnx import load_onnx_int8
+from etc.bench_utils import percentile, token_f1
+
+QUESTIONS_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "ai_services", "fine_tuning", "questions.json"
+)
+
+def load_prompts(path: str, limit: int):
+    """벤치마크용 프롬프트 로드"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    questions = [q["question"] for q in data["questions"]]
+    # 중복 제거 후 앞에서부터 사용
+    unique = list(dict.fromkeys(questions))[:limit]
+    return [f"Answer the following question about travel:\n\nQuestion: {q}\nAnswer:" for q in unique]
+
+def run(model, tokenizer, prompts, max_new_tokens: int):
+    """프롬프트별 응답, 지연시간, 생성 토큰 수 측정"""
+    results = []
+    for prompt in prompts:
+        inputs = tokenizer(prompt, max_length=512, truncation=True, return_tensors="pt")
+        start = time.perf_counter()
+        with torch.no_grad():
+            outputs = model.generate(
+                inputs["input_ids"],
+                attention_mask=inputs["attention_mask"],
+                max_new_tokens=max_new_tokens,
+                num_beams=1,
+                do_sample=False
+            )
+        elapsed = time.perf_counter() - start
+        results.append({
+            "answer": tokenizer.decode(outputs[0], skip_special_tokens=True),
+            "latency": elapsed,
+            "tokens": int(outputs.shape[-1])
+        })
+    return results
+
+def summarize(name: str, results):
+    latencies = [r["latency"] for r in results]
+    total_tokens = sum(r["tokens"] for r in results)
+    return {
+        "backend": name,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "tokens_per_sec": total_tokens / sum(latencies)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Flan-T5 fp32 vs ONNX int8 benchmark")
+    parser.add_argument("--num_questions", type=int, default=50)
+    parser.add_argument("--max_new_tokens", type=int, default=128)
+    parser.add_argument("--onnx_dir", type=str, default=settings.FLAN_T5_ONNX_PATH)
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    parser.add_argument("--output", type=str, default=None, help="JSON 결과 파일 경로")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    prompts = load_prompts(QUESTIONS_FILE, args.num_questions)
+    print(f"Benchmarking {len(prompts)} prompts (max_new_tokens={args.max_new_tokens})")
+
+    # fp32 PyTorch
+    tokenizer = T5Tokenizer.from_pretrained(settings.FLAN_T5_TOKENIZER_ID)
+    fp32_model = T5ForConditionalGeneration.from_pretrained(settings.FLAN_T5_MODEL_ID).eval()
+    run(fp32_model, tokenizer, prompts[:2], args.max_new_tokens)  # 워밍업
+    fp32_results = run(fp32_model, tokenizer, prompts, args.max_new_tokens)
+    del fp32_model
+
+    # ONNX int8
+    onnx_model, onnx_tokenizer = load_onnx_int8(args.onnx_dir)
+    run(onnx_model, onnx_tokenizer, prompts[:2], args.max_new_tokens)  # 워밍업
+    onnx_results = run(onnx_model, onnx_tokenizer, prompts, args.max_new_tokens)
+
+    rows = [summarize("torch-fp32", fp32_results), summarize("onnx-int8", onnx_results)]
+    exact = sum(a["answer"].strip() == b["answer"].strip() for a, b in zip(fp32_results, onnx_results))
+    f1 = statistics.mean(token_f1(a["answer"], b["answer"]) for a, b in zip(fp32_results, onnx_results))
+
+    print(f"\n{'backend':<12} {'p50 (ms)':>10} {'p95 (ms)':>10} {'tokens/s':>10}")
+    for row in rows:
+        print(f"{row['backend']:<12} {row['p50_ms']:>10.1f} {row['p95_ms']:>10.1f} {row['tokens_per_sec']:>10.1f}")
+    print(f"\nSpeedup (p50): {rows[0]['p50_ms'] / rows[1]['p50_ms']:.2f}x")
+    print(f"Answer equivalence: exact match {exact}/{len(prompts)}, mean token F1 {f1:.3f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "num_prompts": len(prompts),
+                "max_new_tokens": args.max_new_tokens,
+                "backends": rows,
+                "exact_match": exact / len(prompts),
+                "token_f1": f1
+            }, f, indent=2)
+
+if __name__ == "__main__":
+    main()
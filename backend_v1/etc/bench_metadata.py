@@ -0,0 +1,90 @@
+"""메타데이터 엔드포인트(/countries, /topics, /sources) 처리량 벤치마크
+
+사용법:
+    python etc/bench_metadata.py --documents 200000 --requests 2000
+    python etc/bench_metadata.py --database_url mysql+pymysql://user:pw@host/db --skip_seed
+
+캐시 없음 / 서버 캐시 / 서버 캐시 + If-None-Match(304) 세 가지 경우의 초당 요청 수를 비교합니다.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, get_db
+from etc.bench_utils import seed_documents
+from routers import metadata
+
+ENDPOINTS = ["/api/countries", "/api/topics", "/api/sources"]
+
+async def run(client: httpx.AsyncClient, requests: int, concurrency: int, conditional: bool):
+    etags = {}
+    if conditional:
+        for path in ENDPOINTS:
+            etags[path] = (await client.get(path)).headers["etag"]
+
+    semaphore = asyncio.Semaphore(concurrency)
+    statuses = {}
+
+    async def one(i: int):
+        path = ENDPOINTS[i % len(ENDPOINTS)]
+        headers = {"If-None-Match": etags[path]} if conditional else {}
+        async with semaphore:
+            response = await client.get(path, headers=headers)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return requests / (time.perf_counter() - start), statuses
+
+async def main():
+    parser = argparse.ArgumentParser(description="Metadata endpoint cache benchmark")
+    parser.add_argument("--database_url", type=str, default="sqlite:///./bench_metadata.sqlite3")
+    parser.add_argument("--documents", type=int, default=200000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--skip_seed", action="store_true")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+    if not args.skip_seed:
+        print(f"Seeding {args.documents} documents...")
+        seed_documents(SessionLocal, args.documents)
+
+    def get_bench_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(metadata.router, prefix="/api")
+    app.dependency_overrides[get_db] = get_bench_db
+
+    service = metadata.metadata_service
+    cases = [
+        ("no cache", 0, False),
+        ("cache", 300, False),
+        ("cache + 304", 300, True),
+    ]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"\n{'case':<12} {'req/s':>10}  statuses")
+        for name, ttl, conditional in cases:
+            service.ttl = ttl
+            service.invalidate()
+            rate, statuses = await run(client, args.requests, args.concurrency, conditional)
+            print(f"{name:<12} {rate:>10.1f}  {statuses}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
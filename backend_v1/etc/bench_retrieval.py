@@ -0,0 +1,520 @@
+"""RAG 검색 품질/지연시간 벤치마크 (recall@k, MRR, 질의별 지연시간, 인덱스 메모리)
+
+사용법:
+    # 오프라인 (해싱 임베딩) - 청크 크기 / MMR 비교
+    python etc/bench_retrieval.py --output base.json
+    python etc/bench_retrieval.py --chunk_size 500 --chunk_overlap 100 --baseline base.json
+
+    # OpenAI 임베딩 (처음 한 번만 API 호출, 이후 --embedding_cache에서 재사용)
+    python etc/bench_retrieval.py --embeddings openai --dimensions 384 --output openai.json
+
+    # 후속 질문 검색 (RETRIEVAL_MEMORY_ENABLED 켜기 전 확인, RETRIEVAL_FOLLOW_UP_* 환경 변수로 설정 비교)
+    python etc/bench_retrieval.py --embeddings openai --dimensions 384 --follow_up --output follow_up.json
+
+question_generator.py의 기본 질문 템플릿마다 답이 되는 단락을 가진 국가/토픽별 고정 문서를 만들고,
+RAG와 같은 분할기/Chroma/MMR 설정(RAG.retrieve)으로 색인/검색합니다.
+질문의 정답은 해당 단락과 겹치는 청크이며, --baseline을 주면 이전 결과와 차이를 출력하고
+품질 하락/지연시간 증가가 허용치를 넘으면 회귀로 표시합니다(--fail_on_regression이면 종료 코드 1).
+
+--follow_up이면 같은 국가/토픽 대화에서 첫 질문 다음에 이어지는 질문을 단독 검색(RAG.retrieve)과
+대화 검색(RAG.retrieve_in_conversation, 직전 턴 상태 재사용)으로 각각 검색해 비교합니다.
+이어지는 질문은 국가/주제를 생략한 짧은 질문("How much does it cost?")과 생략하지 않은 새 질문 두 가지이며,
+대화 검색이 생략된 질문은 더 잘 찾고 새 질문은 덜 찾지 않는지, 벡터 검색을 얼마나 생략하는지 확인합니다.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse
+import hashlib
+import json
+import random
+import re
+import shutil
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Set, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from config import settings
+from ai_services.fine_tuning.question_generator import QuestionGenerator
+from etc.bench_utils import latency_summary
+
+# 토픽 -> RAG doc_type (services/chat.py와 같은 매핑)
+DOC_TYPES = {
+    "visa": "visa_info",
+    "immigration": "immigration_regulations_info",
+    "insurance": "insurance_info",
+    "safety": "immigration_safety_info",
+}
+
+# QuestionGenerator.templates[topic]의 각 질문에 대한 답 단락 (같은 순서)
+PASSAGES = {
+    "visa": [
+        "{country} offers tourist, student, work, working holiday and business visa categories, each with its own conditions of stay.",
+        "To apply, create an online immigration account, complete the application form for {country} and upload your passport scan before booking a biometrics appointment.",
+        "Applicants for {country} must submit a valid passport, recent photographs, bank statements, a return ticket and proof of accommodation.",
+        "The application fee for {country} depends on the category; short-stay tourist permits are the cheapest and fees are non-refundable.",
+        "Most applications for {country} are decided within four to eight weeks, although peak season can add several weeks of waiting.",
+        "An extension in {country} must be lodged before your current permit expires, and you need a genuine reason to remain longer.",
+        "If {country} refuses your application you receive a letter with the reasons and may reapply or request an administrative review.",
+        "Holders of a tourist permit in {country} are not allowed to take paid employment; doing so can lead to cancellation and removal.",
+        "Some {country} permits require proof of travel cover for medical costs during the whole stay.",
+        "The working holiday program of {country} is generally open to applicants aged 18 to 30, and 35 for some nationalities.",
+    ],
+    "immigration": [
+        "Travellers arriving in {country} need a passport valid for the planned stay, an onward ticket and any required entry permit.",
+        "A valid passport is mandatory for all foreign nationals entering {country}; national identity cards are not accepted.",
+        "At the border of {country} officers may ask for your passport, arrival card, accommodation details and evidence of funds.",
+        "Visitors from eligible countries may remain in {country} for up to 90 days without a permit for tourism.",
+        "Customs in {country} require travellers to declare goods above the personal allowance and any commercial items.",
+        "Weapons, narcotics, counterfeit goods and certain plants and animal products are banned from being brought into {country}.",
+        "Cash and monetary instruments worth 10,000 or more in total must be declared to {country} customs on arrival.",
+        "Biosecurity officers in {country} may inspect luggage, and some animals and plants must complete a quarantine period.",
+        "Fresh fruit, meat, dairy and seeds are usually restricted by {country} biosecurity rules, while packaged snacks are often allowed.",
+        "The tax-free allowance in {country} covers limited quantities of alcohol, tobacco and gifts for personal use.",
+    ],
+    "insurance": [
+        "Health cover is compulsory for international students and many long-stay residents in {country}.",
+        "Premiums for a private health plan in {country} vary with age, coverage level and the length of your stay.",
+        "A typical policy in {country} pays for doctor visits, hospital treatment, emergency ambulance and prescription medicine.",
+        "You can buy a plan in {country} directly from an approved insurer online or through your university or employer.",
+        "For a trip to {country}, choose travel cover that includes medical evacuation, trip cancellation and lost baggage.",
+        "Overseas students in {country} usually buy the student health cover recommended by their institution before arrival.",
+        "To claim in {country}, keep all receipts and medical reports and submit the claim form to your insurer within the deadline.",
+        "Pre-existing medical conditions in {country} policies may be excluded or subject to a waiting period.",
+        "Third-party motor liability cover is required by law for every registered vehicle in {country}.",
+        "Without cover, emergency treatment in {country} hospitals is billed in full and can be extremely expensive for visitors.",
+    ],
+    "safety": [
+        "{country} is considered generally safe for visitors, but petty theft happens in crowded tourist spots.",
+        "Violent crime is relatively low in {country}, while pickpocketing and bag snatching are the most common offences.",
+        "Travellers should stay alert in certain districts of {country} at night and follow local advice about unsafe neighbourhoods.",
+        "{country} can experience earthquakes, floods, bushfires or typhoons depending on the region and season.",
+        "Road conditions in {country} differ between cities and rural areas, and drivers must follow local traffic laws strictly.",
+        "In an emergency in {country}, dial the national number for police, fire and ambulance services.",
+        "Routine immunisations should be up to date before visiting {country}, and some regions recommend additional shots.",
+        "Tap water in major cities of {country} is treated, but bottled water is advised in remote areas.",
+        "Keep copies of your documents, use registered taxis and register your trip with your embassy when travelling in {country}.",
+        "If you are robbed in {country}, report it to the police, get a written report and contact your embassy for a replacement passport.",
+    ],
+}
+
+# 단락 사이에 섞는 일반 문장 (청크 크기에 따라 정답 단락이 잘리거나 섞이도록)
+FILLER = [
+    "Information is subject to change without notice.",
+    "Always check the official government website before you travel.",
+    "Requirements can differ for dual nationals and diplomatic passport holders.",
+    "This guide is provided for general information only.",
+    "Local authorities may update procedures during public holidays.",
+    "Contact the nearest embassy or consulate for case-specific advice.",
+]
+
+# QuestionGenerator.templates[topic]의 각 질문을 국가/주제 없이 줄인 후속 질문 (같은 순서)
+FOLLOW_UPS = {
+    "visa": [
+        "What types are there?", "How do I apply?", "What documents are needed?", "How much does it cost?",
+        "How long does it take?", "Can I extend it?", "What if it is rejected?", "Can I work on it?",
+        "Do I need insurance for it?", "Is there an age limit?",
+    ],
+    "immigration": [
+        "What are the requirements?", "Do I need a passport?", "Which documents do I need?", "How long can I stay?",
+        "What about customs?", "What items are prohibited?", "Do I declare money?", "Is there quarantine?",
+        "Can I bring food?", "What is the duty-free allowance?",
+    ],
+    "insurance": [
+        "Is it mandatory?", "How much does it cost?", "What does it cover?", "How do I get it?",
+        "Which travel policy is recommended?", "What about students?", "How do I claim?", "Are pre-existing conditions covered?",
+        "What about cars?", "What if I have none?",
+    ],
+    "safety": [
+        "Is it safe?", "What about crime?", "Which areas should I avoid?", "What about natural disasters?",
+        "Are the roads safe?", "What number do I call?", "Which vaccinations do I need?", "Can I drink the water?",
+        "What precautions should I take?", "What if I am robbed?",
+    ],
+}
+
+# 질문 변형 (QuestionGenerator의 접두사 패턴과 같은 형태)
+QUESTION_PREFIXES = ["As a tourist, ", "For students, ", "For a family trip, "]
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+class HashingEmbeddings(Embeddings):
+    """단어/단어 bigram 해싱 임베딩 - 네트워크 없이 결정적인 벡터"""
+
+    def __init__(self, dimensions: int = 384):
+        self.dimensions = dimensions
+
+    def _embed(self, text: str) -> List[float]:
+        words = _WORD_RE.findall(text.lower())
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+class CachedEmbeddings(Embeddings):
+    """텍스트 해시 -> 벡터 디스크 캐시 (한 번 계산한 임베딩은 오프라인 재사용)"""
+
+    def __init__(self, inner: Embeddings, path: str):
+        self.inner = inner
+        self.path = path
+        self.misses = 0
+        self._cache: Dict[str, List[float]] = {}
+        if os.path.exists(path):
+            data = np.load(path)
+            self._cache = dict(zip(data["keys"].tolist(), data["vectors"].tolist()))
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha1(text.encode()).hexdigest()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        missing = list(dict.fromkeys(text for text in texts if self._key(text) not in self._cache))
+        if missing:
+            self.misses += len(missing)
+            for text, vector in zip(missing, self.inner.embed_documents(missing)):
+                self._cache[self._key(text)] = vector
+        return [self._cache[self._key(text)] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        if key not in self._cache:
+            self.misses += 1
+            self._cache[key] = self.inner.embed_query(text)
+        return self._cache[key]
+
+    def save(self):
+        if not self._cache:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        keys = list(self._cache)
+        np.savez(self.path, keys=np.array(keys), vectors=np.array([self._cache[key] for key in keys], dtype=np.float32))
+
+def build_corpus(countries: List[str], topics: List[str], seed: int) -> List[Dict[str, Any]]:
+    """국가/토픽별 문서 - 단락 순서와 사이 문장은 seed로 고정, 각 단락의 위치(span) 기록"""
+    rng = random.Random(seed)
+    documents = []
+    for country in countries:
+        for topic in topics:
+            order = list(range(len(PASSAGES[topic])))
+            rng.shuffle(order)
+            text, spans = "", {}
+            for section in order:
+                passage = PASSAGES[topic][section].format(country=country)
+                start = len(text)
+                text += passage + " "
+                spans[section] = (start, start + len(passage))
+                text += " ".join(rng.sample(FILLER, rng.randint(1, 3))) + "\n\n"
+            documents.append({"country": country, "topic": topic, "text": text, "spans": spans})
+    return documents
+
+def chunk_corpus(documents: List[Dict[str, Any]], text_splitter) -> Tuple[List[str], List[Dict[str, Any]], Dict[Tuple[str, str, int], Set[str]]]:
+    """RAG 분할기로 청크 생성, 질문 정답 (country, topic, section) -> 청크 id 집합
+
+    단락의 절반 이상을 포함하는 청크를 정답으로 봅니다.
+    """
+    texts, metadatas = [], []
+    relevant = defaultdict(set)
+    for document in documents:
+        country, topic = document["country"], document["topic"]
+        tag_country = country.replace(" ", "").lower()
+        cursor = 0
+        for index, chunk in enumerate(text_splitter.split_text(document["text"])):
+            start = document["text"].find(chunk, cursor)
+            if start < 0:
+                start = document["text"].find(chunk)
+            end = start + len(chunk)
+            cursor = start + 1
+            chunk_id = f"{tag_country}_{topic}_{index}"
+            for section, (section_start, section_end) in document["spans"].items():
+                overlap = min(end, section_end) - max(start, section_start)
+                if overlap * 2 >= section_end - section_start:
+                    relevant[(country, topic, section)].add(chunk_id)
+            texts.append(chunk)
+            metadatas.append({
+                "country": tag_country,
+                "document_type": DOC_TYPES[topic],
+                "tag": f"{tag_country}_{DOC_TYPES[topic]}",
+                "chunk_id": chunk_id,
+            })
+    return texts, metadatas, dict(relevant)
+
+def build_queries(countries: List[str], topics: List[str], variants: int) -> List[Dict[str, Any]]:
+    """QuestionGenerator 기본 템플릿 (+ 접두사 변형) 질문과 정답 키"""
+    templates = QuestionGenerator().templates
+    queries = []
+    for country in countries:
+        for topic in topics:
+            for section, template in enumerate(templates[topic][:len(PASSAGES[topic])]):
+                question = template.format(country=country)
+                forms = [question] + [prefix + question[0].lower() + question[1:] for prefix in QUESTION_PREFIXES[:variants]]
+                for form in forms:
+                    queries.append({"query": form, "country": country, "topic": topic, "key": (country, topic, section)})
+    return queries
+
+def evaluate(rag, queries, relevant, k: int, ks: List[int], filter_mode: str) -> Dict[str, Any]:
+    latencies = []
+    recalls = defaultdict(list)
+    reciprocal_ranks = []
+    per_topic = defaultdict(lambda: {"recall": [], "rr": []})
+    for item in queries:
+        country = item["country"].replace(" ", "").lower()
+        doc_type = DOC_TYPES[item["topic"]]
+        if filter_mode == "tag":
+            filters = (country, doc_type)
+        elif filter_mode == "country":
+            filters = (country, None)
+        else:
+            filters = (None, None)
+
+        start = time.perf_counter()
+        docs = rag.retrieve(item["query"], *filters, k=k)
+        latencies.append(time.perf_counter() - start)
+
+        ranked = [doc.metadata.get("chunk_id") for doc in docs]
+        answers = relevant.get(item["key"], set())
+        rank = next((i + 1 for i, chunk_id in enumerate(ranked) if chunk_id in answers), None)
+        reciprocal_ranks.append(1 / rank if rank else 0.0)
+        for cutoff in ks:
+            recalls[cutoff].append(len(answers & set(ranked[:cutoff])) / len(answers) if answers else 0.0)
+        per_topic[item["topic"]]["recall"].append(recalls[k][-1])
+        per_topic[item["topic"]]["rr"].append(reciprocal_ranks[-1])
+
+    quality = {f"recall@{cutoff}": statistics.mean(values) for cutoff, values in recalls.items()}
+    quality["mrr"] = statistics.mean(reciprocal_ranks)
+    return {
+        "quality": quality,
+        "per_topic": {
+            topic: {f"recall@{k}": statistics.mean(values["recall"]), "mrr": statistics.mean(values["rr"])}
+            for topic, values in sorted(per_topic.items())
+        },
+        "latency": latency_summary(latencies),
+    }
+
+def build_conversations(countries: List[str], topics: List[str]) -> List[Dict[str, Any]]:
+    """(첫 질문, 생략된 후속 질문, 생략 없는 다음 질문) - 다음 질문은 같은 국가/토픽의 다음 단락"""
+    templates = QuestionGenerator().templates
+    conversations = []
+    for country in countries:
+        for topic in topics:
+            count = len(PASSAGES[topic])
+            for section in range(count):
+                following = (section + 1) % count
+                conversations.append({
+                    "country": country,
+                    "topic": topic,
+                    "first": templates[topic][section].format(country=country),
+                    "elliptical": FOLLOW_UPS[topic][following],
+                    "full": templates[topic][following].format(country=country),
+                    "key": (country, topic, following),
+                })
+    return conversations
+
+def evaluate_follow_up(rag, conversations, relevant, k: int) -> Dict[str, Any]:
+    """이어지는 질문을 단독 검색 / 대화 검색으로 찾았을 때의 recall@k, MRR, 지연시간, 벡터 검색 수"""
+    searches = 0
+    search_candidates = rag._search_candidates
+
+    def counting_search(*args, **kwargs):
+        nonlocal searches
+        searches += 1
+        return search_candidates(*args, **kwargs)
+
+    rag._search_candidates = counting_search
+    results = {}
+    try:
+        for kind in ("elliptical", "full"):
+            scores = {"standalone": defaultdict(list), "conversation": defaultdict(list)}
+            follow_up_searches = 0
+            for item in conversations:
+                country = item["country"].replace(" ", "").lower()
+                doc_type = DOC_TYPES[item["topic"]]
+                _, state = rag.retrieve_in_conversation(item["first"], country, doc_type)
+
+                start = time.perf_counter()
+                standalone = rag.retrieve(item[kind], country, doc_type, k=k)
+                scores["standalone"]["latency"].append(time.perf_counter() - start)
+
+                before = searches
+                start = time.perf_counter()
+                conversation, _ = rag.retrieve_in_conversation(item[kind], country, doc_type, state)
+                scores["conversation"]["latency"].append(time.perf_counter() - start)
+                follow_up_searches += searches - before
+
+                answers = relevant.get(item["key"], set())
+                for mode, docs in (("standalone", standalone), ("conversation", conversation)):
+                    ranked = [doc.metadata.get("chunk_id") for doc in docs]
+                    rank = next((i + 1 for i, chunk_id in enumerate(ranked) if chunk_id in answers), None)
+                    scores[mode]["rr"].append(1 / rank if rank else 0.0)
+                    scores[mode]["recall"].append(len(answers & set(ranked[:k])) / len(answers) if answers else 0.0)
+
+            results[kind] = {
+                mode: {
+                    f"recall@{k}": statistics.mean(values["recall"]),
+                    "mrr": statistics.mean(values["rr"]),
+                    "latency": latency_summary(values["latency"]),
+                }
+                for mode, values in scores.items()
+            }
+            results[kind]["conversation"]["vector_search_rate"] = follow_up_searches / len(conversations)
+    finally:
+        rag._search_candidates = search_candidates
+    return results
+
+def directory_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+def rss_bytes() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, latency_tolerance: float) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """이전 결과와 지표별 차이, 허용치를 넘은 회귀 목록"""
+    diffs, regressions = [], []
+    for name, value in results["quality"].items():
+        before = baseline.get("quality", {}).get(name)
+        if before is None:
+            continue
+        diffs.append({"metric": name, "baseline": before, "current": value, "delta": value - before})
+        if value < before - tolerance:
+            regressions.append(f"{name} {before:.4f} -> {value:.4f}")
+    for name in ("p50_ms", "p95_ms", "p99_ms"):
+        before = baseline.get("latency", {}).get(name)
+        if not before:
+            continue
+        value = results["latency"][name]
+        diffs.append({"metric": name, "baseline": before, "current": value, "delta": value - before})
+        if value > before * (1 + latency_tolerance):
+            regressions.append(f"{name} {before:.2f} -> {value:.2f}")
+    return diffs, regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="RAG retrieval quality/latency benchmark")
+    parser.add_argument("--embeddings", choices=["hashing", "openai"], default="hashing")
+    parser.add_argument("--embedding_cache", type=str, default=None, help="임베딩 캐시 파일 (.npz, openai 기본: etc/.cache/embeddings-<model>-<dims>.npz)")
+    parser.add_argument("--dimensions", type=int, default=settings.EMBEDDING_DIMENSIONS)
+    parser.add_argument("--chunk_size", type=int, default=settings.CHUNK_SIZE)
+    parser.add_argument("--chunk_overlap", type=int, default=settings.CHUNK_OVERLAP)
+    parser.add_argument("--k", type=int, default=settings.TOP_K_RESULTS)
+    parser.add_argument("--search_type", choices=["mmr", "similarity"], default=settings.RETRIEVAL_SEARCH_TYPE)
+    parser.add_argument("--fetch_k", type=int, default=settings.RETRIEVAL_FETCH_K)
+    parser.add_argument("--mmr_lambda", type=float, default=settings.RETRIEVAL_MMR_LAMBDA)
+    parser.add_argument("--filter", choices=["tag", "country", "none"], default="tag", help="tag: 서비스와 같은 국가+문서 타입 필터")
+    parser.add_argument("--countries", type=str, default=",".join(QuestionGenerator().countries))
+    parser.add_argument("--topics", type=str, default=",".join(DOC_TYPES))
+    parser.add_argument("--variants", type=int, default=len(QUESTION_PREFIXES), help="질문당 접두사 변형 수")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--follow_up", action="store_true", help="후속 질문 검색(대화 검색 vs 단독 검색)도 측정")
+    parser.add_argument("--baseline", type=str, default=None, help="비교할 이전 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="허용하는 recall/MRR 하락 (절대값)")
+    parser.add_argument("--latency_tolerance", type=float, default=0.2, help="허용하는 지연시간 증가 비율")
+    parser.add_argument("--fail_on_regression", action="store_true")
+    parser.add_argument("--output", type=str, default=None)
+    args = parser.parse_args()
+
+    # RAG가 읽는 검색 설정을 인자로 덮어씀
+    settings.CHUNK_SIZE = args.chunk_size
+    settings.CHUNK_OVERLAP = args.chunk_overlap
+    settings.EMBEDDING_DIMENSIONS = args.dimensions
+    settings.RETRIEVAL_SEARCH_TYPE = args.search_type
+    settings.RETRIEVAL_FETCH_K = args.fetch_k
+    settings.RETRIEVAL_MMR_LAMBDA = args.mmr_lambda
+    settings.TOP_K_RESULTS = args.k
+
+    from ai_services.rag import RAG
+
+    if args.embeddings == "openai":
+        from langchain_openai import OpenAIEmbeddings
+        inner = OpenAIEmbeddings(
+            model=settings.EMBEDDING_MODEL,
+            openai_api_key=settings.OPENAI_API_KEY,
+            dimensions=args.dimensions
+        )
+        cache_path = args.embedding_cache or os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), ".cache", f"embeddings-{settings.EMBEDDING_MODEL}-{args.dimensions}.npz"
+        )
+    else:
+        inner = HashingEmbeddings(args.dimensions)
+        cache_path = args.embedding_cache
+    embeddings = CachedEmbeddings(inner, cache_path) if cache_path else inner
+
+    countries = [country.strip() for country in args.countries.split(",") if country.strip()]
+    topics = [topic.strip() for topic in args.topics.split(",") if topic.strip()]
+    documents = build_corpus(countries, topics, args.seed)
+    queries = build_queries(countries, topics, args.variants)
+
+    persist_directory = tempfile.mkdtemp(prefix="bench_retrieval_")
+    try:
+        rss_before = rss_bytes()
+        rag = RAG(embedding_function=embeddings, persist_directory=persist_directory, collection_name="bench-retrieval")
+        texts, metadatas, relevant = chunk_corpus(documents, rag.text_splitter)
+        start = time.perf_counter()
+        rag.vectorstore.add_texts(texts=texts, metadatas=metadatas)
+        build_seconds = time.perf_counter() - start
+        index = {
+            "documents": len(documents),
+            "chunks": len(texts),
+            "mean_chunk_chars": statistics.mean(len(text) for text in texts),
+            "build_seconds": build_seconds,
+            "disk_bytes": directory_size(persist_directory),
+            "rss_delta_bytes": rss_bytes() - rss_before,
+        }
+
+        ks = sorted({cutoff for cutoff in (1, 3, 5, args.k) if cutoff <= args.k})
+        results = {
+            "config": {key: value for key, value in vars(args).items() if key not in ("baseline", "output")},
+            "queries": len(queries),
+            "index": index,
+            **evaluate(rag, queries, relevant, args.k, ks, args.filter),
+        }
+        if args.follow_up:
+            conversations = build_conversations(countries, topics)
+            results["follow_up"] = {
+                "conversations": len(conversations),
+                "settings": {
+                    name: getattr(settings, name) for name in (
+                        "RETRIEVAL_MEMORY_MIN_SCORE", "RETRIEVAL_FOLLOW_UP_MAX_WORDS",
+                        "RETRIEVAL_FOLLOW_UP_SIMILARITY", "RETRIEVAL_FOLLOW_UP_WEIGHT"
+                    )
+                },
+                **evaluate_follow_up(rag, conversations, relevant, args.k),
+            }
+    finally:
+        shutil.rmtree(persist_directory, ignore_errors=True)
+    if isinstance(embeddings, CachedEmbeddings):
+        embeddings.save()
+        results["embedding_cache_misses"] = embeddings.misses
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        diffs, regressions = compare(results, baseline, args.tolerance, args.latency_tolerance)
+        results["diff"] = {"baseline": args.baseline, "metrics": diffs, "regressions": regressions}
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        print(f"\n{'metric':<12} {'baseline':>10} {'current':>10} {'delta':>10}")
+        for diff in results["diff"]["metrics"]:
+            print(f"{diff['metric']:<12} {diff['baseline']:>10.4f} {diff['current']:>10.4f} {diff['delta']:>+10.4f}")
+        print("Regressions: " + ("; ".join(regressions) if regressions else "none"))
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
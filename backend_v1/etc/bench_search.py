@@ -0,0 +1,121 @@
+"""문서 검색(/documents/search) 색인 벤치마크
+
+사용법:
+    python etc/bench_search.py --documents 1000000 --queries 500
+    python etc/bench_search.py --database_url mysql+pymysql://user:pw@host/db --skip_seed
+
+역색인 생성 시간과 검색 지연시간(첫 페이지 / 커서로 5페이지째)을 측정하고,
+기존 방식인 LIKE '%q%' 테이블 스캔과 비교합니다.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse
+import json
+import random
+import time
+
+from sqlalchemy import create_engine, func, or_, select
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, Document
+from etc.bench_utils import latency_summary, seed_documents
+from services.search import DocumentSearchIndex
+
+WORDS = [
+    "비자", "여권", "발급", "신청", "연장", "입국", "출국", "심사", "보험", "가입", "취업", "유학",
+    "워킹홀리데이", "체류", "영주권", "서류", "수수료", "안전", "여행", "경보", "대사관", "영사관",
+    "visa", "passport", "application", "insurance", "work", "student", "entry", "requirements",
+    "holiday", "residence", "permit", "embassy", "travel", "advisory", "fees", "documents",
+]
+
+def make_title(rng: random.Random, countries) -> str:
+    # 앞쪽 단어가 훨씬 자주 나오도록 Zipf 형태로 선택
+    words = rng.choices(WORDS, weights=[1 / (i + 1) for i in range(len(WORDS))], k=rng.randint(3, 8))
+    return f"{rng.choice(countries)} " + " ".join(words)
+
+def make_queries(count: int):
+    rng = random.Random(1)
+    queries = []
+    for _ in range(count):
+        queries.append(" ".join(rng.sample(WORDS, rng.choice([1, 2, 2, 3]))))
+    return queries
+
+def bench_index(index: DocumentSearchIndex, queries, limit: int, pages: int):
+    first, deep = [], []
+    for q in queries:
+        start = time.perf_counter()
+        _, cursor = index.search(q, limit)
+        first.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for _ in range(pages - 1):
+            if cursor is None:
+                break
+            _, cursor = index.search(q, limit, cursor)
+        deep.append(time.perf_counter() - start)
+    return latency_summary(first), latency_summary(deep)
+
+def bench_like(SessionLocal, queries, limit: int):
+    latencies = []
+    with SessionLocal() as db:
+        for q in queries:
+            pattern = f"%{q}%"
+            start = time.perf_counter()
+            db.execute(
+                select(Document.id)
+                .where(or_(Document.title.like(pattern), Document.source.like(pattern)))
+                .order_by(Document.id)
+                .limit(limit)
+            ).all()
+            latencies.append(time.perf_counter() - start)
+    return latency_summary(latencies)
+
+def main():
+    parser = argparse.ArgumentParser(description="Document search index benchmark")
+    parser.add_argument("--database_url", type=str, default="sqlite:///./bench_search.sqlite3")
+    parser.add_argument("--documents", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--like_queries", type=int, default=20, help="LIKE 스캔은 느리므로 일부 검색어만 측정")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--skip_seed", action="store_true")
+    parser.add_argument("--output", type=str, default="")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+    if not args.skip_seed:
+        print(f"Seeding {args.documents} documents...")
+        seed_documents(SessionLocal, args.documents, make_title=make_title)
+    with SessionLocal() as db:
+        total = db.scalar(select(func.count(Document.id)))
+
+    index = DocumentSearchIndex(session_factory=SessionLocal)
+    start = time.perf_counter()
+    index.build()
+    build_seconds = time.perf_counter() - start
+    posting_bytes = sum(len(postings) * postings.itemsize for postings in index._postings.values())
+
+    queries = make_queries(args.queries)
+    index.search(queries[0], args.limit)  # posting 캐시 워밍업
+    first, deep = bench_index(index, queries, args.limit, args.pages)
+    like = bench_like(SessionLocal, queries[:args.like_queries], args.limit)
+
+    results = {
+        "documents": total,
+        "build_seconds": build_seconds,
+        "tokens": len(index._postings),
+        "postings_mb": posting_bytes / 1024 / 1024,
+        "index_first_page": first,
+        f"index_pages_2_to_{args.pages}": deep,
+        "like_scan": like,
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""대화 기록 직렬화 마이크로벤치마크 (stdlib json vs orjson)
+
+사용법:
+    python etc/bench_serialization.py --messages 1000 --repeat 200
+
+1k 메시지 대화 기록을 기준으로
+  1) DB에서 읽은 references 디코딩 (json.loads vs codec.loads)
+  2) List[MessageResponse] 응답 직렬화 (FastAPI 기본 JSONResponse vs ORJSONResponse)
+의 지연시간을 비교합니다.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+import codec
+from etc.bench_utils import latency_summary
+from etc.init_db import SAMPLE_CONTENTS, SAMPLE_TITLES
+from schemas import MessageResponse
+
+def make_history(count: int) -> List[dict]:
+    """references를 포함한 대화 기록 (DB 행 형태)"""
+    rng = random.Random(0)
+    start = datetime.utcnow()
+    rows = []
+    for i in range(count):
+        role = "user" if i % 2 == 0 else "assistant"
+        references = [
+            {"id": rng.randint(1, 10 ** 6), "title": rng.choice(SAMPLE_TITLES), "url": f"https://example.com/{i}/{k}", "score": rng.random()}
+            for k in range(rng.randint(1, 5))
+        ] if role == "assistant" else []
+        rows.append({
+            "id": i + 1,
+            "conversation_id": 1,
+            "role": role,
+            "content": " ".join(rng.sample(SAMPLE_CONTENTS, rng.randint(1, 4))),
+            "references": references,
+            "created_at": start + timedelta(seconds=i * 30)
+        })
+    return rows
+
+def time_it(fn, repeat: int):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    return latency_summary(latencies)
+
+async def time_endpoint(client: httpx.AsyncClient, path: str, repeat: int):
+    await client.get(path)  # 워밍업
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = await client.get(path)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+    return latency_summary(latencies), len(response.content)
+
+async def main():
+    parser = argparse.ArgumentParser(description="History serialization microbenchmark")
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--output", type=str, default="")
+    args = parser.parse_args()
+
+    rows = make_history(args.messages)
+    stored_stdlib = [json.dumps(row["references"]) for row in rows]
+    stored_orjson = [codec.dumps_str(row["references"]) for row in rows]
+    messages = [MessageResponse(**row) for row in rows]
+
+    results = {
+        "messages": args.messages,
+        "decode_references": {
+            "json": time_it(lambda: [json.loads(s) for s in stored_stdlib], args.repeat),
+            "orjson": time_it(lambda: [codec.loads(s) for s in stored_orjson], args.repeat),
+        },
+        "stored_bytes": {
+            "json": sum(len(s.encode("utf-8")) for s in stored_stdlib),
+            "orjson": sum(len(s.encode("utf-8")) for s in stored_orjson),
+        },
+    }
+
+    app = FastAPI()
+
+    @app.get("/json", response_model=List[MessageResponse], response_class=JSONResponse)
+    async def history_json():
+        return messages
+
+    @app.get("/orjson", response_model=List[MessageResponse], response_class=codec.ORJSONResponse)
+    async def history_orjson():
+        return messages
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        results["response"] = {}
+        for name in ("json", "orjson"):
+            summary, size = await time_endpoint(client, f"/{name}", args.repeat)
+            results["response"][name] = {**summary, "bytes": size}
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    asyncio.run(main())
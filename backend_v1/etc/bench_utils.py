@@ -0,0 +1,65 @@
+"""벤치마크 스크립트 공용 유틸리티"""
+import random
+import statistics
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from database import Document, COUNTRIES, TOPICS, SOURCES
+
+def percentile(values: List[float], q: float) -> float:
+    """q 백분위수 (최근접 순위)"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def latency_summary(latencies: List[float]) -> Dict[str, float]:
+    """초 단위 지연시간 목록을 ms 단위 요약으로 변환"""
+    return {
+        "count": len(latencies),
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+def token_f1(a: str, b: str) -> float:
+    """두 문장의 토큰 단위 F1"""
+    a_tokens, b_tokens = a.lower().split(), b.lower().split()
+    if not a_tokens and not b_tokens:
+        return 1.0
+    common = sum((Counter(a_tokens) & Counter(b_tokens)).values())
+    if common == 0:
+        return 0.0
+    precision = common / len(a_tokens)
+    recall = common / len(b_tokens)
+    return 2 * precision * recall / (precision + recall)
+
+def seed_documents(
+    SessionLocal,
+    count: int,
+    batch_size: int = 10000,
+    skewed: bool = False,
+    make_title: Optional[Callable[[random.Random, List[str]], str]] = None
+):
+    """벤치마크용 문서 일괄 생성 (같은 count면 같은 문서)
+
+    skewed면 앞쪽 국가에 문서가 몰리도록 국가를 고르고, make_title(rng, countries)로 제목을 만듭니다.
+    """
+    rng = random.Random(0)
+    countries = [c["name_en"] for c in COUNTRIES]
+    country_weights = [1 / (i + 1) for i in range(len(countries))] if skewed else None
+    with SessionLocal() as db:
+        for start in range(0, count, batch_size):
+            db.execute(insert(Document), [
+                {
+                    "title": make_title(rng, countries) if make_title else f"document {i}",
+                    "url": f"https://example.com/{i}",
+                    "country": rng.choices(countries, country_weights)[0],
+                    "topic": rng.choice(TOPICS),
+                    "source": rng.choice(SOURCES)
+                }
+                for i in range(start, min(start + batch_size, count))
+            ])
+            db.commit()
@@ -0,0 +1,87 @@
+"""API 시작 시 import 시간 프로파일 (python -X importtime 기반)
+
+사용법:
+    python etc/import_profile.py
+    python etc/import_profile.py --module app --top 30 --budget_ms 1000
+
+예산 (import app 기준):
+    - 전체 import 시간 1000ms 이하 -> /api/health가 1초 안에 응답 가능
+    - 아래 HEAVY_MODULES는 시작 시 import되면 안 됨 (해당 백엔드를 처음 사용할 때 로드)
+예산을 넘거나 무거운 모듈이 시작 시 로드되면 종료 코드 1을 반환합니다.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse
+import subprocess
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_BUDGET_MS = 1000
+HEAVY_MODULES = [
+    "torch", "transformers", "optimum", "onnxruntime",
+    "chromadb", "langchain", "langchain_chroma", "langchain_community", "langchain_openai",
+    "google.generativeai", "openai", "deep_translator",
+]
+
+def profile(module: str):
+    """(모듈별 [self_us, cumulative_us] 목록, 전체 시간 us) 반환"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.rstrip(), int(self_us), int(cumulative_us)))
+    # 최상위(들여쓰기 없는) import의 누적 시간 합 = 전체 시간
+    total_us = sum(cumulative for name, _, cumulative in rows if not name.startswith("  "))
+    return rows, total_us
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup import-time profile")
+    parser.add_argument("--module", type=str, default="app")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--budget_ms", type=float, default=DEFAULT_BUDGET_MS)
+    args = parser.parse_args()
+
+    rows, total_us = profile(args.module)
+
+    # 최상위 패키지별 자체 시간 합
+    by_package = defaultdict(int)
+    imported = set()
+    for name, self_us, _ in rows:
+        module = name.strip()
+        imported.add(module)
+        by_package[module.split(".")[0]] += self_us
+
+    print(f"import {args.module}: {total_us / 1000:.0f}ms ({len(rows)} modules)\n")
+    print(f"{'package':<30} {'self ms':>10}")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{package:<30} {self_us / 1000:>10.1f}")
+
+    heavy = sorted(
+        name for name in HEAVY_MODULES
+        if name in imported
+    )
+    failed = False
+    if heavy:
+        print(f"\nHeavy modules imported at startup: {', '.join(heavy)}")
+        failed = True
+    if total_us / 1000 > args.budget_ms:
+        print(f"\nOver budget: {total_us / 1000:.0f}ms > {args.budget_ms:.0f}ms")
+        failed = True
+    if not failed:
+        print(f"\nWithin budget ({args.budget_ms:.0f}ms), no heavy modules imported")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
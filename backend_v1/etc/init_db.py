@@ -1,17 +1,19 @@
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse
 import random
+import time
 from datetime import datetime, timedelta
+from itertools import accumulate
 import uuid
-import json
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, func, insert, select
 from sqlalchemy.orm import sessionmaker
 from config import settings
 
 from sqlalchemy.ext.declarative import declarative_base
 
-from database import Document, Conversation, Message, COUNTRIES, TOPICS, SOURCES
+from database import JSON_CODEC, Base, Document, Conversation, Message, FAQ, COUNTRIES, TOPICS, SOURCES
 
 # 샘플 데이터 생성을 위한 템플릿
 VISA_TEMPLATES = {
@@ -314,7 +316,7 @@ def create_sample_data(session):
                             "title": documents[ref_idx].title,
                             "url": documents[ref_idx].url
                         })
-                references = json.dumps(ref_docs, ensure_ascii=False)
+                references = ref_docs or None
             
             message = Message(
                 conversation_id=conversation.id,
@@ -332,19 +334,217 @@ def create_sample_data(session):
     
     return documents, conversations
 
+# ---------------------------------------------------------------------------
+# 대량 시드 (부하 테스트용)
+# ---------------------------------------------------------------------------
+
+ALL_TEMPLATES = [VISA_TEMPLATES, INSURANCE_TEMPLATES, IMMIGRATION_TEMPLATES, SAFETY_INFO_TEMPLATES]
+SAMPLE_TITLES = [title for templates in ALL_TEMPLATES for data in templates.values() for title in data.get("titles", [])]
+SAMPLE_CONTENTS = [content for templates in ALL_TEMPLATES for data in templates.values() for content in data.get("contents", [])]
+
+class SkewedChoice:
+    """Zipf 분포로 값 선택 (skew=0이면 균등, 클수록 앞쪽 값에 몰림)"""
+
+    def __init__(self, values, skew: float):
+        self.values = values
+        self.cum_weights = list(accumulate(1 / (rank + 1) ** skew for rank in range(len(values))))
+
+    def __call__(self, rng: random.Random):
+        return rng.choices(self.values, cum_weights=self.cum_weights)[0]
+
+def next_id(session, model) -> int:
+    """명시적 id로 이어서 넣기 위한 다음 id (기존 데이터 뒤에 추가)"""
+    return (session.scalar(select(func.max(model.id))) or 0) + 1
+
+def generate_documents(rng: random.Random, count: int, start_id: int, country: SkewedChoice, topic: SkewedChoice, days: int):
+    now = datetime.utcnow()
+    for doc_id in range(start_id, start_id + count):
+        doc_country = country(rng)
+        yield {
+            "id": doc_id,
+            "title": f"[{doc_country}] {rng.choice(SAMPLE_TITLES)} #{doc_id}",
+            "url": f"https://example.com/{doc_country.lower().replace(' ', '-')}/{doc_id}",
+            "country": doc_country,
+            "topic": topic(rng),
+            "source": rng.choice(SOURCES),
+            "created_at": now - timedelta(seconds=rng.randint(0, days * 86400))
+        }
+
+def generate_faqs(rng: random.Random, count: int, start_id: int, country: SkewedChoice, topic: SkewedChoice, days: int):
+    now = datetime.utcnow()
+    for faq_id in range(start_id, start_id + count):
+        yield {
+            "id": faq_id,
+            "question": f"{rng.choice(SAMPLE_TITLES)}에 대해 알려주세요 ({faq_id})",
+            "country": country(rng).lower(),
+            "topic": topic(rng),
+            "created_at": now - timedelta(seconds=rng.randint(0, days * 86400))
+        }
+
+def generate_conversations(
+    rng: random.Random,
+    count: int,
+    conversation_start_id: int,
+    message_start_id: int,
+    document_ids: range,
+    country: SkewedChoice,
+    topic: SkewedChoice,
+    turns_mean: float,
+    max_turns: int,
+    days: int
+):
+    """(대화, 메시지 목록) 스트림 - 대화 길이는 평균 turns_mean인 지수분포 (긴 꼬리)"""
+    now = datetime.utcnow()
+    message_id = message_start_id
+    for conversation_id in range(conversation_start_id, conversation_start_id + count):
+        created_at = now - timedelta(seconds=rng.randint(0, days * 86400))
+        conversation = {
+            "id": conversation_id,
+            "session_id": str(uuid.UUID(int=rng.getrandbits(128))),
+            # 국가/토픽 필터 없이 시작하는 대화도 일부 포함
+            "country": country(rng) if rng.random() < 0.8 else None,
+            "topic": topic(rng) if rng.random() < 0.8 else None,
+            "created_at": created_at
+        }
+
+        turns = min(max_turns, 1 + int(rng.expovariate(1 / max(turns_mean - 1, 1e-9))))
+        messages = []
+        for turn in range(turns):
+            references = None
+            if document_ids:
+                references = [
+                    {"id": doc_id, "title": f"document {doc_id}", "url": f"https://example.com/{doc_id}"}
+                    for doc_id in (rng.choice(document_ids) for _ in range(rng.randint(0, 3)))
+                ] or None
+            for role, content, refs in (
+                ("user", rng.choice(SAMPLE_TITLES) + "에 대해 알려주세요", None),
+                ("assistant", " ".join(rng.sample(SAMPLE_CONTENTS, rng.randint(1, 4))), references),
+            ):
+                messages.append({
+                    "id": message_id,
+                    "conversation_id": conversation_id,
+                    "role": role,
+                    "content": content,
+                    "references": refs,
+                    "created_at": created_at + timedelta(seconds=len(messages) * 30)
+                })
+                message_id += 1
+        yield conversation, messages
+
+def bulk_insert(session, model, rows, batch_size: int) -> int:
+    """행 스트림을 batch_size개씩 executemany로 삽입 (배치마다 커밋)"""
+    total = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            total += _flush(session, model, batch)
+    total += _flush(session, model, batch)
+    return total
+
+def _flush(session, model, batch) -> int:
+    if not batch:
+        return 0
+    session.execute(insert(model), batch)
+    session.commit()
+    count = len(batch)
+    batch.clear()
+    return count
+
+def create_bulk_data(session, args):
+    """대량 합성 데이터 생성 - 행을 스트림으로 만들어 배치 단위로 삽입하므로 메모리 사용량이 일정"""
+    rng = random.Random(args.seed)
+    country = SkewedChoice([c["name_en"] for c in COUNTRIES], args.skew)
+    topic = SkewedChoice(TOPICS, args.skew)
+
+    start = time.perf_counter()
+    document_start = next_id(session, Document)
+    count = bulk_insert(session, Document, generate_documents(
+        rng, args.documents, document_start, country, topic, args.days
+    ), args.batch_size)
+    print(f"Inserted {count} documents ({time.perf_counter() - start:.1f}s)")
+
+    start = time.perf_counter()
+    count = bulk_insert(session, FAQ, generate_faqs(
+        rng, args.faqs, next_id(session, FAQ), country, topic, args.days
+    ), args.batch_size)
+    print(f"Inserted {count} faqs ({time.perf_counter() - start:.1f}s)")
+
+    # 메시지가 참조하는 대화가 먼저 들어가도록 메시지 배치를 넣기 전에 대화 배치를 먼저 flush
+    start = time.perf_counter()
+    conversation_batch, message_batch = [], []
+    conversation_count = message_count = 0
+    for conversation, messages in generate_conversations(
+        rng,
+        args.conversations,
+        next_id(session, Conversation),
+        next_id(session, Message),
+        range(document_start, document_start + args.documents),
+        country,
+        topic,
+        args.turns_mean,
+        args.max_turns,
+        args.days
+    ):
+        conversation_batch.append(conversation)
+        message_batch.extend(messages)
+        if len(message_batch) >= args.batch_size:
+            conversation_count += _flush(session, Conversation, conversation_batch)
+            message_count += _flush(session, Message, message_batch)
+    conversation_count += _flush(session, Conversation, conversation_batch)
+    message_count += _flush(session, Message, message_batch)
+    print(f"Inserted {conversation_count} conversations, {message_count} messages ({time.perf_counter() - start:.1f}s)")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Initialize database with sample or bulk synthetic data")
+    parser.add_argument("--database_url", type=str, default=settings.DATABASE_URL)
+    parser.add_argument("--bulk", action="store_true", help="부하 테스트용 대량 합성 데이터 생성")
+    parser.add_argument("--reset", action="store_true", help="(--bulk) 기존 데이터 삭제 후 생성")
+    parser.add_argument("--documents", type=int, default=1000000)
+    parser.add_argument("--faqs", type=int, default=10000)
+    parser.add_argument("--conversations", type=int, default=100000)
+    parser.add_argument("--turns_mean", type=float, default=5, help="대화당 평균 턴 수 (턴 = 질문 + 답변)")
+    parser.add_argument("--max_turns", type=int, default=200)
+    parser.add_argument("--skew", type=float, default=1.0, help="국가/토픽 분포의 Zipf 지수 (0이면 균등)")
+    parser.add_argument("--days", type=int, default=365, help="created_at 분포 기간")
+    parser.add_argument("--batch_size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+def reset_data(session):
+    """기존 데이터 삭제"""
+    session.query(Message).delete()
+    session.query(Conversation).delete()
+    session.query(Document).delete()
+    session.commit()
+
 def main():
     """메인 실행 함수"""
+    args = parse_args()
+    
     # 데이터베이스 연결 설정
-    engine = create_engine(settings.DATABASE_URL)
+    engine = create_engine(args.database_url, **JSON_CODEC)
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     session = SessionLocal()
     
+    if args.bulk:
+        try:
+            Base.metadata.create_all(engine)
+            if args.reset:
+                reset_data(session)
+                session.query(FAQ).delete()
+                session.commit()
+            create_bulk_data(session, args)
+        except Exception as e:
+            print(f"Error: {e}")
+            session.rollback()
+        finally:
+            session.close()
+        return
+    
     try:
         # 기존 데이터 삭제 (선택적)
-        session.query(Message).delete()
-        session.query(Conversation).delete()
-        session.query(Document).delete()
-        session.commit()
+        reset_data(session)
         
         # 샘플 데이터 생성
         documents, conversations = create_sample_data(session)
@@ -368,7 +568,7 @@ def main():
             for msg in conv.messages[:2]:
                 print(f"  {msg.role}: {msg.content[:50]}...")
                 if msg.references:
-                    refs = json.loads(msg.references)
+                    refs = msg.references
                     print(f"    참조: {[ref['title'][:30] + '...' for ref in refs]}")
     
     except Exception as e:
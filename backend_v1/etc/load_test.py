@@ -0,0 +1,288 @@
+"""질문 코퍼스(qa_pair generated/safety/questions.json) 기반 채팅 부하 테스트
+
+사용법:
+    # 앱을 프로세스 안에서 가짜 provider(MOCK_PROVIDERS)로 띄워 실행
+    python etc/load_test.py --in_process --rate 20 --duration 60 --output results.json
+
+    # 이미 떠 있는 서버에 실행 (서버는 MOCK_PROVIDERS=true 로 띄우면 외부 API 호출 없음)
+    python etc/load_test.py --base_url http://localhost:8000 --concurrency 32 --sessions 2000
+
+MOCK_PROVIDERS여도 HistoryCache가 토큰 계산에 쓰는 tiktoken 인코딩(cl100k_base)은 처음 한 번
+내려받으므로 네트워크가 필요합니다. 오프라인 환경에서는 미리 받아 둔 캐시 디렉터리를
+TIKTOKEN_CACHE_DIR로 지정하세요.
+
+한 세션은 대화 하나입니다. 일부 세션은 /chat/conversation으로 대화를 먼저 만들고,
+나머지는 첫 메시지에서 대화가 생성됩니다. 각 턴 후 --follow_up 확률로 같은 국가의 질문을
+이어서 보냅니다(최대 --max_turns). --rate를 주면 세션이 포아송 도착(open loop)하고,
+아니면 --concurrency개 세션이 쉬지 않고 돌아갑니다(closed loop).
+같은 --seed면 같은 질문/대화 흐름을 재생합니다.
+
+결과: 엔드포인트별 처리량/지연시간/오류율, /api/metrics 전후 차이로 계산한 단계별
+지연시간(히스토그램 버킷 보간)/오류율을 JSON으로 출력합니다.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+import httpx
+from prometheus_client.parser import text_string_to_metric_families
+
+from etc.bench_utils import latency_summary
+
+DEFAULT_QUESTIONS = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "qa_pair generated", "safety", "questions.json"
+)
+# 코퍼스 값 -> API 값
+COUNTRY_ALIASES = {"Philippine": "Philippines"}
+TOPIC_ALIASES = {"safety": "immigration_safety"}
+
+def load_questions(path: str) -> Dict[str, List[Dict[str, str]]]:
+    """국가별 질문 목록"""
+    with open(path, encoding="utf-8") as f:
+        corpus = json.load(f)
+    by_country = defaultdict(list)
+    for item in corpus["questions"]:
+        country = COUNTRY_ALIASES.get(item["country"], item["country"])
+        by_country[country].append({
+            "question": item["question"],
+            "country": country,
+            "topic": TOPIC_ALIASES.get(item["topic"], item["topic"]),
+        })
+    return dict(by_country)
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.error_samples: List[str] = []
+
+    async def call(self, client: httpx.AsyncClient, endpoint: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        start = time.perf_counter()
+        try:
+            response = await client.post(f"/api/chat/{endpoint}", json=payload)
+            status = response.status_code
+        except httpx.HTTPError as e:
+            response, status = None, type(e).__name__
+        self.latencies[endpoint].append(time.perf_counter() - start)
+        self.statuses[endpoint][str(status)] += 1
+        if response is None or response.status_code != 200:
+            self.errors[endpoint] += 1
+            if len(self.error_samples) < 10:
+                self.error_samples.append(f"{endpoint} {status}: {response.text[:200] if response is not None else ''}")
+            return None
+        return response.json()
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        endpoints = {}
+        for endpoint, latencies in self.latencies.items():
+            endpoints[endpoint] = {
+                **latency_summary(latencies),
+                "throughput_rps": len(latencies) / elapsed,
+                "errors": self.errors[endpoint],
+                "error_rate": self.errors[endpoint] / len(latencies),
+                "statuses": dict(self.statuses[endpoint]),
+            }
+        return endpoints
+
+async def session(client: httpx.AsyncClient, recorder: Recorder, rng: random.Random,
+                  questions: Dict[str, List[Dict[str, str]]], args):
+    """대화 하나 재생"""
+    country = rng.choice(sorted(questions))
+    pool = questions[country]
+    session_id = f"load-{uuid.UUID(int=rng.getrandbits(128))}"
+    conversation_id = None
+
+    if rng.random() < args.create_conversation:
+        created = await recorder.call(client, "conversation", {
+            "session_id": session_id,
+            "country_id": country,
+            "topic_id": pool[0]["topic"],
+        })
+        if created is None:
+            return
+        conversation_id = created["id"]
+
+    for turn in range(args.max_turns):
+        if turn > 0 and rng.random() >= args.follow_up:
+            break
+        item = rng.choice(pool)
+        payload = {
+            "message": item["question"],
+            "session_id": session_id,
+            "conversation_id": conversation_id,
+            "country": item["country"],
+            "topic": item["topic"],
+        }
+        if args.model_id:
+            payload["model_id"] = args.model_id
+        reply = await recorder.call(client, "message", payload)
+        if reply is None:
+            return
+        conversation_id = reply["conversation_id"]
+        if args.think_time:
+            await asyncio.sleep(rng.expovariate(1 / args.think_time))
+
+async def drive(client: httpx.AsyncClient, recorder: Recorder, questions, args) -> float:
+    """세션을 열린/닫힌 루프로 실행하고 경과 시간 반환"""
+    rng = random.Random(args.seed)
+    deadline = time.perf_counter() + args.duration if args.duration else None
+    sessions_left = args.sessions
+
+    def more() -> bool:
+        nonlocal sessions_left
+        if deadline is not None and time.perf_counter() >= deadline:
+            return False
+        if sessions_left is not None:
+            if sessions_left <= 0:
+                return False
+            sessions_left -= 1
+        return True
+
+    start = time.perf_counter()
+    if args.rate:
+        # open loop: 응답을 기다리지 않고 포아송 간격으로 세션 시작
+        tasks = []
+        while more():
+            session_rng = random.Random(rng.getrandbits(64))
+            tasks.append(asyncio.create_task(session(client, recorder, session_rng, questions, args)))
+            await asyncio.sleep(rng.expovariate(args.rate))
+        await asyncio.gather(*tasks)
+    else:
+        async def worker(worker_rng: random.Random):
+            while more():
+                await session(client, recorder, random.Random(worker_rng.getrandbits(64)), questions, args)
+        await asyncio.gather(*(worker(random.Random(rng.getrandbits(64))) for _ in range(args.concurrency)))
+    return time.perf_counter() - start
+
+async def scrape(client: httpx.AsyncClient) -> Dict[str, Dict[str, Any]]:
+    """/api/metrics의 단계별 히스토그램 버킷/오류 수"""
+    response = await client.get("/api/metrics")
+    response.raise_for_status()
+    stages = defaultdict(lambda: {"buckets": {}, "count": 0.0, "sum": 0.0, "errors": 0.0})
+    for family in text_string_to_metric_families(response.text):
+        for sample in family.samples:
+            stage = sample.labels.get("stage")
+            if stage is None:
+                continue
+            if sample.name == "chat_stage_seconds_bucket":
+                stages[stage]["buckets"][float(sample.labels["le"])] = sample.value
+            elif sample.name == "chat_stage_seconds_count":
+                stages[stage]["count"] = sample.value
+            elif sample.name == "chat_stage_seconds_sum":
+                stages[stage]["sum"] = sample.value
+            elif sample.name == "chat_stage_errors_total":
+                stages[stage]["errors"] = sample.value
+    return stages
+
+def bucket_quantile(q: float, buckets: Dict[float, float]) -> Optional[float]:
+    """누적 버킷에서 q 분위수 선형 보간 (PromQL histogram_quantile과 같은 방식)"""
+    bounds = sorted(buckets)
+    total = buckets[bounds[-1]] if bounds else 0
+    if total <= 0:
+        return None
+    rank = q * total
+    lower, lower_count = 0.0, 0.0
+    for bound in bounds:
+        count = buckets[bound]
+        if count >= rank:
+            if bound == float("inf"):
+                return lower
+            return lower + (bound - lower) * (rank - lower_count) / max(count - lower_count, 1e-12)
+        lower, lower_count = bound, count
+    return lower
+
+def stage_summary(before, after) -> Dict[str, Dict[str, Any]]:
+    result = {}
+    for stage, end in sorted(after.items()):
+        begin = before.get(stage, {"buckets": {}, "count": 0.0, "sum": 0.0, "errors": 0.0})
+        count = end["count"] - begin["count"]
+        if count <= 0:
+            continue
+        buckets = {le: value - begin["buckets"].get(le, 0.0) for le, value in end["buckets"].items()}
+        errors = end["errors"] - begin["errors"]
+        result[stage] = {
+            "count": int(count),
+            "mean_ms": (end["sum"] - begin["sum"]) / count * 1000,
+            **{f"p{q}_ms": bucket_quantile(q / 100, buckets) * 1000 for q in (50, 95, 99)},
+            "errors": int(errors),
+            "error_rate": errors / count,
+        }
+    return result
+
+async def run(client: httpx.AsyncClient, questions, args) -> Dict[str, Any]:
+    recorder = Recorder()
+    before = await scrape(client)
+    elapsed = await drive(client, recorder, questions, args)
+    after = await scrape(client)
+
+    messages = len(recorder.latencies["message"])
+    return {
+        "elapsed_s": elapsed,
+        "throughput_rps": sum(len(latencies) for latencies in recorder.latencies.values()) / elapsed,
+        "messages_per_s": messages / elapsed,
+        "endpoints": recorder.summary(elapsed),
+        "stages": stage_summary(before, after),
+        "error_samples": recorder.error_samples,
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description="Chat load test replaying the questions corpus")
+    parser.add_argument("--questions", type=str, default=DEFAULT_QUESTIONS)
+    parser.add_argument("--base_url", type=str, default="http://localhost:8000")
+    parser.add_argument("--in_process", action="store_true", help="앱을 이 프로세스에서 가짜 provider로 실행")
+    parser.add_argument("--latency_scale", type=float, default=1.0, help="--in_process 가짜 provider 지연시간 배율")
+    parser.add_argument("--error_rate", type=float, default=0.0, help="--in_process 가짜 provider 오류 확률")
+    parser.add_argument("--rate", type=float, default=0.0, help="초당 세션 시작 수 (0이면 closed loop)")
+    parser.add_argument("--concurrency", type=int, default=16, help="closed loop 동시 세션 수")
+    parser.add_argument("--duration", type=float, default=0.0, help="세션 시작을 멈출 시간(초)")
+    parser.add_argument("--sessions", type=int, default=None, help="시작할 세션 수")
+    parser.add_argument("--follow_up", type=float, default=0.5, help="턴마다 이어서 질문할 확률")
+    parser.add_argument("--max_turns", type=int, default=5)
+    parser.add_argument("--create_conversation", type=float, default=0.5, help="/chat/conversation으로 시작하는 세션 비율")
+    parser.add_argument("--think_time", type=float, default=0.0, help="턴 사이 평균 대기(초, 지수 분포)")
+    parser.add_argument("--model_id", type=str, default=None)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=str, default=None)
+    args = parser.parse_args()
+    if not args.duration and args.sessions is None:
+        args.sessions = 200
+
+    questions = load_questions(args.questions)
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+
+    if args.in_process:
+        os.environ["MOCK_PROVIDERS"] = "true"
+        os.environ["MOCK_LATENCY_SCALE"] = str(args.latency_scale)
+        os.environ["MOCK_ERROR_RATE"] = str(args.error_rate)
+        from app import app, readiness
+
+        async with app.router.lifespan_context(app):
+            while not readiness.complete:
+                await asyncio.sleep(0.1)
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=timeout) as client:
+                results = await run(client, questions, args)
+    else:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=timeout, limits=limits) as client:
+            results = await run(client, questions, args)
+
+    results = {"config": vars(args), **results}
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,138 @@
+"""FAQ 질문 답변 미리 생성 (faq_answers 테이블)
+
+사용법:
+    # 기본 모델로 새 FAQ/수정된 FAQ/인덱스 버전이 바뀐 답변만 다시 생성
+    python etc/precompute_faq_answers.py
+
+    # 여러 모델, 전체 다시 생성
+    python etc/precompute_faq_answers.py --models gpt-3.5-turbo flan-t5-base --force
+
+    # 다시 생성할 답변 수만 확인 (벡터 인덱스 갱신 후 cron 등에서 실행 여부 판단)
+    python etc/precompute_faq_answers.py --dry_run
+
+답변은 /chat/batch와 같은 경로(ChatService.answer_batch)로 생성하므로 중복 질문은 한 번만 생성되고
+생성 슬롯/재시도 규칙도 같습니다. 생성 당시 벡터 인덱스 버전을 함께 저장하며, 서버는 현재 버전의
+답변만 제공하므로 인덱스가 바뀐 뒤 이 스크립트를 다시 돌리기 전까지는 일반 경로로 답변합니다.
+삭제된 FAQ의 답변은 함께 지웁니다.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from sqlalchemy import delete, select
+
+from config import settings
+from database import FAQ, FAQAnswer, SessionLocal
+from schemas import BatchChatItem, BatchChatRequest
+from services.chat import ChatService, _normalize_question, _retrieval_partition
+
+def stale_faqs(db, model_id: str, index_version: str, force: bool) -> List[FAQ]:
+    """다시 생성해야 하는 FAQ - 답변이 없거나, 인덱스 버전이 다르거나, 질문이 수정된 경우"""
+    faqs = db.scalars(select(FAQ).where(FAQ.country != None, FAQ.topic != None).order_by(FAQ.id)).all()
+    if force:
+        return faqs
+    existing: Dict[int, Tuple[str, str]] = {
+        faq_id: (question_key, version)
+        for faq_id, question_key, version in db.execute(
+            select(FAQAnswer.faq_id, FAQAnswer.question_key, FAQAnswer.index_version).where(FAQAnswer.model_id == model_id)
+        )
+    }
+    return [
+        faq for faq in faqs
+        if existing.get(faq.id) != (_normalize_question(faq.question), index_version)
+    ]
+
+def save_answers(db, model_id: str, index_version: str, faqs: Dict[int, FAQ], results: List[dict]):
+    """성공한 답변 저장 (FAQ/모델별로 한 행, 있으면 갱신)"""
+    ids = [int(result["id"]) for result in results]
+    rows = {
+        row.faq_id: row
+        for row in db.scalars(select(FAQAnswer).where(FAQAnswer.model_id == model_id, FAQAnswer.faq_id.in_(ids)))
+    }
+    for result in results:
+        faq = faqs[int(result["id"])]
+        row = rows.get(faq.id)
+        if row is None:
+            row = FAQAnswer(faq_id=faq.id, model_id=model_id)
+            db.add(row)
+        row.question_key = _normalize_question(faq.question)
+        row.country, row.topic = _retrieval_partition(faq.country, faq.topic)
+        row.answer = result["answer"]
+        row.references = result["references"] or None
+        row.index_version = index_version
+    db.commit()
+
+async def precompute(chat_service: ChatService, model_id: str, faqs: List[FAQ], index_version: str, chunk_size: int) -> Counter:
+    counts = Counter()
+    by_id = {faq.id: faq for faq in faqs}
+    for start in range(0, len(faqs), chunk_size):
+        chunk = faqs[start:start + chunk_size]
+        request = BatchChatRequest(
+            items=[BatchChatItem(id=str(faq.id), question=faq.question, country=faq.country, topic=faq.topic) for faq in chunk],
+            model_id=model_id
+        )
+        ok = []
+        async for result in chat_service.answer_batch(request):
+            counts[result["status"]] += 1
+            if result["status"] == "ok":
+                ok.append(result)
+            else:
+                print(f"[{model_id}] FAQ {result['id']} failed: {result['error']}", file=sys.stderr)
+        db = SessionLocal()
+        try:
+            save_answers(db, model_id, index_version, by_id, ok)
+        finally:
+            db.close()
+        print(f"[{model_id}] {start + len(chunk)}/{len(faqs)}", file=sys.stderr)
+    return counts
+
+async def main():
+    parser = argparse.ArgumentParser(description="Precompute answers for FAQ questions")
+    parser.add_argument("--models", nargs="+", default=[settings.DEFAULT_LLM_MODEL])
+    parser.add_argument("--force", action="store_true", help="최신 답변도 모두 다시 생성")
+    parser.add_argument("--dry_run", action="store_true", help="다시 생성할 답변 수만 출력")
+    parser.add_argument("--chunk_size", type=int, default=min(200, settings.BATCH_MAX_ITEMS), help="배치 하나의 FAQ 수 (배치마다 저장)")
+    parser.add_argument("--output", type=str, default=None)
+    args = parser.parse_args()
+
+    chat_service = ChatService()
+    index_version = chat_service.rag.index_version()
+
+    db = SessionLocal()
+    try:
+        # 삭제된 FAQ의 답변 정리 (SQLite는 외래 키 CASCADE가 기본으로 꺼져 있음)
+        pruned = 0
+        if not args.dry_run:
+            pruned = db.execute(delete(FAQAnswer).where(FAQAnswer.faq_id.not_in(select(FAQ.id)))).rowcount
+            db.commit()
+        stale = {model_id: stale_faqs(db, model_id, index_version, args.force) for model_id in args.models}
+    finally:
+        db.close()
+
+    results = {"index_version": index_version, "pruned": pruned, "models": {}}
+    for model_id, faqs in stale.items():
+        if args.dry_run or not faqs:
+            results["models"][model_id] = {"stale": len(faqs)}
+            continue
+        start = time.perf_counter()
+        counts = await precompute(chat_service, model_id, faqs, index_version, args.chunk_size)
+        results["models"][model_id] = {
+            "stale": len(faqs),
+            "ok": counts["ok"],
+            "error": counts["error"],
+            "seconds": round(time.perf_counter() - start, 1)
+        }
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,135 @@
+"""Prometheus 메트릭 (/api/metrics)
+
+단계별 지연시간, 캐시 hit/miss, 모델별 토큰 수, 처리 중인 요청 수, 모델별 대기열 길이/대기 시간을 기록합니다.
+멀티 워커(uvicorn --workers)에서는 PROMETHEUS_MULTIPROC_DIR을 지정하면 워커별 값을 합쳐 노출합니다.
+"""
+import asyncio
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+
+from config import settings
+
+# 번역/임베딩/벡터 검색은 수십 ms, LLM 생성은 수 초 단위
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+STAGE_SECONDS = Histogram(
+    "chat_stage_seconds",
+    "Latency of each chat pipeline stage",
+    ["stage"],
+    buckets=STAGE_BUCKETS
+)
+STAGE_ERRORS = Counter(
+    "chat_stage_errors_total",
+    "Chat pipeline stages that raised",
+    ["stage"]
+)
+STAGE_CANCELLED = Counter(
+    "chat_stage_cancelled_total",
+    "Chat pipeline stages cut short because the request was cancelled",
+    ["stage"]
+)
+CLIENT_DISCONNECTS = Counter(
+    "chat_client_disconnects_total",
+    "Chat requests abandoned because the client disconnected before the answer was ready",
+    ["endpoint"]
+)
+LLM_TOKENS_SAVED = Counter(
+    "llm_tokens_saved_total",
+    "Output tokens not generated because every waiting request was cancelled",
+    ["model"]
+)
+MESSAGES_DROPPED = Counter(
+    "chat_messages_dropped_total",
+    "Write-behind messages that could not be persisted after retries"
+)
+CHAT_REQUESTS = Counter(
+    "chat_requests_total",
+    "Chat messages processed",
+    ["model", "status"]
+)
+CHAT_IN_FLIGHT = Gauge(
+    "chat_requests_in_flight",
+    "Chat messages currently being processed",
+    multiprocess_mode="livesum"
+)
+ADMISSION_QUEUE = Gauge(
+    "chat_admission_queue_length",
+    "Chat messages waiting for a generation slot",
+    ["model"],
+    multiprocess_mode="livesum"
+)
+ADMISSION_ACTIVE = Gauge(
+    "chat_admission_active",
+    "Chat messages holding a generation slot",
+    ["model"],
+    multiprocess_mode="livesum"
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "chat_admission_wait_seconds",
+    "Time spent waiting for a generation slot",
+    ["model"],
+    buckets=STAGE_BUCKETS
+)
+ADMISSION_REJECTED = Counter(
+    "chat_admission_rejected_total",
+    "Chat messages rejected with 429 (queue_full, deadline)",
+    ["model", "reason"]
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by result (hit ratio = hit / (hit + miss))",
+    ["cache", "result"]
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "Tokens sent to / generated by each model",
+    ["model", "direction"]
+)
+
+# 라벨 값이 무한히 늘지 않도록 설정/목록에 있는 모델 이름만 그대로 사용
+KNOWN_MODELS = {*settings.supported_models, settings.SUMMARY_MODEL}
+
+def model_label(model: str) -> str:
+    return model if model in KNOWN_MODELS else "other"
+
+@contextmanager
+def stage(name: str):
+    """단계 지연시간/오류 측정 (with metrics.stage("vector_search"): ...) - 취소는 오류와 따로 집계"""
+    start = time.perf_counter()
+    try:
+        yield
+    except asyncio.CancelledError:
+        STAGE_CANCELLED.labels(name).inc()
+        raise
+    except BaseException:
+        STAGE_ERRORS.labels(name).inc()
+        raise
+    finally:
+        STAGE_SECONDS.labels(name).observe(time.perf_counter() - start)
+
+def cache_lookup(cache: str, hit: bool):
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+def count_tokens(model: str, input_tokens: int = 0, output_tokens: int = 0):
+    model = model_label(model)
+    if input_tokens:
+        LLM_TOKENS.labels(model, "input").inc(input_tokens)
+    if output_tokens:
+        LLM_TOKENS.labels(model, "output").inc(output_tokens)
+
+def count_tokens_saved(model: str, tokens: int):
+    if tokens > 0:
+        LLM_TOKENS_SAVED.labels(model_label(model)).inc(tokens)
+
+def render() -> bytes:
+    """Prometheus text format"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest()
@@ -1,20 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, WebSocket
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-import json
 
-from database import get_db
-from schemas import ChatRequest, ChatResponse, MessageResponse, ConversationCreate, ConversationResponse
+import codec
+import metrics
+from config import settings
+from database import get_async_db
+from schemas import BatchChatRequest, ChatRequest, ChatResponse, MessageResponse, ConversationCreate, ConversationResponse
+from services.admission import Overloaded
+from services.cancellation import ClientDisconnected, run_until_disconnected
 from services.chat import ChatService
+from services.chat_connection import ChatConnection
 
-router = APIRouter()
+router = APIRouter(default_response_class=codec.ORJSONResponse)
 chat_service = ChatService()
 
 @router.post("/conversation", response_model=ConversationResponse)
 async def create_conversation(
     request: ConversationCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """새 대화 세션 시작"""
     try:
@@ -38,17 +45,21 @@ async def create_conversation(
 @router.post("/message", response_model=ChatResponse)
 async def process_message(
     request: ChatRequest,
-    db: Session = Depends(get_db)
+    http_request: Request,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """사용자 메시지 처리"""
+    """사용자 메시지 처리 (처리 중 클라이언트가 연결을 끊으면 검색/생성/번역을 취소하고 답변도 저장하지 않음)"""
+    model = metrics.model_label(request.model_id or settings.DEFAULT_LLM_MODEL)
     try:
-        response = await chat_service.process_message(request, db)
+        with metrics.CHAT_IN_FLIGHT.track_inprogress():
+            response = await run_until_disconnected(http_request, chat_service.process_message(request, db), "message")
+        metrics.CHAT_REQUESTS.labels(model, "ok").inc()
         
         # 스트리밍 응답
         if request.stream:
             async def generate():
                 async for chunk in response:
-                    yield f"data: {json.dumps(chunk)}\n\n"
+                    yield f"data: {codec.dumps_str(chunk)}\n\n"
                 yield "data: [DONE]\n\n"
             
             return StreamingResponse(
@@ -57,17 +68,69 @@ async def process_message(
             )
         
         return response
+    except ClientDisconnected:
+        # 응답을 받을 클라이언트가 없음 - 상태 코드는 접근 로그용 (nginx의 499 관례)
+        metrics.CHAT_REQUESTS.labels(model, "cancelled").inc()
+        return Response(status_code=499)
+    except Overloaded as e:
+        # 대기열 포화 - 오래 기다리게 하지 않고 바로 재시도 시점 안내
+        metrics.CHAT_REQUESTS.labels(model, "rejected").inc()
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
+        metrics.CHAT_REQUESTS.labels(model, "error").inc()
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/batch")
+async def process_batch(request: BatchChatRequest):
+    """여러 질문 일괄 답변 - 항목별 결과를 끝나는 순서대로 NDJSON으로 스트리밍
+
+    각 줄: {"index", "id", "question", "country", "topic", "status": "ok"|"error", "answer", "references" | "error"}
+    """
+    model = metrics.model_label(request.model_id or settings.DEFAULT_LLM_MODEL)
+    
+    async def generate():
+        # 연결이 끊기면 StreamingResponse가 생성기를 취소하고, answer_batch가 남은 항목을 취소
+        try:
+            async for result in chat_service.answer_batch(request):
+                metrics.CHAT_REQUESTS.labels(model, result["status"]).inc()
+                yield codec.dumps(result) + b"\n"
+        except asyncio.CancelledError:
+            metrics.CLIENT_DISCONNECTS.labels("batch").inc()
+            raise
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+@router.websocket("/ws")
+async def chat_socket(
+    websocket: WebSocket,
+    session_id: str,
+    conversation_id: Optional[int] = None
+):
+    """WebSocket 채팅 - 연결 하나로 여러 메시지를 동시에 스트리밍/취소 (프로토콜은 ChatConnection 참고)"""
+    await websocket.accept()
+    await ChatConnection(websocket, chat_service, session_id, conversation_id).run()
+
 @router.get("/history/{conversation_id}", response_model=List[MessageResponse])
 async def get_conversation_history(
     conversation_id: int,
-    db: Session = Depends(get_db)
+    response: Response,
+    before_id: Optional[int] = Query(None, description="이 메시지 이전 기록 조회 (X-Next-Before-Id 헤더 값)"),
+    limit: int = Query(settings.HISTORY_PAGE_SIZE, ge=1, le=settings.HISTORY_MAX_PAGE_SIZE),
+    include_references: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """대화 기록 조회"""
+    """대화 기록 조회 (최신 페이지부터, 오래된 순 정렬)"""
     try:
-        messages = await chat_service.get_conversation_history(conversation_id, db)
+        messages = await chat_service.get_conversation_history(
+            conversation_id,
+            db,
+            before_id=before_id,
+            limit=limit,
+            include_references=include_references
+        )
+        # 이전 페이지가 더 있을 수 있으면 다음 커서 전달
+        if len(messages) == limit:
+            response.headers["X-Next-Before-Id"] = str(messages[0].id)
         return messages
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,35 +1,60 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from database import get_db
 from schemas import DocumentResponse
-from services.metadata import MetadataService
+from routers.metadata import metadata_service
 
 router = APIRouter()
-metadata_service = MetadataService()
 
-@router.get("/{country_id}/{topic_id}", response_model=List[DocumentResponse])
-async def get_documents_by_filter(
-    country_id: int,
-    topic_id: int,
-    source_id: Optional[int] = None,
-    limit: int = Query(20, le=100),
-    offset: int = Query(0, ge=0),
+@router.get("/{country}/{topic}", response_model=List[DocumentResponse])
+def get_documents_by_filter(
+    country: str,
+    topic: str,
+    response: Response,
+    source: Optional[str] = None,
+    after_id: Optional[int] = Query(None, description="이 문서 이후부터 조회 (X-Next-After-Id 헤더 값)"),
+    limit: int = Query(20, ge=1, le=100),
     db: Session = Depends(get_db)
 ):
-    """필터링된 문서 목록"""
-    return metadata_service.get_documents_by_filter(
-        country_id=country_id,
-        topic_id=topic_id,
-        source_id=source_id,
+    """필터링된 문서 목록 (id 순)"""
+    documents, next_after_id = metadata_service.get_documents_by_filter(
+        country=country,
+        topic=topic,
+        source=source,
+        after_id=after_id,
         limit=limit,
-        offset=offset,
         db=db
     )
+    if next_after_id:
+        response.headers["X-Next-After-Id"] = str(next_after_id)
+    return documents
+
+@router.get("/search", response_model=List[DocumentResponse])
+def search_documents(
+    response: Response,
+    q: str = Query(..., min_length=1, description="검색어"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 값"),
+    db: Session = Depends(get_db)
+):
+    """문서 검색 (관련도 순, 다음 페이지는 X-Next-Cursor 헤더의 커서로 조회)"""
+    try:
+        documents, next_cursor = metadata_service.search_documents(
+            query=q,
+            limit=limit,
+            cursor=cursor,
+            db=db
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return documents
 
 @router.get("/{document_id}", response_model=DocumentResponse)
-async def get_document_detail(
+def get_document_detail(
     document_id: int,
     db: Session = Depends(get_db)
 ):
@@ -38,16 +63,3 @@ async def get_document_detail(
         return metadata_service.get_document_detail(document_id, db)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
-
-@router.get("/search", response_model=List[DocumentResponse])
-async def search_documents(
-    q: str = Query(..., description="검색어"),
-    limit: int = Query(20, le=100),
-    db: Session = Depends(get_db)
-):
-    """문서 검색"""
-    return metadata_service.search_documents(
-        query=q,
-        limit=limit,
-        db=db
-    )
\ No newline at end of file
@@ -1,22 +1,39 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
+from config import settings
 from database import get_db
 from services.metadata import MetadataService
 
 router = APIRouter()
+# /documents 라우터도 같은 인스턴스 사용 (목록 캐시/검색 색인은 프로세스에 하나)
 metadata_service = MetadataService()
 
+def _conditional_response(request: Request, name: str, db: Session) -> Response:
+    """ETag가 일치하면 304, 아니면 목록 반환"""
+    values, etag = metadata_service.get_cached(name, db)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.METADATA_BROWSER_MAX_AGE}, must-revalidate"
+    }
+    
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(values, headers=headers)
+
+# 동기 DB 세션을 쓰므로 일반 def로 선언해 스레드풀에서 실행 (이벤트 루프 블로킹 방지)
 @router.get("/countries", response_model=list[str])
-async def get_countries(db: Session = Depends(get_db)):
+def get_countries(request: Request, db: Session = Depends(get_db)):
     """지원 국가 목록"""
-    return metadata_service.get_countries(db)
+    return _conditional_response(request, "countries", db)
 
 @router.get("/topics", response_model=list[str])
-async def get_topics(db: Session = Depends(get_db)):
+def get_topics(request: Request, db: Session = Depends(get_db)):
     """지원 주제 목록"""
-    return metadata_service.get_topics(db)
+    return _conditional_response(request, "topics", db)
 
 @router.get("/sources", response_model=list[str])
-async def get_sources(db: Session = Depends(get_db)):
+def get_sources(request: Request, db: Session = Depends(get_db)):
     """문서 출처 목록"""
-    return metadata_service.get_sources(db)
\ No newline at end of file
+    return _conditional_response(request, "sources", db)
@@ -1,7 +1,9 @@
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from pydantic import AfterValidator, BaseModel, Field
+from typing import Annotated, Optional, List, Dict, Any, Literal
 from datetime import datetime
 
+from config import settings
+
 # 문서 스키마
 class DocumentBase(BaseModel):
     title: str
@@ -38,13 +40,21 @@ class MessageCreate(BaseModel):
     references: Optional[List[Dict[str, Any]]] = None
 
 class MessageResponse(MessageCreate):
-    id: int
+    id: Optional[int] = None  # write-behind 저장 시 응답 시점에는 아직 없음
     conversation_id: int
     created_at: datetime
     
     class Config:
         from_attributes = True
 
+def _check_model_id(model_id: Optional[str]) -> Optional[str]:
+    if model_id is not None and model_id not in settings.supported_models:
+        raise ValueError(f"Unsupported model_id: {model_id} (supported: {', '.join(sorted(settings.supported_models))})")
+    return model_id
+
+# 허용 목록(settings.supported_models)에 있는 모델만 - 없으면 422
+ModelId = Annotated[Optional[str], AfterValidator(_check_model_id)]
+
 # 채팅 요청/응답
 class ChatRequest(BaseModel):
     message: str
@@ -52,9 +62,23 @@ class ChatRequest(BaseModel):
     session_id: str
     country: Optional[str] = None
     topic: Optional[str] = None
-    model_id: Optional[str] = None
+    model_id: ModelId = None
+    decoding_profile: Optional[Literal["fast", "balanced", "quality", "auto"]] = None  # Flan-T5 전용
     stream: bool = False
 
 class ChatResponse(BaseModel):
     message: MessageResponse
-    conversation_id: int
\ No newline at end of file
+    conversation_id: int
+
+# 배치 질의응답 (/chat/batch, NDJSON 스트리밍)
+class BatchChatItem(BaseModel):
+    id: Optional[str] = None  # 호출자 식별자, 결과에 그대로 포함
+    question: str
+    country: str
+    topic: str
+
+class BatchChatRequest(BaseModel):
+    items: List[BatchChatItem] = Field(..., min_length=1, max_length=settings.BATCH_MAX_ITEMS)
+    model_id: ModelId = None
+    decoding_profile: Optional[Literal["fast", "balanced", "quality", "auto"]] = None  # Flan-T5 전용
+    translate_to_korean: bool = True
\ No newline at end of file
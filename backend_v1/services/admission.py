@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+import metrics
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+class Overloaded(Exception):
+    """생성 슬롯을 얻지 못함 - 429 + Retry-After로 응답"""
+
+    def __init__(self, model: str, reason: str, retry_after: int):
+        super().__init__(f"{model} is overloaded ({reason}), retry after {retry_after}s")
+        self.model = model
+        self.reason = reason
+        self.retry_after = retry_after
+
+class _Gate:
+    """모델 하나의 동시 생성 수 제한 + 제한된 대기열"""
+
+    def __init__(self, model: str, limit: int, max_queue: int, queue_timeout: float):
+        self.model = model
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.waiting = 0
+        self.active = 0
+        self.avg_hold = 1.0  # 슬롯 점유 시간 이동 평균 (초) - Retry-After 추정용
+        self._semaphore = asyncio.Semaphore(limit)
+
+    def retry_after(self) -> int:
+        """앞선 대기열이 빠지는 데 걸릴 예상 시간 (1~60초)"""
+        seconds = self.avg_hold * (self.waiting + 1) / self.limit
+        return max(1, min(60, math.ceil(seconds)))
+
+    def _reject(self, reason: str):
+        metrics.ADMISSION_REJECTED.labels(self.model, reason).inc()
+        raise Overloaded(self.model, reason, self.retry_after())
+
+    async def acquire(self):
+        # 대기열이 가득 차면 기다리지 않고 바로 거절
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self._reject("queue_full")
+
+        self.waiting += 1
+        metrics.ADMISSION_QUEUE.labels(self.model).inc()
+        start = time.perf_counter()
+        # wait_for는 취소와 동시에 슬롯을 얻으면 취소를 삼키고 진행하므로 (Python 3.11 이하) 직접 대기
+        acquire = asyncio.ensure_future(self._semaphore.acquire())
+        try:
+            done, _ = await asyncio.wait({acquire}, timeout=self.queue_timeout)
+            if not done:
+                acquire.cancel()
+                self._reject("deadline")
+        except asyncio.CancelledError:
+            if acquire.done() and not acquire.cancelled():
+                self._semaphore.release()
+            else:
+                acquire.cancel()
+            raise
+        finally:
+            self.waiting -= 1
+            metrics.ADMISSION_QUEUE.labels(self.model).dec()
+            metrics.ADMISSION_WAIT_SECONDS.labels(self.model).observe(time.perf_counter() - start)
+
+        self.active += 1
+        metrics.ADMISSION_ACTIVE.labels(self.model).inc()
+
+    def release(self, held: float):
+        self.avg_hold = 0.9 * self.avg_hold + 0.1 * held
+        self.active -= 1
+        metrics.ADMISSION_ACTIVE.labels(self.model).dec()
+        self._semaphore.release()
+
+class AdmissionController:
+    """모델별 생성 슬롯 관리
+
+    모델마다 동시 생성 수(ADMISSION_MAX_CONCURRENCY, 모델별 ADMISSION_MODEL_LIMITS)를 넘는 요청은
+    대기열에서 기다리고, 대기열이 가득 차거나 ADMISSION_QUEUE_TIMEOUT 안에 슬롯을 얻지 못하면
+    Overloaded를 발생시켜 LLM/번역 호출이 한꺼번에 쌓여 같이 타임아웃되지 않도록 합니다.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = settings.ADMISSION_MAX_CONCURRENCY,
+        max_queue: int = settings.ADMISSION_MAX_QUEUE,
+        queue_timeout: float = settings.ADMISSION_QUEUE_TIMEOUT,
+        model_limits: Optional[Dict[str, int]] = None,
+        enabled: bool = settings.ADMISSION_ENABLED
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.model_limits = settings.ADMISSION_MODEL_LIMITS if model_limits is None else model_limits
+        self.enabled = enabled
+        self._gates: Dict[str, _Gate] = {}
+
+    def gate(self, model_id: str) -> _Gate:
+        # 목록에 없는 모델은 "other" 하나로 묶어 게이트/메트릭 수가 늘지 않게 함
+        model = metrics.model_label(model_id)
+        gate = self._gates.get(model)
+        if gate is None:
+            limit = self.model_limits.get(model_id, self.model_limits.get(model, self.max_concurrency))
+            gate = self._gates[model] = _Gate(model, limit, self.max_queue, self.queue_timeout)
+        return gate
+
+    @asynccontextmanager
+    async def slot(self, model_id: str):
+        """async with admission.slot(model_id): ... (슬롯을 얻지 못하면 Overloaded)"""
+        if not self.enabled:
+            yield
+            return
+
+        gate = self.gate(model_id)
+        await gate.acquire()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            gate.release(time.perf_counter() - start)
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        return {
+            model: {"active": gate.active, "waiting": gate.waiting, "limit": gate.limit}
+            for model, gate in self._gates.items()
+        }
@@ -0,0 +1,43 @@
+import asyncio
+import logging
+from typing import Awaitable, TypeVar
+
+from starlette.requests import Request
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class ClientDisconnected(Exception):
+    """응답을 받을 클라이언트가 처리 도중 연결을 끊음"""
+
+async def _wait_for_disconnect(request: Request):
+    # 본문은 이미 읽었으므로 이후 receive()는 연결이 끊길 때 http.disconnect를 돌려줌
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+async def run_until_disconnected(request: Request, work: Awaitable[T], endpoint: str) -> T:
+    """클라이언트 연결을 지켜보며 작업 실행 - 끊기면 작업(검색/생성/번역)을 취소하고 ClientDisconnected 발생
+
+    작업이 취소될 때까지 기다린 뒤 반환하므로, 요청의 DB 세션이 닫힌 뒤에 작업이 세션을 쓰는 일이 없습니다.
+    """
+    task = asyncio.ensure_future(work)
+    watcher = asyncio.create_task(_wait_for_disconnect(request))
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        # 서버 종료 등으로 핸들러 자체가 취소된 경우도 함께 정리
+        if not task.done():
+            task.cancel()
+        watcher.cancel()
+        await asyncio.gather(task, watcher, return_exceptions=True)
+
+    if task.cancelled():
+        metrics.CLIENT_DISCONNECTS.labels(endpoint).inc()
+        logger.info(f"Client disconnected from {endpoint}, in-flight work cancelled")
+        raise ClientDisconnected(endpoint)
+    return task.result()
@@ -0,0 +1,241 @@
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import inspect, select
+
+import metrics
+from config import settings
+from database import FAQ, Document, SessionLocal
+from services.commit_hooks import on_commit
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[Optional[str], Optional[str]]
+
+def _lower(value: Optional[str]) -> Optional[str]:
+    return value.lower() if value else value
+
+def _keys(country: Optional[str], topic: Optional[str]) -> Set[Key]:
+    """한 행이 포함되는 조회 키 - 필터 없음(None)도 하나의 키로 취급
+
+    조회는 소문자로 하고 DB(MySQL 기본 collation)는 대소문자를 구분하지 않으므로 키도 소문자로 통일
+    """
+    country, topic = _lower(country), _lower(topic)
+    return {(country, topic), (country, None), (None, topic), (None, None)}
+
+def _matches(key: Key, pair: Key) -> bool:
+    """행의 (country, topic)이 조회 키에 포함되는지 (키의 None은 필터 없음)"""
+    return (key[0] is None or key[0] == pair[0]) and (key[1] is None or key[1] == pair[1])
+
+def _changed_pairs(target) -> Set[Key]:
+    """추가/수정/삭제된 행의 변경 전후 (country, topic) - 소문자 (flush 시점에 호출)"""
+    state = inspect(target)
+    countries = {target.country, *state.attrs.country.history.deleted}
+    topics = {target.topic, *state.attrs.topic.history.deleted}
+    return {(_lower(country), _lower(topic)) for country in countries for topic in topics}
+
+class CatalogCache:
+    """(country, topic)별 예시 질문 / 문서 출처 URL 조회 테이블
+
+    시작 시 컬럼 프로젝션으로 한 번에 만들고, CATALOG_REFRESH_SECONDS가 지나면 조회 시 백그라운드에서
+    다시 만듭니다 (FAQ/문서는 주로 init_db 등 다른 프로세스가 쓰므로 주기적 재빌드가 기본 갱신 경로).
+    이 프로세스의 FAQ/Document 변경은 커밋된 뒤 해당 키를 dirty로 표시해 다음 조회 때 DB에서 다시 읽습니다.
+
+    URL은 문서 수만큼 많으므로 실제 (country, topic) 조합별로 정렬된 튜플 하나만 두고, 국가나 토픽만
+    지정한 조회는 해당 조합을 합쳐 만든 뒤 관련 변경이 커밋될 때까지 재사용합니다.
+    DB 재조회는 인덱스를 쓰도록 컬럼을 그대로 비교하며, 대소문자 무시는 DB collation(MySQL 기본)에 맡깁니다.
+    """
+
+    def __init__(
+        self,
+        max_questions: int = settings.EXAMPLE_QUESTIONS_LIMIT,
+        refresh_seconds: float = settings.CATALOG_REFRESH_SECONDS
+    ):
+        self.max_questions = max_questions
+        self.refresh_seconds = refresh_seconds
+        # key -> [(created_at, id, question)] 최신순 상위 max_questions개
+        self._questions: Dict[Key, List[Tuple[datetime, int, str]]] = {}
+        # 행의 (country, topic) -> 정렬된 중복 없는 URL
+        self._urls: Dict[Key, Tuple[str, ...]] = {}
+        # 국가/토픽 중 하나 이상이 None인 조회 키 -> _urls를 합친 결과 (관련 변경 커밋 시 삭제)
+        self._merged_urls: Dict[Key, Tuple[str, ...]] = {}
+        self._dirty_questions: Set[Key] = set()
+        self._dirty_urls: Set[Key] = set()
+        # 빌드 중에 커밋된 변경 - 빌드가 읽은 값보다 새로울 수 있으므로 빌드 후에도 dirty로 유지
+        self._marked_during_build: Optional[Tuple[Set[Key], Set[Key]]] = None
+        self._complete = False  # 전체 빌드 완료 여부 (완료 후 없는 키 = 결과 없음)
+        self._built_at: Optional[float] = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+        on_commit(FAQ, _changed_pairs, self._on_faq_commit)
+        on_commit(Document, _changed_pairs, self._on_document_commit)
+
+    def build(self):
+        """전체 조회 테이블 생성"""
+        with self._lock:
+            self._marked_during_build = (set(), set())
+        questions: Dict[Key, List[Tuple[datetime, int, str]]] = {}
+        urls: Dict[Key, Set[str]] = {}
+        db = SessionLocal()
+        try:
+            faq_rows = db.execute(
+                select(FAQ.id, FAQ.country, FAQ.topic, FAQ.question, FAQ.created_at)
+            )
+            for faq_id, country, topic, question, created_at in faq_rows:
+                item = (created_at or datetime.min, faq_id, question)
+                for key in _keys(country, topic):
+                    self._push_question(questions.setdefault(key, []), item)
+
+            url_rows = db.execute(
+                select(Document.country, Document.topic, Document.url).where(Document.url != None).distinct()
+            )
+            for country, topic, url in url_rows:
+                urls.setdefault((_lower(country), _lower(topic)), set()).add(url)
+        except Exception:
+            with self._lock:
+                self._marked_during_build = None
+            raise
+        finally:
+            db.close()
+
+        with self._lock:
+            self._questions = questions
+            self._urls = {pair: tuple(sorted(values)) for pair, values in urls.items()}
+            self._merged_urls = {}
+            self._dirty_questions, self._dirty_urls = self._marked_during_build
+            self._marked_during_build = None
+            self._complete = True
+            self._built_at = time.monotonic()
+        logger.info(f"Catalog built: {len(questions)} question keys, {len(urls)} source pairs")
+
+    def _maybe_refresh(self):
+        """마지막 빌드 후 refresh_seconds가 지났으면 백그라운드 재빌드 (그동안은 기존 테이블 사용)"""
+        with self._lock:
+            if self._refreshing or self._built_at is None or time.monotonic() - self._built_at < self.refresh_seconds:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh, name="catalog-refresh", daemon=True).start()
+
+    def _refresh(self):
+        try:
+            self.build()
+        except Exception as e:
+            logger.warning(f"Catalog refresh failed: {e}")
+            with self._lock:
+                self._built_at = time.monotonic()  # 다음 주기에 다시 시도
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def get_example_questions(self, country: Optional[str], topic: Optional[str]) -> List[str]:
+        self._maybe_refresh()
+        key = (_lower(country), _lower(topic))
+        with self._lock:
+            hit = key not in self._dirty_questions and (key in self._questions or self._complete)
+            metrics.cache_lookup("example_questions", hit)
+            if hit:
+                return [question for _, _, question in self._questions.get(key, [])]
+
+        items = self._load_questions(key)
+        with self._lock:
+            self._questions[key] = items
+            self._dirty_questions.discard(key)
+        return [question for _, _, question in items]
+
+    def get_document_sources(self, country: Optional[str], topic: Optional[str]) -> Tuple[str, ...]:
+        """정렬된 출처 URL (캐시된 튜플을 그대로 반환)"""
+        self._maybe_refresh()
+        key = (_lower(country), _lower(topic))
+        exact = key[0] is not None and key[1] is not None
+        with self._lock:
+            if exact:
+                hit = key not in self._dirty_urls and (key in self._urls or self._complete)
+                cached = self._urls.get(key, ())
+            else:
+                hit = key in self._merged_urls
+                cached = self._merged_urls.get(key)
+            metrics.cache_lookup("document_sources", hit)
+            if hit:
+                return cached
+            complete = self._complete
+            dirty = [pair for pair in self._dirty_urls if _matches(key, pair)]
+
+        if not exact and not complete:
+            # 첫 빌드 전에는 합칠 조합을 모르므로 DB에서 바로 조회
+            return self._load_urls(key)
+
+        # dirty 조합만 다시 읽고, 국가/토픽만 지정한 조회는 조합들을 합쳐 저장
+        loaded = {pair: self._load_urls(pair, pair=True) for pair in ([key] if exact else dirty)}
+        with self._lock:
+            for pair, urls in loaded.items():
+                if urls:
+                    self._urls[pair] = urls
+                else:
+                    self._urls.pop(pair, None)
+                self._dirty_urls.discard(pair)
+            if exact:
+                return loaded[key]
+            merged = self._merge(urls for pair, urls in self._urls.items() if _matches(key, pair))
+            self._merged_urls[key] = merged
+        return merged
+
+    @staticmethod
+    def _merge(groups: Iterable[Tuple[str, ...]]) -> Tuple[str, ...]:
+        return tuple(sorted(set().union(*groups)))
+
+    def _push_question(self, items: List[Tuple[datetime, int, str]], item: Tuple[datetime, int, str]):
+        items.append(item)
+        items.sort(reverse=True)
+        del items[self.max_questions:]
+
+    def _load_questions(self, key: Key) -> List[Tuple[datetime, int, str]]:
+        """한 키의 상위 질문을 DB에서 조회"""
+        country, topic = key
+        query = select(FAQ.created_at, FAQ.id, FAQ.question)
+        if country:
+            query = query.where(FAQ.country == country)
+        if topic:
+            query = query.where(FAQ.topic == topic)
+        query = query.order_by(FAQ.created_at.desc(), FAQ.id.desc()).limit(self.max_questions)
+        db = SessionLocal()
+        try:
+            return [(created_at or datetime.min, faq_id, question) for created_at, faq_id, question in db.execute(query)]
+        finally:
+            db.close()
+
+    def _load_urls(self, key: Key, pair: bool = False) -> Tuple[str, ...]:
+        """출처 URL을 DB에서 조회 - (country, topic, id) 인덱스 사용
+
+        pair면 key는 행의 (country, topic) 조합이라 None은 NULL 값, 아니면 None은 필터 없음
+        """
+        country, topic = key
+        query = select(Document.url).where(Document.url != None)
+        if country is not None or pair:
+            query = query.where(Document.country == country)
+        if topic is not None or pair:
+            query = query.where(Document.topic == topic)
+        db = SessionLocal()
+        try:
+            return tuple(sorted(set(db.scalars(query.distinct()))))
+        finally:
+            db.close()
+
+    def _on_faq_commit(self, changes):
+        keys = set().union(*(_keys(*pair) for _, pairs in changes for pair in pairs))
+        with self._lock:
+            self._dirty_questions.update(keys)
+            if self._marked_during_build is not None:
+                self._marked_during_build[0].update(keys)
+
+    def _on_document_commit(self, changes):
+        pairs = set().union(*(pairs for _, pairs in changes))
+        with self._lock:
+            self._dirty_urls.update(pairs)
+            for key in [key for key in self._merged_urls if any(_matches(key, pair) for pair in pairs)]:
+                del self._merged_urls[key]
+            if self._marked_during_build is not None:
+                self._marked_during_build[1].update(pairs)
@@ -1,22 +1,153 @@
-import json
+import asyncio
 import logging
 import os
-from sqlalchemy.orm import Session
+import threading
+from datetime import datetime
+from functools import cached_property, partial
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import select, update, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import Conversation, Message
-from schemas import ChatRequest, ChatResponse, MessageResponse
-from ai_services.rag import RAG
+import metrics
+from config import settings
+from database import AsyncSessionLocal, Conversation, Message
+from schemas import BatchChatRequest, ChatRequest, ChatResponse, MessageResponse
+from ai_services.rag import RAG, RetrievalState
 from ai_services.llm import LLM
+from ai_services.summarizer import ConversationSummarizer
+from ai_services.mock import MockLLM, MockRAG, MockSummarizer
+from services.message_writer import MessageWriter
+from services.history_cache import HistoryCache
+from services.catalog import CatalogCache
+from services.readiness import Readiness
+from services.admission import AdmissionController, Overloaded
+from services.single_flight import SingleFlight
+from services.faq_answers import FAQAnswerStore
+from services.retrieval_memory import RetrievalMemory
 
 logger = logging.getLogger(__name__)
 
+def _normalize_question(text: str) -> str:
+    """공백/대소문자/끝 문장부호 차이만 있는 질문을 같은 질문으로 취급"""
+    return " ".join(text.split()).casefold().rstrip("?!. ")
+
+def _retrieval_partition(country: str, topic: str) -> Tuple[str, str]:
+    """벡터 DB 태그의 (국가, 문서 타입)"""
+    country = country.replace(" " , "").lower()
+    if topic == "immigration":
+        topic = "immigration_regulations_info"
+    elif topic == "safety":
+        topic = "immigration_safety_info"
+    else :
+        topic = topic + "_info"
+    return country, topic
+
+class _TokenRelay:
+    """공유 생성(single-flight)의 답변 조각을 요청한 호출자에게 전달
+
+    생성 작업은 호출자보다 오래 살 수 있으므로 호출자의 콜백을 직접 넘기지 않고,
+    호출자가 끝나거나 취소되면 detach()로 분리해 이후 조각은 버립니다.
+    """
+
+    def __init__(self, on_token: Callable[[str], Awaitable[None]]):
+        self._on_token: Optional[Callable[[str], Awaitable[None]]] = on_token
+
+    def detach(self):
+        self._on_token = None
+
+    async def __call__(self, content: str):
+        if self._on_token is not None:
+            await self._on_token(content)
+
 class ChatService:
     
     def __init__(self):
-        self.rag = RAG()
-        self.llm = LLM()
+        self.message_writer = MessageWriter()
+        self.history_cache = HistoryCache()
+        self.catalog = CatalogCache()
+        self.admission = AdmissionController()
+        self.single_flight = SingleFlight()
+        self.faq_answers = FAQAnswerStore(lambda: self.rag.index_version())
+        self.retrieval_memory = RetrievalMemory()
+        self._summarizing = set()
+        self._background_tasks = set()
+        self._llms: Dict[str, LLM] = {}
+        self._llm_lock = threading.Lock()
+
+    # RAG/LLM/요약기는 벡터 DB 연결과 무거운 라이브러리 로드가 필요하므로 처음 사용할 때 생성
+    @cached_property
+    def rag(self) -> RAG:
+        return MockRAG() if settings.MOCK_PROVIDERS else RAG()
+
+    @property
+    def llm(self) -> LLM:
+        return self.get_llm(settings.DEFAULT_LLM_MODEL)
+
+    @cached_property
+    def summarizer(self) -> ConversationSummarizer:
+        return MockSummarizer() if settings.MOCK_PROVIDERS else ConversationSummarizer()
+
+    def get_llm(self, model_id: str) -> LLM:
+        """모델별 LLM 인스턴스 (Flan-T5 등 모델 로드는 모델당 한 번만)
+
+        허용 목록 밖의 모델은 ValueError (요청은 스키마에서 먼저 422로 거절됨).
+        Flan-T5 별칭("flan-t5-base" 등)은 모두 같은 모델을 로드하므로 FLAN_T5_MODEL_ID 하나로 캐시합니다.
+        """
+        if model_id not in settings.supported_models:
+            raise ValueError(f"Unsupported model_id: {model_id}")
+        if "t5" in model_id.lower():
+            model_id = settings.FLAN_T5_MODEL_ID
+        llm = self._llms.get(model_id)
+        if llm is None:
+            with self._llm_lock:
+                llm = self._llms.get(model_id)
+                if llm is None:
+                    llm_class = MockLLM if settings.MOCK_PROVIDERS else LLM
+                    llm = self._llms[model_id] = llm_class(model_name=model_id)
+        return llm
+
+    async def startup(self):
+        """애플리케이션 시작 시 실행"""
+        self.message_writer.start()
+
+    async def warm_up(self, readiness: Readiness):
+        """첫 요청이 느리지 않도록 벡터 DB, 모델, 캐시, 커넥션 풀을 미리 준비"""
+        from ai_services.init_vector_db import check_and_init_vector_db
+
+        async def vector_store():
+            if not settings.MOCK_PROVIDERS:
+                await asyncio.to_thread(check_and_init_vector_db)
+            await asyncio.to_thread(self.rag.warm_up, False)
 
-    async def create_conversation(self, session_id: str, country_id: str, topic_id: str, db: Session):
+        async def llm():
+            await asyncio.to_thread(lambda: self.llm)
+
+        steps = [
+            # 예시 질문/출처 조회 테이블
+            readiness.run("catalog", self.catalog.build),
+            readiness.run("history_tokenizer", self.history_cache.count_tokens, "warm up"),
+            readiness.run("vector_store", vector_store),
+            readiness.run("llm", llm),
+        ]
+        for model_id in settings.PRELOAD_MODELS:
+            steps.append(readiness.run(f"model:{model_id}", self.get_llm, model_id))
+        await asyncio.gather(*steps)
+        # 인덱스 버전을 확인하려면 벡터 DB가 먼저 준비되어 있어야 함
+        await readiness.run("faq_answers", self.faq_answers.load, required=False)
+
+        if settings.WARMUP_CONNECTIONS:
+            await asyncio.gather(
+                readiness.run("openai_embeddings", self.rag.warm_up, True, required=False),
+                readiness.run("openai_chat", self.llm.warm_up, required=False),
+            )
+
+    async def shutdown(self):
+        """애플리케이션 종료 시 실행 - 진행 중인 요약 대기 및 write-behind 큐 비우기"""
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        await self.message_writer.stop()
+
+    async def create_conversation(self, session_id: str, country_id: str, topic_id: str, db: AsyncSession):
         """새 대화 세션 생성"""
         conversation = Conversation(
             session_id=session_id,
@@ -24,25 +155,58 @@ class ChatService:
             topic=topic_id      # topic_id -> topic
         )
         db.add(conversation)
-        db.commit()
-        db.refresh(conversation)
+        await db.commit()
+        await db.refresh(conversation)
         return conversation
 
-    async def get_conversation_history(self, conversation_id: int, db: Session):
-        """대화 기록 반환"""
-        messages = db.query(Message).filter(
-            Message.conversation_id == conversation_id
-        ).order_by(Message.created_at).all()
-        return [
-            MessageResponse(
-                id=m.id,
-                conversation_id=m.conversation_id,
-                role=m.role,
-                content=m.content,
-                references=json.loads(m.references) if m.references else [],
-                created_at=m.created_at
-            ) for m in messages
-        ]
+    async def get_conversation_history(
+        self,
+        conversation_id: int,
+        db: AsyncSession,
+        before_id: Optional[int] = None,
+        limit: int = 50,
+        include_references: bool = False
+    ) -> List[MessageResponse]:
+        """대화 기록 반환 - before_id 이전의 최근 limit개 (오래된 순)"""
+        columns = [Message.id, Message.role, Message.content, Message.created_at]
+        if include_references:
+            columns.append(Message.references)
+        query = select(*columns).where(Message.conversation_id == conversation_id)
+        
+        # keyset 페이지네이션: (created_at, id) < 기준 메시지
+        if before_id:
+            before_created_at = await db.scalar(
+                select(Message.created_at).where(
+                    Message.id == before_id,
+                    Message.conversation_id == conversation_id
+                )
+            )
+            if before_created_at is None:
+                return []
+            query = query.where(or_(
+                Message.created_at < before_created_at,
+                and_(Message.created_at == before_created_at, Message.id < before_id)
+            ))
+        
+        # (conversation_id, created_at) 인덱스를 역순으로 읽고 서버 사이드 커서로 스트리밍
+        query = query.order_by(Message.created_at.desc(), Message.id.desc()).limit(limit)
+        result = await db.stream(query.execution_options(yield_per=settings.HISTORY_YIELD_PER))
+        
+        messages = []
+        async for row in result:
+            references = None
+            if include_references:
+                references = row.references or []
+            messages.append(MessageResponse(
+                id=row.id,
+                conversation_id=conversation_id,
+                role=row.role,
+                content=row.content,
+                references=references,
+                created_at=row.created_at
+            ))
+        messages.reverse()
+        return messages
 
     def get_available_models(self):
         """사용 가능한 LLM 모델 목록 반환"""
@@ -61,73 +225,82 @@ class ChatService:
 
     def get_example_questions(self, country: str = None, topic: str = None):
         """FAQ 반환"""
-        from database import FAQ, SessionLocal
-        
-        # DB 세션 생성
-        db = SessionLocal()
         try:
-            # DB에서 예시 질문 가져오기
-            query = db.query(FAQ)
-            
-            # 필터 적용
-            if country:
-                query = query.filter(FAQ.country == country.lower())
-            if topic:
-                if topic=="safety":
-                    topic="immigration_safety"
-                query = query.filter(FAQ.topic == topic.lower())
-                
-            # 생성일 기준 정렬 및 가져오기
-            questions = query.order_by(FAQ.created_at.desc()).limit(5).all()
+            if topic == "safety":
+                topic = "immigration_safety"
+            questions = self.catalog.get_example_questions(
+                country.lower() if country else None,
+                topic.lower() if topic else None
+            )
             
             # 결과 가공
             if questions:
-                return [q.question for q in questions]
+                return questions
                 
         except Exception as e:
             logger.error(f"Error fetching example questions: {e}")
-        finally:
-            db.close()
     
     def get_document_sources(self, country: str = None, topic: str = None):
         """선택된 국가/토픽의 문서 출처 URL들 반환"""
-        from database import Document, SessionLocal
-        
-        # DB 세션 생성
-        db = SessionLocal()
         try:
-            # 토픽 변환
-            doc_topic = topic
-            # DB에서 문서 가져오기
-            query = db.query(Document)
-            
-            # 필터 적용
-            if country:
-                query = query.filter(Document.country == country.lower())
-            if doc_topic:
-                query = query.filter(Document.topic == doc_topic.lower())
-                
-            # URL이 있는 문서만 가져오기
-            documents = query.filter(Document.url != None).all()
-            
-            # 중복 제거한 URL 리스트 반환
-            urls = list(set([doc.url for doc in documents if doc.url]))
-            return urls
-                
+            return self.catalog.get_document_sources(
+                country.lower() if country else None,
+                topic.lower() if topic else None
+            )
         except Exception as e:
             logger.error(f"Error fetching document sources: {e}")
             return []
-        finally:
-            db.close()
 
-    async def process_message(self, request: ChatRequest, db: Session) -> ChatResponse:
-        """메시지 처리"""
+    async def process_message(
+        self,
+        request: ChatRequest,
+        db: AsyncSession,
+        on_token: Optional[Callable[[str], Awaitable[None]]] = None,
+        conversation: Optional[Conversation] = None
+    ) -> ChatResponse:
+        """메시지 처리
+
+        on_token: 최종(번역된) 답변 조각을 생성되는 대로 전달받는 콜백 (WebSocket 스트리밍)
+        conversation: 호출자가 들고 있는 대화 객체 - 히스토리가 캐시에 있으면 DB에서 다시 읽지 않음
+        """
+        
+        # 사용자 메시지 (응답과 함께 저장)
+        user_message = Message(
+            role="user",
+            content=request.message,
+            created_at=datetime.utcnow()
+        )
         
         # 대화 가져오기 또는 생성
+        history = []
+        summary = None
         if request.conversation_id:
-            conversation = db.query(Conversation).filter(
-                Conversation.id == request.conversation_id
-            ).first()
+            with metrics.stage("history_load"):
+                # 캐시에 없을 때만 대화와 요약 이후의 최근 메시지를 DB에서 읽기
+                cached = request.conversation_id in self.history_cache
+                metrics.cache_lookup("history", cached)
+                if conversation is None or conversation.id != request.conversation_id or not cached:
+                    conversation = await db.get(Conversation, request.conversation_id)
+                if not cached:
+                    query = select(Message.id, Message.role, Message.content, Message.created_at).where(
+                        Message.conversation_id == conversation.id
+                    )
+                    if conversation.summarized_until_id:
+                        query = query.where(Message.id > conversation.summarized_until_id)
+                    result = await db.execute(
+                        # MySQL DATETIME은 초 단위라 같은 초의 질문/답변은 id로 순서 결정
+                        query.order_by(Message.created_at.desc(), Message.id.desc()).limit(self.history_cache.max_turns)
+                    )
+                    self.history_cache.load(conversation.id, [
+                        {"id": id, "role": role, "content": content, "created_at": created_at}
+                        for id, role, content, created_at in reversed(result.all())
+                    ], summary=conversation.summary)
+                # LLM 호출 동안 커넥션을 점유하지 않도록 읽기 트랜잭션 종료
+                await db.commit()
+            
+            # 요약 + 최근 HISTORY_MAX_TOKENS 이내의 대화만 사용
+            history = self.history_cache.window(conversation.id)
+            summary = self.history_cache.summary(conversation.id)
         else:
             conversation = Conversation(
                 session_id=request.session_id,
@@ -135,100 +308,70 @@ class ChatService:
                 topic=request.topic
             )
             db.add(conversation)
-            db.commit()
-            db.refresh(conversation)
-        
-        # 사용자 메시지 저장
-        user_message = Message(
-            conversation_id=conversation.id,
-            role="user",
-            content=request.message
-        )
-        db.add(user_message)
-        db.commit()
-        db.refresh(user_message)
-        
-        # 이전 메시지들 가져오기 (현재 메시지 제외)
-        previous_messages = db.query(Message).filter(
-            Message.conversation_id == conversation.id,
-            Message.id != user_message.id
-        ).order_by(Message.created_at.asc()).all()
-        
-        history = [
-            {"role": m.role, "content": m.content}
-            for m in previous_messages
-        ]
+            if self.message_writer.enabled:
+                # write-behind 큐에 넣으려면 대화 ID가 먼저 필요
+                await db.commit()
         
         # 디버그: 히스토리 확인
         logger.info(f"Conversation {conversation.id} history: {len(history)} messages")
         
-        country = request.country or conversation.country
-        country = country.replace(" " , "").lower()
-        
-        topic = request.topic or conversation.topic
-        if topic == "immigration":
-            topic = "immigration_regulations_info"
-        elif topic == "safety":
-            topic = "immigration_safety_info"
-        else :
-            topic = topic + "_info"
-        
-        # RAG 검색 (번역 포함)
-        context, references = self.rag.search_with_translation(
-            query=request.message,
-            country=country,
-            doc_type=topic
+        country, topic = _retrieval_partition(
+            request.country or conversation.country,
+            request.topic or conversation.topic
         )
         
-        # RAG 검색 결과 로그
-        logger.info(f"RAG context length: {len(context) if context else 0}")
-        logger.info(f"References found: {len(references) if references else 0}")
+        # FAQ와 같은 질문은 미리 생성한 답변 사용 (FAQ 질문은 이전 대화 없이도 뜻이 완결됨)
+        # 디코딩 프로필을 지정한 요청은 기본 프로필로 만든 답변과 다를 수 있으므로 제외
+        model_id = request.model_id or settings.DEFAULT_LLM_MODEL
+        precomputed = None
+        if request.decoding_profile is None:
+            precomputed = self.faq_answers.get(_normalize_question(request.message), country, topic, model_id)
+            metrics.cache_lookup("faq_answer", precomputed is not None)
         
-        # LLM 응답 생성 (번역 포함)
-        # 사용자가 선택한 모델이 있는 경우 해당 모델 사용
-        if request.model_id:
-            # Flan-T5 모델인지 확인
-            if "t5" in request.model_id.lower():
-                llm = LLM(model_name=request.model_id)
-                response_text = await llm.generate_with_translation(
-                    query=request.message,
-                    context=context,
-                    references=references,
-                    history=history,
-                    translate_to_korean=True,
-                    system_prompt="You are a kind AI assistant who answers questions related to immigration, insurance, national safety, and visa information for different countries. Provide accurate and helpful answers to your questions."
-                )
+        # 직전 턴의 검색 후보 (후속 질문이면 재사용)
+        retrieval_state = self.retrieval_memory.get(conversation.id)
+        
+        # 이전 대화가 없는 질문은 동시에 들어온 같은 질문과 검색/생성을 공유 (메시지는 요청마다 저장)
+        relay = _TokenRelay(on_token) if on_token else None
+        generate = partial(self._generate, request, country, topic, history, summary, relay, retrieval_state)
+        try:
+            if precomputed is not None:
+                response_text, references = precomputed
+                retrieval_state = None
+            elif settings.SINGLE_FLIGHT_ENABLED and not history and not summary and retrieval_state is None:
+                # 마지막 값: 빈 히스토리 여부 (이전 대화가 있는 요청은 답이 달라지므로 합치지 않음)
+                # 먼저 시작한 요청만 스트리밍되고, 합쳐진 요청은 완성된 답변만 받음
+                # 먼저 시작한 요청이 취소되어도 작업은 나머지를 위해 계속되므로 relay를 분리해 조각을 보내지 않음
+                key = (_normalize_question(request.message), country, topic, model_id, request.decoding_profile, True)
+                (response_text, references, retrieval_state), shared = await self.single_flight.do(key, generate)
+                metrics.cache_lookup("single_flight", shared)
             else:
-                llm = LLM(model_name=request.model_id)
-                response_text = await llm.generate_with_translation(
-                    query=request.message,
-                    context=context,
-                    references=references,
-                    history=history,
-                    translate_to_korean=True
-                )
-        else:
-            response_text = await self.llm.generate_with_translation(
-                query=request.message,
-                context=context,
-                references=references,
-                history=history,
-                translate_to_korean=True
-            )
+                response_text, references, retrieval_state = await generate()
+        finally:
+            if relay:
+                relay.detach()
         
         # 응답 길이 로그
         logger.info(f"Generated response length: {len(response_text) if response_text else 0}")
         
-        # 응답 저장
+        # 응답 저장 (사용자/어시스턴트 메시지를 한 번에)
         assistant_message = Message(
-            conversation_id=conversation.id,
             role="assistant",
             content=response_text,
-            references=json.dumps(references)
+            references=references or None,  # 참조가 없으면 '[]' 대신 SQL NULL
+            created_at=datetime.utcnow()
         )
-        db.add(assistant_message)
-        db.commit()
-        db.refresh(assistant_message)
+        with metrics.stage("db_commit"):
+            await self._save_messages(conversation, [user_message, assistant_message], db)
+        self.history_cache.append(conversation.id, [
+            {"id": m.id, "role": m.role, "content": m.content, "created_at": m.created_at}
+            for m in (user_message, assistant_message)
+        ])
+        if retrieval_state is not None:
+            self.retrieval_memory.put(conversation.id, retrieval_state)
+        
+        # 대화가 길어지면 응답 이후 백그라운드에서 오래된 턴 요약
+        self._schedule_summary(conversation.id)
         
         return ChatResponse(
             message=MessageResponse(
@@ -241,3 +384,274 @@ class ChatService:
             ),
             conversation_id=conversation.id
         )
+
+    async def _generate(
+        self,
+        request: ChatRequest,
+        country: str,
+        topic: str,
+        history: List[Dict[str, str]],
+        summary: Optional[str],
+        on_token: Optional[Callable[[str], Awaitable[None]]] = None,
+        retrieval_state: Optional[RetrievalState] = None
+    ) -> Tuple[str, List[Dict], Optional[RetrievalState]]:
+        """검색 + 응답 생성 - 모델별 생성 슬롯을 얻은 뒤 실행 (대기열 초과 시 Overloaded)
+        
+        (응답, 참조, 다음 턴에 넘길 검색 상태) 반환 - 검색 상태는 RETRIEVAL_MEMORY_ENABLED일 때만
+        """
+        async with self.admission.slot(request.model_id or settings.DEFAULT_LLM_MODEL):
+            # RAG 검색 (번역 포함) - 스레드에서 실행해 이벤트 루프를 막지 않고, 요청이 취소되면 결과를 기다리지 않음
+            with metrics.stage("retrieval"):
+                if settings.RETRIEVAL_MEMORY_ENABLED:
+                    context, references, retrieval_state = await asyncio.to_thread(
+                        self.rag.search_in_conversation,
+                        query=request.message,
+                        country=country,
+                        doc_type=topic,
+                        state=retrieval_state
+                    )
+                else:
+                    context, references = await asyncio.to_thread(
+                        self.rag.search_with_translation,
+                        query=request.message,
+                        country=country,
+                        doc_type=topic
+                    )
+            
+            # RAG 검색 결과 로그
+            logger.info(f"RAG context length: {len(context) if context else 0}")
+            logger.info(f"References found: {len(references) if references else 0}")
+            
+            response_text = await self._answer(
+                request.message,
+                context,
+                references,
+                model_id=request.model_id,
+                decoding_profile=request.decoding_profile,
+                history=history,
+                summary=summary,
+                on_token=on_token
+            )
+        return response_text, references, retrieval_state
+
+    async def _answer(
+        self,
+        query: str,
+        context: str,
+        references: List[Dict],
+        model_id: Optional[str] = None,
+        decoding_profile: Optional[str] = None,
+        history: Optional[List[Dict[str, str]]] = None,
+        summary: Optional[str] = None,
+        translate_to_korean: bool = True,
+        on_token: Optional[Callable[[str], Awaitable[None]]] = None
+    ) -> str:
+        """LLM 응답 생성 (번역 포함)"""
+        # 사용자가 선택한 모델이 있는 경우 해당 모델 사용
+        if model_id:
+            llm = await asyncio.to_thread(self.get_llm, model_id)
+            # Flan-T5 모델인지 확인
+            if "t5" in model_id.lower():
+                return await llm.generate_with_translation(
+                    query=query,
+                    context=context,
+                    references=references,
+                    history=history,
+                    summary=summary,
+                    translate_to_korean=translate_to_korean,
+                    on_token=on_token,
+                    decoding_profile=decoding_profile,
+                    system_prompt="You are a kind AI assistant who answers questions related to immigration, insurance, national safety, and visa information for different countries. Provide accurate and helpful answers to your questions."
+                )
+            return await llm.generate_with_translation(
+                query=query,
+                context=context,
+                references=references,
+                history=history,
+                summary=summary,
+                translate_to_korean=translate_to_korean,
+                on_token=on_token
+            )
+        return await self.llm.generate_with_translation(
+            query=query,
+            context=context,
+            references=references,
+            history=history,
+            summary=summary,
+            translate_to_korean=translate_to_korean,
+            on_token=on_token
+        )
+
+    async def answer_batch(self, request: BatchChatRequest) -> AsyncIterator[Dict[str, Any]]:
+        """여러 질문 일괄 답변 - 끝나는 순서대로 항목별 결과 반환 (대화/메시지는 저장하지 않음)
+
+        같은 (질문, 국가, 토픽)은 한 번만 생성하고, 검색은 (국가, 문서 타입)별로 묶어 임베딩을 한 번에 계산합니다.
+        생성은 배치당 BATCH_CONCURRENCY개씩 일반 요청과 같은 생성 슬롯을 얻어 실행하고,
+        슬롯을 못 얻으면 Retry-After 만큼 기다렸다 다시 시도합니다.
+        """
+        model_id = request.model_id or settings.DEFAULT_LLM_MODEL
+        
+        # (정규화된 질문, 국가, 문서 타입) -> 원래 항목 위치들
+        unique: Dict[Tuple[str, str, str], List[int]] = {}
+        for index, item in enumerate(request.items):
+            key = (_normalize_question(item.question), *_retrieval_partition(item.country, item.topic))
+            unique.setdefault(key, []).append(index)
+        partitions: Dict[Tuple[str, str], List[Tuple[str, str, str]]] = {}
+        for key in unique:
+            partitions.setdefault(key[1:], []).append(key)
+        
+        results: asyncio.Queue = asyncio.Queue()
+        retrieval_slots = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+        generation_slots = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+        
+        async def answer(key, context: str, references: List[Dict]):
+            try:
+                async with generation_slots:
+                    text = await self._answer_when_admitted(
+                        model_id,
+                        request.items[unique[key][0]].question,
+                        context,
+                        references,
+                        model_id=request.model_id,
+                        decoding_profile=request.decoding_profile,
+                        translate_to_korean=request.translate_to_korean
+                    )
+                result = {"status": "ok", "answer": text, "references": references}
+            except Exception as e:
+                logger.error(f"Batch answer failed: {e}")
+                result = {"status": "error", "error": str(e)}
+            await results.put((key, result))
+        
+        async def run_partition(partition: Tuple[str, str], keys: List[Tuple[str, str, str]]):
+            questions = [request.items[unique[key][0]].question for key in keys]
+            try:
+                async with retrieval_slots:
+                    with metrics.stage("retrieval_batch"):
+                        contexts = await asyncio.to_thread(self.rag.search_many_with_translation, questions, *partition)
+            except Exception as e:
+                logger.error(f"Batch retrieval failed for {partition}: {e}")
+                for key in keys:
+                    await results.put((key, {"status": "error", "error": str(e)}))
+                return
+            # answer는 오류를 결과로 바꾸므로 return_exceptions는 취소 시 모든 answer가 끝날 때까지 기다리는 용도
+            await asyncio.gather(*(answer(key, *context) for key, context in zip(keys, contexts)), return_exceptions=True)
+        
+        tasks = [asyncio.create_task(run_partition(partition, keys)) for partition, keys in partitions.items()]
+        try:
+            for _ in range(len(unique)):
+                key, result = await results.get()
+                for index in unique[key]:
+                    item = request.items[index]
+                    yield {"index": index, "id": item.id, "question": item.question, "country": item.country, "topic": item.topic, **result}
+        finally:
+            # 클라이언트가 연결을 끊으면 남은 검색/생성 취소
+            for task in tasks:
+                task.cancel()
+            # 슬롯 반환/검색 스레드 등 취소 정리가 끝날 때까지 기다림 (떼어 둔 채 끝나지 않도록)
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _answer_when_admitted(self, slot_model: str, *args, **kwargs) -> str:
+        """생성 슬롯을 얻어 응답 생성 - 대기열이 가득 차면 Retry-After 만큼 기다렸다 재시도"""
+        for attempt in range(settings.BATCH_MAX_RETRIES + 1):
+            try:
+                async with self.admission.slot(slot_model):
+                    return await self._answer(*args, **kwargs)
+            except Overloaded as e:
+                if attempt == settings.BATCH_MAX_RETRIES:
+                    raise
+                await asyncio.sleep(e.retry_after)
+
+    async def _save_messages(self, conversation: Conversation, messages: List[Message], db: AsyncSession):
+        """메시지 저장 - sync: 한 트랜잭션으로 커밋, write_behind: 백그라운드 큐에 위임"""
+        if self.message_writer.enabled:
+            await self.message_writer.enqueue([
+                {
+                    "conversation_id": conversation.id,
+                    "role": m.role,
+                    "content": m.content,
+                    "references": m.references,
+                    "created_at": m.created_at
+                }
+                for m in messages
+            ])
+            return
+        
+        for m in messages:
+            if conversation.id is None:
+                # 새 대화는 메시지와 같은 트랜잭션에서 INSERT
+                m.conversation = conversation
+            else:
+                m.conversation_id = conversation.id
+        db.add_all(messages)
+        await db.commit()
+
+    def _schedule_summary(self, conversation_id: int):
+        """프롬프트 창 밖으로 밀려난 턴이 쌓이면 요약 작업 예약
+
+        캐시 전체가 아니라 창 밖 토큰으로 판단하므로, 창 밖 턴은 버려지기 전에 요약에 합쳐집니다.
+        """
+        if conversation_id in self._summarizing:
+            return
+        outside = self.history_cache.tokens_outside_window(conversation_id, settings.HISTORY_MAX_TOKENS)
+        if outside < settings.SUMMARY_TRIGGER_TOKENS:
+            return
+        
+        self._summarizing.add(conversation_id)
+        task = asyncio.create_task(self._summarize_conversation(conversation_id))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _summarize_conversation(self, conversation_id: int):
+        """최근 창 밖으로 밀려난 턴을 누적 요약에 합치고 저장"""
+        try:
+            summary, old_turns = self.history_cache.split_for_summary(conversation_id, settings.HISTORY_MAX_TOKENS)
+            if not old_turns:
+                return
+            
+            if not await self._resolve_turn_ids(conversation_id, old_turns):
+                # write-behind 큐에서 아직 저장되지 않음 - 다음 턴에 다시 시도
+                return
+            
+            with metrics.stage("summarize"):
+                new_summary = await self.summarizer.summarize(summary, old_turns)
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(Conversation).where(Conversation.id == conversation_id).values(
+                        summary=new_summary,
+                        summarized_until_id=old_turns[-1]["id"]
+                    )
+                )
+                await db.commit()
+            
+            self.history_cache.apply_summary(conversation_id, new_summary, old_turns[-1])
+            logger.info(f"Conversation {conversation_id}: summarized {len(old_turns)} messages")
+        except Exception as e:
+            logger.error(f"Error summarizing conversation {conversation_id}: {e}")
+        finally:
+            self._summarizing.discard(conversation_id)
+
+    async def _resolve_turn_ids(self, conversation_id: int, turns: List[Dict[str, Any]]) -> bool:
+        """write-behind로 저장되어 id를 모르는 턴의 메시지 id를 DB에서 채움 (아직 저장 전이면 False)
+
+        id 없는 턴은 캐시 뒤쪽에 저장 순서대로 붙으므로, 앞선 턴(없으면 마지막 요약 경계) 이후의
+        메시지를 id 순으로 대응시킵니다.
+        """
+        missing = [turn for turn in turns if turn.get("id") is None]
+        if not missing:
+            return True
+        known = [turn["id"] for turn in turns if turn.get("id") is not None]
+        async with AsyncSessionLocal() as db:
+            after = known[-1] if known else await db.scalar(
+                select(Conversation.summarized_until_id).where(Conversation.id == conversation_id)
+            )
+            ids = (await db.scalars(
+                select(Message.id)
+                .where(Message.conversation_id == conversation_id, Message.id > (after or 0))
+                .order_by(Message.id)
+                .limit(len(missing))
+            )).all()
+        if len(ids) < len(missing):
+            return False
+        for turn, id in zip(missing, ids):
+            turn["id"] = id
+        return True
\ No newline at end of file
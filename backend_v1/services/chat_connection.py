@@ -0,0 +1,176 @@
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from fastapi import WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+
+import codec
+import metrics
+from config import settings
+from database import AsyncSessionLocal, Conversation
+from schemas import ChatRequest
+from services.admission import Overloaded
+from services.chat import ChatService
+
+logger = logging.getLogger(__name__)
+
+class ChatConnection:
+    """WebSocket 채팅 연결 하나 (/api/chat/ws?session_id=...&conversation_id=...)
+
+    한 연결에서 여러 메시지를 동시에 처리하며, 메시지마다 클라이언트가 정한 id로 답변 조각을 구분해 보냅니다.
+    대화 ID/객체는 연결이 들고 있어 매 턴 대화를 DB에서 다시 읽지 않고, 히스토리는 HistoryCache를 사용합니다.
+
+    클라이언트 -> 서버
+        {"type": "message", "id": "m1", "message": "...", "country": "Japan", "topic": "visa",
+         "model_id": null, "decoding_profile": null, "conversation_id": null}
+        {"type": "cancel", "id": "m1"}
+        {"type": "ping"}
+    서버 -> 클라이언트
+        {"type": "delta", "id": "m1", "content": "..."}          답변 조각 (여러 번)
+        {"type": "done", "id": "m1", "conversation_id": 1, "message": {...}}  최종 답변 (delta를 합친 것과 다를 수 있으면 이 값을 사용)
+        {"type": "cancelled", "id": "m1"}
+        {"type": "error", "id": "m1", "status": 429, "detail": "...", "retry_after": 3}
+        {"type": "pong"}
+    """
+
+    def __init__(self, websocket: WebSocket, chat_service: ChatService, session_id: str, conversation_id: Optional[int] = None):
+        self.websocket = websocket
+        self.chat_service = chat_service
+        self.session_id = session_id
+        self.conversation_id = conversation_id
+        self._conversations: Dict[int, Conversation] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._send_lock = asyncio.Lock()
+        self._conversation_lock = asyncio.Lock()
+
+    async def run(self):
+        """연결이 끊길 때까지 메시지 수신 - 끊기면 처리 중인 메시지 취소"""
+        try:
+            while True:
+                text = await self.websocket.receive_text()
+                try:
+                    data = codec.loads(text)
+                except ValueError:
+                    await self._error(None, 400, "Invalid JSON")
+                    continue
+                await self._dispatch(data)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            if self._tasks:
+                metrics.CLIENT_DISCONNECTS.labels("ws").inc(len(self._tasks))
+            for task in self._tasks.values():
+                task.cancel()
+            if self._tasks:
+                await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    async def _dispatch(self, data: Any):
+        kind = data.get("type") if isinstance(data, dict) else None
+        message_id = data.get("id") if isinstance(data, dict) else None
+
+        if kind == "ping":
+            await self.send({"type": "pong"})
+        elif kind == "cancel":
+            task = self._tasks.get(message_id)
+            if task:
+                task.cancel()
+        elif kind == "message":
+            if not message_id or message_id in self._tasks:
+                await self._error(message_id, 400, "Message id is missing or already in flight")
+                return
+            if len(self._tasks) >= settings.WS_MAX_IN_FLIGHT:
+                await self._error(message_id, 429, f"Too many messages in flight (max {settings.WS_MAX_IN_FLIGHT})", retry_after=1)
+                return
+            try:
+                request = ChatRequest(
+                    message=data.get("message"),
+                    session_id=self.session_id,
+                    conversation_id=data.get("conversation_id") or self.conversation_id,
+                    country=data.get("country"),
+                    topic=data.get("topic"),
+                    model_id=data.get("model_id"),
+                    decoding_profile=data.get("decoding_profile")
+                )
+            except ValidationError as e:
+                await self._error(message_id, 422, str(e))
+                return
+            if request.conversation_id is None and not (request.country and request.topic):
+                await self._error(message_id, 400, "country and topic are required to start a conversation")
+                return
+            self._tasks[message_id] = asyncio.create_task(self._handle(message_id, request))
+        else:
+            await self._error(message_id, 400, f"Unknown message type: {kind}")
+
+    async def _handle(self, message_id: str, request: ChatRequest):
+        """메시지 하나 처리 - 답변 조각은 delta로, 완료/오류/취소는 한 번 전송"""
+        model = metrics.model_label(request.model_id or settings.DEFAULT_LLM_MODEL)
+        streamed = False
+
+        async def on_token(content: str):
+            nonlocal streamed
+            streamed = True
+            await self.send({"type": "delta", "id": message_id, "content": content})
+
+        try:
+            with metrics.CHAT_IN_FLIGHT.track_inprogress():
+                async with AsyncSessionLocal() as db:
+                    if request.conversation_id is None:
+                        request.conversation_id = await self._start_conversation(request, db)
+                    conversation = self._conversations.get(request.conversation_id)
+                    if conversation is None:
+                        conversation = await db.get(Conversation, request.conversation_id)
+                        if conversation is None:
+                            raise LookupError(f"Conversation {request.conversation_id} not found")
+                        self._conversations[conversation.id] = conversation
+                    response = await self.chat_service.process_message(request, db, on_token=on_token, conversation=conversation)
+            metrics.CHAT_REQUESTS.labels(model, "ok").inc()
+
+            self.conversation_id = response.conversation_id
+            # 합쳐진 요청(single-flight)이나 이미 한국어인 답변처럼 조각이 없었으면 전체를 한 번에
+            if not streamed:
+                await self.send({"type": "delta", "id": message_id, "content": response.message.content})
+            await self.send({
+                "type": "done",
+                "id": message_id,
+                "conversation_id": response.conversation_id,
+                "message": response.message.model_dump()
+            })
+        except asyncio.CancelledError:
+            metrics.CHAT_REQUESTS.labels(model, "cancelled").inc()
+            await self.send({"type": "cancelled", "id": message_id})
+        except Overloaded as e:
+            metrics.CHAT_REQUESTS.labels(model, "rejected").inc()
+            await self._error(message_id, 429, str(e), retry_after=e.retry_after)
+        except LookupError as e:
+            metrics.CHAT_REQUESTS.labels(model, "error").inc()
+            await self._error(message_id, 404, str(e))
+        except Exception as e:
+            logger.error(f"WebSocket message {message_id} failed: {e}")
+            metrics.CHAT_REQUESTS.labels(model, "error").inc()
+            await self._error(message_id, 500, str(e))
+        finally:
+            self._tasks.pop(message_id, None)
+
+    async def _start_conversation(self, request: ChatRequest, db) -> int:
+        """연결의 첫 대화 생성 - 동시에 들어온 첫 메시지들이 같은 대화를 쓰도록 한 번만 생성"""
+        async with self._conversation_lock:
+            if self.conversation_id is None:
+                conversation = await self.chat_service.create_conversation(self.session_id, request.country, request.topic, db)
+                self._conversations[conversation.id] = conversation
+                self.conversation_id = conversation.id
+            return self.conversation_id
+
+    async def _error(self, message_id: Optional[str], status: int, detail: str, retry_after: Optional[int] = None):
+        payload = {"type": "error", "id": message_id, "status": status, "detail": detail}
+        if retry_after is not None:
+            payload["retry_after"] = retry_after
+        await self.send(payload)
+
+    async def send(self, payload: Dict[str, Any]):
+        """여러 메시지의 전송이 섞이지 않도록 직렬화 (연결이 끊긴 뒤의 전송은 무시)"""
+        async with self._send_lock:
+            try:
+                await self.websocket.send_text(codec.dumps_str(payload))
+            except Exception:
+                pass
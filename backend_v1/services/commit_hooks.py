@@ -0,0 +1,42 @@
+import logging
+from typing import Any, Callable, List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+Change = Tuple[str, Any]  # ("insert" | "update" | "delete", snapshot(target))
+
+def on_commit(model: type, snapshot: Callable[[Any], Any], callback: Callable[[List[Change]], None]):
+    """model 행의 ORM 추가/수정/삭제를 트랜잭션이 커밋된 뒤에 한 번에 전달 (롤백되면 버림)
+
+    flush 시점에 snapshot(target)으로 필요한 값(변경 전 값 포함)을 꺼내 세션에 모아 두고
+    after_commit에서 callback(changes)를 호출합니다. 모든 세션(AsyncSession 내부 세션 포함)에 적용되며,
+    이 프로세스의 ORM 쓰기만 보이므로 다른 프로세스/벌크 INSERT 반영은 호출자의 주기적 재빌드에 맡깁니다.
+    """
+    key = ("commit_hooks", model.__name__, id(callback))
+
+    def after_flush(session, flush_context):
+        changes = session.info.setdefault(key, [])
+        for op, targets in (("insert", session.new), ("update", session.dirty), ("delete", session.deleted)):
+            for target in targets:
+                if isinstance(target, model) and (op != "update" or session.is_modified(target)):
+                    changes.append((op, snapshot(target)))
+
+    def after_commit(session):
+        changes = session.info.pop(key, None)
+        if not changes:
+            return
+        try:
+            callback(changes)
+        except Exception as e:
+            # 캐시 갱신 실패가 이미 끝난 커밋을 실패로 만들지 않도록
+            logger.error(f"Commit hook for {model.__name__} failed: {e}")
+
+    def after_rollback(session):
+        session.info.pop(key, None)
+
+    event.listen(Session, "after_flush", after_flush)
+    event.listen(Session, "after_commit", after_commit)
+    event.listen(Session, "after_rollback", after_rollback)
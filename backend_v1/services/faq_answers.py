@@ -0,0 +1,84 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from config import settings
+from database import FAQAnswer, SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# (정규화된 질문, 국가, 문서 타입, 모델)
+Key = Tuple[str, str, str, str]
+
+class FAQAnswerStore:
+    """미리 생성한 FAQ 답변 조회 테이블 (etc/precompute_faq_answers.py로 생성)
+
+    현재 벡터 인덱스 버전으로 생성된 답변만 메모리에 올리고, FAQ_ANSWERS_REFRESH_SECONDS가 지나면
+    조회 시 백그라운드에서 다시 읽어 새로 생성된 답변과 인덱스 변경을 반영합니다 (다시 읽는 동안은 기존 테이블 사용).
+    """
+
+    def __init__(
+        self,
+        index_version: Callable[[], str],
+        refresh_seconds: float = settings.FAQ_ANSWERS_REFRESH_SECONDS,
+        enabled: bool = settings.FAQ_ANSWERS_ENABLED
+    ):
+        self.index_version = index_version
+        self.refresh_seconds = refresh_seconds
+        self.enabled = enabled
+        self.version: Optional[str] = None
+        self._answers: Dict[Key, Tuple[str, List[Dict[str, Any]]]] = {}
+        self._loaded_at: Optional[float] = None
+        self._refreshing: Optional[asyncio.Task] = None
+
+    def load(self) -> int:
+        """현재 인덱스 버전의 답변 전체 읽기 - 읽은 답변 수 반환"""
+        version = self.index_version()
+        db = SessionLocal()
+        try:
+            rows = db.execute(
+                select(
+                    FAQAnswer.question_key, FAQAnswer.country, FAQAnswer.topic, FAQAnswer.model_id,
+                    FAQAnswer.answer, FAQAnswer.references
+                ).where(FAQAnswer.index_version == version)
+            )
+            answers = {
+                (question_key, country, topic, model_id): (answer, references or [])
+                for question_key, country, topic, model_id, answer, references in rows
+            }
+        finally:
+            db.close()
+
+        self._answers = answers
+        self.version = version
+        self._loaded_at = time.monotonic()
+        logger.info(f"Loaded {len(answers)} precomputed FAQ answers (index version {version})")
+        return len(answers)
+
+    def get(self, question_key: str, country: str, topic: str, model_id: str) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        """(답변, 참조) 또는 None"""
+        if not self.enabled:
+            return None
+        self._maybe_refresh()
+        return self._answers.get((question_key, country, topic, model_id))
+
+    def _maybe_refresh(self):
+        if self._refreshing is not None and not self._refreshing.done():
+            return
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+            return
+        self._refreshing = asyncio.create_task(asyncio.to_thread(self._reload))
+
+    def _reload(self):
+        try:
+            self.load()
+        except Exception as e:
+            # 테이블이 없거나 DB 오류 - 다음 주기까지 기존 테이블 사용
+            self._loaded_at = time.monotonic()
+            logger.warning(f"Failed to reload precomputed FAQ answers: {e}")
+
+    def __len__(self) -> int:
+        return len(self._answers)
@@ -0,0 +1,146 @@
+import logging
+from collections import OrderedDict, deque
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Tuple
+
+import tiktoken
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+class ConversationHistory:
+    """한 대화의 요약 + 아직 요약되지 않은 턴
+
+    턴 수로 잘라내지 않습니다 - 프롬프트 창 밖으로 밀려난 턴도 요약에 합쳐질 때까지 남겨 둡니다.
+    """
+
+    def __init__(self, summary: Optional[str] = None):
+        self.turns: deque = deque()
+        self.summary = summary
+
+class HistoryCache:
+    """대화별 최근 턴 캐시 (LRU)
+
+    턴마다 토큰 수를 미리 계산해 두고 최근 N 토큰만 반환하므로
+    대화가 길어져도 DB 조회와 프롬프트 크기가 일정합니다.
+    창 밖 턴은 요약(ChatService._schedule_summary)될 때까지 보관하며, 요약이 계속 실패해
+    창 밖 턴이 max_turns를 넘을 때만 가장 오래된 턴을 버립니다 (경고 로그).
+    프로세스 단위 캐시이므로 같은 대화는 같은 워커로 라우팅되는 것을 전제로 합니다.
+    """
+
+    def __init__(
+        self,
+        max_conversations: int = settings.HISTORY_CACHE_MAX_CONVERSATIONS,
+        max_turns: int = settings.HISTORY_CACHE_MAX_TURNS
+    ):
+        self.max_conversations = max_conversations
+        self.max_turns = max_turns
+        self._conversations: "OrderedDict[int, ConversationHistory]" = OrderedDict()
+
+    @cached_property
+    def _tokenizer(self):
+        # 인코딩 파일 로드가 느리므로 첫 메시지 때 로드
+        return tiktoken.get_encoding("cl100k_base")
+
+    def count_tokens(self, text: str) -> int:
+        return len(self._tokenizer.encode(text or ""))
+
+    def __contains__(self, conversation_id: int) -> bool:
+        return conversation_id in self._conversations
+
+    def load(self, conversation_id: int, messages: List[Dict[str, Any]], summary: Optional[str] = None):
+        """DB에서 읽은 요약과 최근 메시지로 캐시 채우기 (오래된 순)"""
+        self._conversations[conversation_id] = ConversationHistory(summary)
+        self.append(conversation_id, messages)
+
+    def append(self, conversation_id: int, messages: List[Dict[str, Any]]):
+        """새 메시지 추가 (저장 시점에 호출)"""
+        history = self._conversations.get(conversation_id)
+        if history is None:
+            history = self._conversations[conversation_id] = ConversationHistory()
+        for m in messages:
+            history.turns.append({
+                "role": m["role"],
+                "content": m["content"],
+                "id": m.get("id"),  # write-behind 모드에서는 저장 전이라 None (요약할 때 DB에서 채움)
+                "created_at": m.get("created_at"),
+                "tokens": self.count_tokens(m["content"])
+            })
+        overflow = self._window_start(history, settings.HISTORY_MAX_TOKENS) - self.max_turns
+        if overflow > 0:
+            logger.warning(f"Conversation {conversation_id}: dropping {overflow} unsummarized turns")
+            for _ in range(overflow):
+                history.turns.popleft()
+        self._touch(conversation_id)
+
+    def window(self, conversation_id: int, max_tokens: int = settings.HISTORY_MAX_TOKENS) -> Optional[List[Dict[str, str]]]:
+        """최근 max_tokens 이내의 메시지 반환 (캐시에 없으면 None)"""
+        history = self._conversations.get(conversation_id)
+        if history is None:
+            return None
+        self._touch(conversation_id)
+
+        start = self._window_start(history, max_tokens)
+        return [
+            {"role": turn["role"], "content": turn["content"]}
+            for turn in list(history.turns)[start:]
+        ]
+
+    def summary(self, conversation_id: int) -> Optional[str]:
+        history = self._conversations.get(conversation_id)
+        return history.summary if history else None
+
+    def total_tokens(self, conversation_id: int) -> int:
+        """아직 요약되지 않은 턴의 토큰 합계"""
+        history = self._conversations.get(conversation_id)
+        if history is None:
+            return 0
+        return sum(turn["tokens"] for turn in history.turns)
+
+    def tokens_outside_window(self, conversation_id: int, max_tokens: int = settings.HISTORY_MAX_TOKENS) -> int:
+        """프롬프트 창(최근 max_tokens) 밖으로 밀려나 아직 요약되지 않은 턴의 토큰 합계"""
+        history = self._conversations.get(conversation_id)
+        if history is None:
+            return 0
+        start = self._window_start(history, max_tokens)
+        return sum(turn["tokens"] for turn in list(history.turns)[:start])
+
+    def split_for_summary(self, conversation_id: int, keep_tokens: int) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        """(현재 요약, 최근 keep_tokens 창 밖으로 밀려난 턴들) 반환"""
+        history = self._conversations.get(conversation_id)
+        if history is None:
+            return None, []
+        start = self._window_start(history, keep_tokens)
+        return history.summary, list(history.turns)[:start]
+
+    def apply_summary(self, conversation_id: int, summary: str, last_turn: Dict[str, Any]):
+        """요약 반영 후 요약에 포함된 턴(last_turn까지)을 제거"""
+        history = self._conversations.get(conversation_id)
+        if history is None:
+            return
+        history.summary = summary
+        if any(turn is last_turn for turn in history.turns):
+            while history.turns:
+                if history.turns.popleft() is last_turn:
+                    break
+
+    def invalidate(self, conversation_id: int):
+        self._conversations.pop(conversation_id, None)
+
+    def _window_start(self, history: ConversationHistory, max_tokens: int) -> int:
+        """최근 max_tokens 이내 창이 시작되는 턴 인덱스"""
+        total = 0
+        start = len(history.turns)
+        for turn in reversed(history.turns):
+            total += turn["tokens"]
+            if total > max_tokens:
+                break
+            start -= 1
+        return start
+
+    def _touch(self, conversation_id: int):
+        """LRU 갱신 및 초과분 제거"""
+        self._conversations.move_to_end(conversation_id)
+        while len(self._conversations) > self.max_conversations:
+            self._conversations.popitem(last=False)
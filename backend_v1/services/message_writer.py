@@ -0,0 +1,126 @@
+import asyncio
+import logging
+from typing import Any, Dict, List
+
+from sqlalchemy import insert
+
+import metrics
+from config import settings
+from database import AsyncSessionLocal, Message
+
+logger = logging.getLogger(__name__)
+
+# 워커 종료 신호
+_STOP = object()
+
+class MessageWriter:
+    """메시지 write-behind 큐 - 응답 후 백그라운드에서 모아서 일괄 저장
+
+    DB 오류가 나면 백오프하며 배치를 다시 저장하고, 그래도 실패하면 한 행씩 저장해
+    문제가 되는 행(예: 삭제된 대화의 메시지)만 버립니다. 재시도하는 동안 새 메시지는 큐에 쌓입니다.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = settings.MESSAGE_WRITE_BATCH_SIZE,
+        flush_interval: float = settings.MESSAGE_WRITE_FLUSH_INTERVAL,
+        max_queue: int = settings.MESSAGE_WRITE_QUEUE_SIZE,
+        max_retries: int = settings.MESSAGE_WRITE_MAX_RETRIES,
+        retry_backoff: float = settings.MESSAGE_WRITE_RETRY_BACKOFF
+    ):
+        self.enabled = settings.MESSAGE_PERSISTENCE == "write_behind"
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._queue = None
+        self._task = None
+
+    def start(self):
+        """백그라운드 flush 워커 시작"""
+        if not self.enabled or self._task:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Message write-behind enabled (batch {self.batch_size}, interval {self.flush_interval}s)")
+
+    async def stop(self):
+        """큐에 남은 메시지를 모두 저장한 뒤 종료"""
+        if not self._task:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+        logger.info("Message write-behind queue drained")
+
+    async def enqueue(self, rows: List[Dict[str, Any]]):
+        """메시지 저장 예약 (큐가 가득 차면 여유가 생길 때까지 대기)"""
+        if not self._task:
+            # 워커가 없으면 바로 저장
+            await self._flush(rows)
+            return
+        for row in rows:
+            await self._queue.put(row)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            if item is _STOP:
+                return
+
+            # flush_interval 동안 batch_size까지 모으기
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            stopping = False
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+            if stopping:
+                return
+
+    async def _flush(self, rows: List[Dict[str, Any]]):
+        """일괄 저장 - 실패하면 백오프하며 재시도, 끝내 실패하면 한 행씩 저장"""
+        delay = self.retry_backoff
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self._insert(rows)
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    logger.error(f"Failed to persist {len(rows)} messages after {attempt + 1} attempts: {e}")
+                    break
+                logger.warning(f"Failed to persist {len(rows)} messages, retrying in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+                delay *= 2
+
+        # 한 행 때문에 배치 전체를 잃지 않도록 (DB가 계속 내려가 있으면 모두 실패)
+        dropped = len(rows)
+        if len(rows) > 1:
+            dropped = 0
+            for row in rows:
+                try:
+                    await self._insert([row])
+                except Exception:
+                    dropped += 1
+        if dropped:
+            metrics.MESSAGES_DROPPED.inc(dropped)
+            logger.error(f"Dropped {dropped}/{len(rows)} messages")
+
+    async def _insert(self, rows: List[Dict[str, Any]]):
+        """한 트랜잭션으로 일괄 INSERT"""
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(Message), rows)
+            await db.commit()
@@ -1,85 +1,140 @@
+import hashlib
+import json
 import logging
-from typing import List, Optional
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+import metrics
+from config import settings
 from database import Document
 from schemas import DocumentResponse
+from services.commit_hooks import on_commit
+from services.search import DocumentSearchIndex
 
 logger = logging.getLogger(__name__)
 
+# DocumentResponse에 필요한 컬럼만 조회
+DOCUMENT_COLUMNS = (
+    Document.id, Document.title, Document.url,
+    Document.country, Document.topic, Document.source, Document.created_at
+)
+
 class MetadataService:
     """메타데이터 관리 서비스"""
     
+    def __init__(self, ttl: float = settings.METADATA_CACHE_TTL):
+        # 목록 캐시: name -> (로드 시각, 값, ETag)
+        self.ttl = ttl
+        self._cache: Dict[str, Tuple[float, List[str], str]] = {}
+        self.search_index = DocumentSearchIndex()
+        
+        # 이 프로세스에서 문서 변경이 커밋되면 캐시 무효화 (다른 프로세스의 변경은 TTL로 반영)
+        on_commit(Document, lambda target: target.id, self._on_document_commit)
+    
+    def _on_document_commit(self, changes):
+        self.invalidate()
+    
+    def invalidate(self):
+        """목록 캐시 비우기"""
+        self._cache.clear()
+    
+    def get_cached(self, name: str, db: Session) -> Tuple[List[str], str]:
+        """캐시된 목록과 strong ETag 반환 (name: countries, topics, sources)"""
+        loader = self._loaders()[name]
+        now = time.monotonic()
+        entry = self._cache.get(name)
+        hit = bool(entry) and now - entry[0] < self.ttl
+        metrics.cache_lookup("metadata", hit)
+        if hit:
+            return entry[1], entry[2]
+        
+        values = loader(db)
+        digest = hashlib.sha256(json.dumps(values, ensure_ascii=False).encode("utf-8")).hexdigest()
+        etag = f'"{digest[:32]}"'
+        self._cache[name] = (now, values, etag)
+        return values, etag
+    
+    def _loaders(self) -> Dict[str, Callable[[Session], List[str]]]:
+        return {
+            "countries": self._load_countries,
+            "topics": self._load_topics,
+            "sources": self._load_sources,
+        }
+    
     def get_countries(self, db: Session) -> List[str]:
         """국가 목록 조회"""
-        countries = db.query(Document.country).distinct().all()
-        
-        return [country[0] for country in countries if country[0]]
+        return self.get_cached("countries", db)[0]
     
     def get_topics(self, db: Session) -> List[str]:
         """주제 목록 조회"""
-        topics = db.query(Document.topic).distinct().all()
-        return [topic[0] for topic in topics if topic[0]]
-
+        return self.get_cached("topics", db)[0]
     
     def get_sources(self, db: Session) -> List[str]:
         """출처 목록 조회"""
+        return self.get_cached("sources", db)[0]
+    
+    def _load_countries(self, db: Session) -> List[str]:
+        countries = db.query(Document.country).distinct().all()
+        return [country[0] for country in countries if country[0]]
+    
+    def _load_topics(self, db: Session) -> List[str]:
+        topics = db.query(Document.topic).distinct().all()
+        return [topic[0] for topic in topics if topic[0]]
+    
+    def _load_sources(self, db: Session) -> List[str]:
         sources = db.query(Document.source).distinct().all()
         return [source[0] for source in sources if source[0]]
     
     def get_documents_by_filter(
         self,
-        country_id: Optional[int],
-        topic_id: Optional[int],
-        source_id: Optional[int],
+        country: str,
+        topic: str,
+        source: Optional[str] = None,
+        after_id: Optional[int] = None,
         limit: int = 20,
-        offset: int = 0,
         db: Session = None
-    ) -> List[DocumentResponse]:
-        """필터링된 문서 목록 조회"""
-        query = db.query(Document)
-        
-        if country_id:
-            query = query.filter(Document.country_id == country_id)
-        if topic_id:
-            query = query.filter(Document.topic_id == topic_id)
-        if source_id:
-            query = query.filter(Document.source_id == source_id)
+    ) -> Tuple[List[DocumentResponse], Optional[int]]:
+        """국가/토픽별 문서 목록 조회 - (id 순 문서 목록, 다음 페이지 after_id) 반환"""
+        query = select(*DOCUMENT_COLUMNS).where(Document.country == country, Document.topic == topic)
+        if source:
+            query = query.where(Document.source == source)
+        if after_id:
+            query = query.where(Document.id > after_id)
         
-        documents = query.offset(offset).limit(limit).all()
+        # (country, topic, id) 인덱스 순서대로 읽고, 한 건 더 읽어 다음 페이지 여부 판단
+        rows = db.execute(query.order_by(Document.id).limit(limit + 1)).all()
+        documents = [DocumentResponse.model_validate(row._mapping) for row in rows[:limit]]
+        next_after_id = documents[-1].id if len(rows) > limit else None
+        return documents, next_after_id
+    
+    def search_documents(
+        self,
+        query: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        db: Session = None
+    ) -> Tuple[List[DocumentResponse], Optional[str]]:
+        """문서 제목/출처 검색 - (관련도 순 문서 목록, 다음 페이지 커서) 반환"""
+        self.search_index.ensure_built()
+        ids, next_cursor = self.search_index.search(query, limit, cursor)
+        if not ids:
+            return [], None
         
-        return [
-            DocumentResponse(
-                id=doc.id,
-                title=doc.title,
-                doc_type=doc.doc_type,
-                url=doc.url,
-                country_id=doc.country_id,
-                topic_id=doc.topic_id,
-                source_id=doc.source_id,
-                created_at=doc.created_at,
-                updated_at=doc.updated_at
-            )
-            for doc in documents
+        rows = db.execute(select(*DOCUMENT_COLUMNS).where(Document.id.in_(ids)))
+        by_id = {row.id: row for row in rows}
+        documents = [
+            DocumentResponse.model_validate(by_id[doc_id]._mapping)
+            for doc_id in ids if doc_id in by_id
         ]
+        return documents, next_cursor
     
     def get_document_detail(self, document_id: int, db: Session) -> DocumentResponse:
         """문서 상세 조회"""
-        document = db.query(Document).filter(Document.id == document_id).first()
+        row = db.execute(select(*DOCUMENT_COLUMNS).where(Document.id == document_id)).first()
         
-        if not document:
+        if not row:
             raise ValueError(f"Document {document_id} not found")
         
-        return DocumentResponse(
-            id=document.id,
-            title=document.title,
-            content=document.content,
-            doc_type=document.doc_type,
-            url=document.url,
-            metadata=document.metadata,
-            country_id=document.country_id,
-            topic_id=document.topic_id,
-            source_id=document.source_id,
-            created_at=document.created_at,
-            updated_at=document.updated_at
-        )
+        return DocumentResponse.model_validate(row._mapping)
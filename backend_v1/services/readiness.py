@@ -0,0 +1,61 @@
+import asyncio
+import inspect
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class Readiness:
+    """시작 시 warm-up 단계별 상태/소요 시간 기록 (/api/ready)
+
+    필수(required) 단계가 모두 ready이고 warm-up이 끝나야 준비 완료로 봅니다.
+    선택 단계(커넥션 미리 열기 등)는 실패해도 준비 완료 여부에 영향을 주지 않습니다.
+    """
+
+    def __init__(self):
+        self.components: Dict[str, Dict[str, Any]] = {}
+        self.complete = False
+        self._started_at = time.monotonic()
+
+    def register(self, name: str, required: bool = True):
+        self.components.setdefault(name, {"status": "pending", "required": required})
+
+    async def run(self, name: str, fn: Callable, *args, required: bool = True) -> Optional[Any]:
+        """한 단계 실행 - 동기 함수는 스레드풀에서 실행, 예외는 기록만 하고 삼킴"""
+        self.register(name, required)
+        component = self.components[name]
+        component.update(status="warming", required=required)
+        start = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(fn):
+                result = await fn(*args)
+            else:
+                result = await asyncio.to_thread(fn, *args)
+            component["status"] = "ready"
+            return result
+        except Exception as e:
+            component.update(status="failed", error=str(e))
+            log = logger.error if required else logger.warning
+            log(f"Warm-up step {name} failed: {e}")
+        finally:
+            component["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+    def finish(self):
+        self.complete = True
+        logger.info(f"Warm-up finished in {time.monotonic() - self._started_at:.1f}s: {self.snapshot()['components']}")
+
+    @property
+    def ready(self) -> bool:
+        return self.complete and all(
+            component["status"] == "ready"
+            for component in self.components.values()
+            if component["required"]
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "warm_up_complete": self.complete,
+            "components": self.components,
+        }
@@ -0,0 +1,32 @@
+from collections import OrderedDict
+from typing import Optional
+
+from ai_services.rag import RetrievalState
+from config import settings
+
+class RetrievalMemory:
+    """대화별 직전 검색 상태 캐시 (LRU)
+
+    직전 턴의 질문 임베딩과 검색 후보(청크 + 임베딩)를 보관해 후속 질문 검색에 재사용합니다.
+    HistoryCache와 마찬가지로 같은 대화는 같은 워커로 라우팅되는 것을 전제로 하며,
+    캐시에 없으면 처음 질문처럼 새로 검색합니다.
+    """
+
+    def __init__(self, max_conversations: int = settings.RETRIEVAL_MEMORY_CONVERSATIONS):
+        self.max_conversations = max_conversations
+        self._states: "OrderedDict[int, RetrievalState]" = OrderedDict()
+
+    def get(self, conversation_id: Optional[int]) -> Optional[RetrievalState]:
+        state = self._states.get(conversation_id)
+        if state is not None:
+            self._states.move_to_end(conversation_id)
+        return state
+
+    def put(self, conversation_id: int, state: RetrievalState):
+        self._states[conversation_id] = state
+        self._states.move_to_end(conversation_id)
+        while len(self._states) > self.max_conversations:
+            self._states.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._states)
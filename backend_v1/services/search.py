@@ -0,0 +1,283 @@
+import logging
+import math
+import re
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, inspect, select
+
+from config import settings
+from database import Document, SessionLocal
+from services.commit_hooks import on_commit
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"[가-힣]+|[^\W_가-힣]+")
+_HANGUL_RE = re.compile(r"[가-힣]+")
+# 어절 끝 조사 (긴 것부터 비교)
+_PARTICLES = ("에서는", "으로는", "에서", "으로", "까지", "부터", "에게", "처럼", "이나",
+              "은", "는", "이", "가", "을", "를", "의", "에", "로", "와", "과", "도", "만")
+
+def _strip_particle(word: str) -> str:
+    for particle in _PARTICLES:
+        if word.endswith(particle) and len(word) - len(particle) >= 2:
+            return word[:-len(particle)]
+    return word
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """검색 토큰 분리 - 한글은 조사 제거 후 음절 bigram, 그 외는 단어 단위 (소문자)"""
+    tokens = []
+    for word in _WORD_RE.findall((text or "").lower()):
+        if len(word) > 1 and _HANGUL_RE.fullmatch(word):
+            word = _strip_particle(word)
+            # 조사/어미가 붙어도 부분 일치하도록 2음절씩 분리 (여권발급 -> 여권, 권발, 발급)
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+def _previous(target, attr: str):
+    """flush 중인 객체의 변경 전 값"""
+    deleted = inspect(target).attrs[attr].history.deleted
+    return deleted[0] if deleted else getattr(target, attr)
+
+def _snapshot(target) -> Tuple[int, Optional[str], Optional[str], Optional[str], Optional[str]]:
+    """(id, 제목, 출처, 변경 전 제목, 변경 전 출처)"""
+    return target.id, target.title, target.source, _previous(target, "title"), _previous(target, "source")
+
+class DocumentSearchIndex:
+    """Document.title/source 역색인 (BM25 순위)
+
+    posting은 문서 id 배열(토큰이 여러 번 나오면 id도 여러 번)로 들고 있고,
+    조회 시 numpy로 모든 검색어를 포함하는 문서만 골라 점수를 계산합니다.
+    이 프로세스의 문서 추가/수정/삭제는 커밋된 뒤 바로 반영하고 (롤백되면 무시),
+    다른 프로세스(수집 파이프라인, init_db)가 넣은 문서는 refresh_seconds마다 (문서 수, 최대 id)를
+    확인해 바뀌었으면 백그라운드에서 새 색인을 만들어 교체합니다.
+    """
+
+    def __init__(
+        self,
+        k1: float = 1.2,
+        b: float = 0.75,
+        session_factory=SessionLocal,
+        refresh_seconds: float = settings.SEARCH_INDEX_REFRESH_SECONDS,
+        track_changes: bool = True
+    ):
+        self.k1 = k1
+        self.b = b
+        self.session_factory = session_factory
+        self.refresh_seconds = refresh_seconds
+        self.built = False
+        self._version: Optional[Tuple[int, int]] = None  # 빌드 시점의 (문서 수, 최대 id)
+        self._checked_at = 0.0
+        self._refreshing = False
+        self._pending: Optional[List] = None  # 빌드 중에 커밋된 변경 (교체 후 다시 적용)
+        self._postings: Dict[str, array] = {}
+        self._stats: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}  # token -> (정렬된 id, tf) 캐시
+        self._doc_len = np.zeros(1024, dtype=np.int32)  # id -> 토큰 수 (0이면 없음)
+        self._doc_count = 0
+        self._total_len = 0
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+
+        if track_changes:
+            on_commit(Document, _snapshot, self._on_commit)
+
+    def _current_version(self) -> Tuple[int, int]:
+        db = self.session_factory()
+        try:
+            count, max_id = db.execute(select(func.count(Document.id), func.max(Document.id))).one()
+            return count, max_id or 0
+        finally:
+            db.close()
+
+    def build(self, batch_size: int = 10000):
+        """DB의 전체 문서로 새 색인을 만들어 교체 (만드는 동안은 기존 색인으로 검색)"""
+        with self._build_lock:
+            start = time.perf_counter()
+            with self._lock:
+                self._pending = []
+            try:
+                version = self._current_version()
+                fresh = DocumentSearchIndex(self.k1, self.b, self.session_factory, track_changes=False)
+                db = self.session_factory()
+                try:
+                    rows = db.execute(
+                        select(Document.id, Document.title, Document.source)
+                        .order_by(Document.id)
+                        .execution_options(yield_per=batch_size)
+                    )
+                    for doc_id, title, source in rows:
+                        fresh._add(doc_id, title, source)
+                finally:
+                    db.close()
+
+                with self._lock:
+                    self._postings = fresh._postings
+                    self._stats = fresh._stats
+                    self._doc_len = fresh._doc_len
+                    self._doc_count = fresh._doc_count
+                    self._total_len = fresh._total_len
+                    # 빌드가 읽기 전/후 어느 쪽이었든 결과가 같도록 다시 적용
+                    for change in self._pending:
+                        self._apply(*change)
+                    self._version = version
+                    self._checked_at = time.monotonic()
+                    self.built = True
+            finally:
+                with self._lock:
+                    self._pending = None
+            logger.info(
+                f"Search index built: {self._doc_count} documents, {len(self._postings)} tokens "
+                f"in {time.perf_counter() - start:.1f}s"
+            )
+
+    def ensure_built(self):
+        """색인이 없으면 생성 (시작 시 백그라운드 빌드 중이면 완료까지 대기), 오래됐으면 백그라운드 확인"""
+        if not self.built:
+            with self._build_lock:
+                pass
+            if not self.built:
+                self.build()
+            return
+        with self._lock:
+            if self._refreshing or time.monotonic() - self._checked_at < self.refresh_seconds:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh, name="search-index-refresh", daemon=True).start()
+
+    def _refresh(self):
+        """다른 프로세스가 문서를 추가/삭제했으면 다시 빌드"""
+        try:
+            if self._current_version() != self._version:
+                self.build()
+        except Exception as e:
+            logger.warning(f"Search index refresh failed: {e}")
+        finally:
+            with self._lock:
+                self._checked_at = time.monotonic()
+                self._refreshing = False
+
+    def search(self, query: str, limit: int = 20, cursor: Optional[str] = None) -> Tuple[List[int], Optional[str]]:
+        """(점수 내림차순 문서 id 목록, 다음 페이지 커서) 반환
+
+        커서는 마지막 결과의 "점수:id"이며, 다음 페이지는 (점수 내림차순, id 오름차순)으로 그 뒤부터 시작합니다.
+        """
+        after = self._parse_cursor(cursor)
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return [], None
+
+        with self._lock:
+            stats = [self._term_stats(term) for term in terms]
+            if any(stat is None for stat in stats):
+                return [], None
+            doc_count = self._doc_count
+            avgdl = self._total_len / max(doc_count, 1)
+
+            # 모든 검색어를 포함하는 문서 (posting이 짧은 것부터 교집합)
+            ordered = sorted(stats, key=lambda stat: len(stat[0]))
+            candidates = ordered[0][0]
+            for ids, _ in ordered[1:]:
+                candidates = np.intersect1d(candidates, ids, assume_unique=True)
+            if len(candidates) == 0:
+                return [], None
+
+            norm = self.k1 * (1 - self.b + self.b * self._doc_len[candidates] / avgdl)
+            scores = np.zeros(len(candidates))
+            for ids, tf in stats:
+                idf = math.log(1 + (doc_count - len(ids) + 0.5) / (len(ids) + 0.5))
+                f = tf[np.searchsorted(ids, candidates)]
+                scores += idf * f * (self.k1 + 1) / (f + norm)
+
+        if after is not None:
+            last_score, last_id = after
+            mask = (scores < last_score) | ((scores == last_score) & (candidates > last_id))
+            candidates, scores = candidates[mask], scores[mask]
+
+        has_more = len(candidates) > limit
+        if has_more:
+            # 상위 limit개 점수 이상만 남긴 뒤 정렬 (동점은 모두 포함)
+            threshold = np.partition(scores, len(scores) - limit)[len(scores) - limit]
+            mask = scores >= threshold
+            candidates, scores = candidates[mask], scores[mask]
+        order = np.lexsort((candidates, -scores))[:limit]
+
+        ids = [int(doc_id) for doc_id in candidates[order]]
+        next_cursor = f"{float(scores[order[-1]])!r}:{ids[-1]}" if has_more else None
+        return ids, next_cursor
+
+    def _parse_cursor(self, cursor: Optional[str]) -> Optional[Tuple[float, int]]:
+        if not cursor:
+            return None
+        try:
+            score, doc_id = cursor.rsplit(":", 1)
+            return float(score), int(doc_id)
+        except ValueError:
+            raise ValueError(f"Invalid cursor: {cursor}")
+
+    def _term_stats(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        stats = self._stats.get(term)
+        if stats is None:
+            postings = self._postings.get(term)
+            if postings is None:
+                return None
+            stats = self._stats[term] = np.unique(np.frombuffer(postings, dtype=np.int32), return_counts=True)
+        return stats
+
+    def _add(self, doc_id: int, title: Optional[str], source: Optional[str]):
+        tokens = tokenize(title) + tokenize(source)
+        if not tokens:
+            return
+        if doc_id >= len(self._doc_len):
+            self._doc_len = np.concatenate([self._doc_len, np.zeros(max(doc_id + 1, len(self._doc_len)), dtype=np.int32)])
+        self._doc_len[doc_id] = len(tokens)
+        self._doc_count += 1
+        self._total_len += len(tokens)
+
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = array("i")
+            postings.append(doc_id)
+            self._stats.pop(token, None)
+
+    def _remove(self, doc_id: int, *texts: Optional[str]):
+        """문서 제거 - texts(제목/출처, 변경 전 값 포함)의 토큰 posting에서 id 삭제"""
+        if doc_id >= len(self._doc_len) or self._doc_len[doc_id] == 0:
+            return
+        self._doc_count -= 1
+        self._total_len -= int(self._doc_len[doc_id])
+        self._doc_len[doc_id] = 0
+
+        for token in set().union(*(tokenize(text) for text in texts)):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            self._stats.pop(token, None)
+            ids = np.frombuffer(postings, dtype=np.int32)
+            kept = ids[ids != doc_id].tobytes()
+            del ids
+            if kept:
+                self._postings[token] = array("i")
+                self._postings[token].frombytes(kept)
+            else:
+                del self._postings[token]
+
+    def _apply(self, op: str, snapshot: Tuple[int, Optional[str], Optional[str], Optional[str], Optional[str]]):
+        # 같은 변경을 두 번 적용해도 결과가 같도록 항상 지운 뒤 다시 추가
+        doc_id, title, source, previous_title, previous_source = snapshot
+        self._remove(doc_id, title, source, previous_title, previous_source)
+        if op != "delete":
+            self._add(doc_id, title, source)
+
+    def _on_commit(self, changes):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.extend(changes)
+            if self.built:
+                for change in changes:
+                    self._apply(*change)
@@ -0,0 +1,49 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight:
+    """같은 키의 동시 호출을 하나의 실행으로 합침
+
+    먼저 들어온 호출이 작업을 시작하고, 끝나기 전에 들어온 같은 키의 호출은 그 결과(또는 예외)를 함께 받습니다.
+    작업은 shield로 감싸 한 호출자가 취소(연결 종료)되어도 나머지 호출자를 위해 계속 실행되고,
+    기다리는 호출자가 모두 취소되면 결과를 받을 곳이 없으므로 작업도 취소합니다.
+    결과를 저장해 두지는 않으므로 작업이 끝난 뒤 들어온 호출은 새로 실행합니다.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """(결과, 다른 호출의 결과를 공유했는지) 반환"""
+        call = self._calls.get(key)
+        shared = call is not None
+        if call is None:
+            call = self._calls[key] = _Call(asyncio.create_task(fn()))
+            call.task.add_done_callback(lambda done: self._forget(key, call))
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task), shared
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # 취소 중인 작업에 새 호출이 붙지 않도록 바로 목록에서 제거
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                call.task.cancel()
+
+    def _forget(self, key: Hashable, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # 모든 호출자가 취소된 뒤 실패해도 "Task exception was never retrieved" 경고가 남지 않도록
+        if not call.task.cancelled():
+            call.task.exception()
+
+    def __len__(self) -> int:
+        return len(self._calls)